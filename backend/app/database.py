@@ -5,8 +5,12 @@ This module provides singleton Supabase client instances to avoid
 creating multiple connections throughout the application.
 """
 import os
+import asyncio
 from functools import lru_cache
-from supabase import create_client, Client
+from typing import Optional
+from httpx import Headers
+from postgrest import SyncRequestBuilder
+from supabase import create_client, acreate_client, Client, AsyncClient
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -59,22 +63,99 @@ def get_supabase_service() -> Client:
     return create_client(config.supabase_url, config.service_key)
 
 
-def get_user_client(user_token: str) -> Client:
+# Async service client (created lazily on the server event loop)
+_async_service_client: Optional[AsyncClient] = None
+_async_service_lock = asyncio.Lock()
+
+
+async def get_supabase_async() -> AsyncClient:
+    """
+    Get the async Supabase service client (bypasses RLS).
+    
+    Same permissions as get_supabase_service(), but every query is awaited
+    (`await supabase.table(...).execute()`) over one shared httpx connection
+    pool, so a slow PostgREST round-trip no longer blocks the event loop.
+    
+    Use this inside async route handlers. Background threads that run their
+    own event loop (BackgroundTasks + asyncio.run) must keep using
+    get_supabase_service(), since the pool is bound to the server loop.
+    
+    Returns:
+        Supabase AsyncClient with service role permissions
+    """
+    global _async_service_client
+    if _async_service_client is None:
+        async with _async_service_lock:
+            if _async_service_client is None:
+                config = get_config()
+                _async_service_client = await acreate_client(
+                    config.supabase_url, config.service_key
+                )
+    return _async_service_client
+
+
+class _BearerSession:
     """
-    Create a Supabase client with user's JWT token for RLS.
+    Thin stand-in for the shared httpx session that sends a user's JWT.
+    
+    PostgREST request builders only call session.request(); we merge the
+    user's Authorization header per request so the underlying connection
+    pool (and its TLS connections) is shared by every user-scoped client.
+    """
+    
+    def __init__(self, session, user_token: str):
+        self._session = session
+        self._authorization = f"Bearer {user_token}"
+    
+    def request(self, method: str, url: str, *, headers=None, **kwargs):
+        merged_headers = Headers(headers)
+        merged_headers["Authorization"] = self._authorization
+        return self._session.request(method, url, headers=merged_headers, **kwargs)
+    
+    def __getattr__(self, name):
+        return getattr(self._session, name)
+
+
+class UserClient:
+    """
+    Lightweight RLS-scoped client returned by get_user_client().
+    
+    Exposes the table API of a Supabase Client, but reuses the pooled
+    anon client's HTTP connections instead of building a new Client.
+    """
+    
+    def __init__(self, postgrest_session, user_token: str):
+        self._session = _BearerSession(postgrest_session, user_token)
+    
+    def table(self, table: str) -> SyncRequestBuilder:
+        """Start a query on a table (RLS applies for the user's token)."""
+        return SyncRequestBuilder(self._session, f"/{table}")
+    
+    from_ = table
+
+
+@lru_cache(maxsize=1)
+def _get_anon_client() -> Client:
+    """Shared anon-key client whose HTTP pool backs all UserClients."""
+    config = get_config()
+    return create_client(config.supabase_url, config.supabase_anon_key)
+
+
+def get_user_client(user_token: str) -> UserClient:
+    """
+    Get a Supabase client with user's JWT token for RLS.
     
     Use this for user-facing operations where RLS should apply.
+    Only the bearer token is swapped per request; the HTTP connection
+    pool is shared, so this is cheap to call on every request.
     
     Args:
         user_token: The user's JWT token from the Authorization header
         
     Returns:
-        Supabase Client with user's permissions (RLS applies)
+        UserClient with user's permissions (RLS applies)
     """
-    config = get_config()
-    client = create_client(config.supabase_url, config.supabase_anon_key)
-    client.postgrest.auth(user_token)
-    return client
+    return UserClient(_get_anon_client().postgrest.session, user_token)
 
 
 # Convenience exports
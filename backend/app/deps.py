@@ -1,16 +1,27 @@
 from fastapi import Depends, HTTPException, status, Request
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from typing import Tuple, Optional, List
-from dataclasses import dataclass
+from typing import Tuple, Optional, List, Dict
+from dataclasses import dataclass, field
 from datetime import datetime
+import hashlib
+import time
 import jwt
 import os
 from dotenv import load_dotenv
 
+from app.utils.cache import TTLCache
+
 load_dotenv()
 
 security = HTTPBearer()
 
+# Supabase signs tokens with HS256 and the JWT secret
+# Note: This is NOT the service_role key, but the JWT secret from Supabase settings
+SUPABASE_JWT_SECRET = os.getenv("SUPABASE_JWT_SECRET")
+
+# Verified token claims keyed by token hash; each entry expires with its token
+_claims_cache = TTLCache(maxsize=10000, ttl=3600)
+
 
 # ============================================================
 # Admin Types
@@ -41,6 +52,36 @@ class AdminContext:
         """Check if admin can perform actions (reset flows, etc)."""
         return self.role in ('super_admin', 'admin', 'support')
 
+
+
+# ============================================================
+# Organization Types
+# ============================================================
+
+@dataclass
+class OrgMembership:
+    """Organization memberships of a user (first entry is the primary org)."""
+    user_id: str
+    organization_ids: List[str]
+    roles: Dict[str, str] = field(default_factory=dict)
+    
+    @property
+    def organization_id(self) -> str:
+        """Primary organization ID."""
+        return self.organization_ids[0]
+    
+    @property
+    def role(self) -> Optional[str]:
+        """Role in the primary organization ('owner', 'admin', 'member')."""
+        return self.roles.get(self.organization_id)
+
+
+# Membership rarely changes, but is read by almost every request.
+# Only positive results are cached: a user without an organization may
+# get one moments later (signup trigger, onboarding).
+ORG_MEMBERSHIP_CACHE_TTL = int(os.getenv("ORG_MEMBERSHIP_CACHE_TTL", "300"))
+_membership_cache = TTLCache(maxsize=10000, ttl=ORG_MEMBERSHIP_CACHE_TTL)
+
 # Lazy import to avoid circular imports
 _supabase_service = None
 
@@ -58,23 +99,49 @@ def get_auth_token(credentials: HTTPAuthorizationCredentials = Depends(security)
     """
     return credentials.credentials
 
+def verify_token(token: str) -> dict:
+    """
+    Verify a Supabase JWT and return its claims.
+    
+    Verified claims are cached by token hash until the token's `exp`, so
+    repeated requests with the same token skip signature verification.
+    
+    Raises:
+        jwt.InvalidTokenError: If the token is invalid or expired
+    """
+    cache_key = hashlib.sha256(token.encode()).hexdigest()
+    claims = _claims_cache.get(cache_key)
+    if claims is not None:
+        return dict(claims)
+    
+    claims = jwt.decode(
+        token, 
+        SUPABASE_JWT_SECRET, 
+        algorithms=["HS256"],
+        audience="authenticated",
+        options={"verify_aud": False} # Audience might vary
+    )
+    
+    exp = claims.get("exp")
+    if exp:
+        remaining = exp - time.time()
+        if remaining > 0:
+            _claims_cache.set(cache_key, claims, ttl=min(remaining, _claims_cache.ttl))
+    
+    return dict(claims)
+
+
 def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)):
     """
     Verifies the Supabase JWT token and returns the user payload.
+    
+    FastAPI caches this dependency per request, so dependencies built on
+    top of it (get_user_org, get_admin_user, ...) share a single decode.
     """
     token = credentials.credentials
     
     try:
-        # Supabase signs tokens with HS256 and the JWT secret
-        # Note: This is NOT the service_role key, but the JWT secret from Supabase settings
-        payload = jwt.decode(
-            token, 
-            os.getenv("SUPABASE_JWT_SECRET"), 
-            algorithms=["HS256"],
-            audience="authenticated",
-            options={"verify_aud": False} # Audience might vary
-        )
-        return payload
+        return verify_token(token)
     except jwt.ExpiredSignatureError:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -95,6 +162,57 @@ def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(securit
         )
 
 
+def _membership_query(supabase, user_id: str):
+    return supabase.table("organization_members") \
+        .select("organization_id, role") \
+        .eq("user_id", user_id) \
+        .order("created_at")
+
+
+def _cache_membership(user_id: str, rows: list) -> Optional[OrgMembership]:
+    if not rows:
+        return None
+    membership = OrgMembership(
+        user_id=user_id,
+        organization_ids=[row["organization_id"] for row in rows],
+        roles={row["organization_id"]: row.get("role") for row in rows},
+    )
+    _membership_cache.set(user_id, membership)
+    return membership
+
+
+def get_org_membership(user_id: str) -> Optional[OrgMembership]:
+    """
+    Resolve a user's organization memberships (cached).
+    
+    Returns None if the user is not in any organization; callers decide
+    which error to raise. Use get_org_membership_async() in async handlers.
+    """
+    membership = _membership_cache.get(user_id)
+    if membership is not None:
+        return membership
+    
+    result = _membership_query(_get_supabase(), user_id).execute()
+    return _cache_membership(user_id, result.data)
+
+
+async def get_org_membership_async(user_id: str) -> Optional[OrgMembership]:
+    """Async variant of get_org_membership() sharing the same cache."""
+    membership = _membership_cache.get(user_id)
+    if membership is not None:
+        return membership
+    
+    from app.database import get_supabase_async
+    supabase = await get_supabase_async()
+    result = await _membership_query(supabase, user_id).execute()
+    return _cache_membership(user_id, result.data)
+
+
+def invalidate_org_membership(user_id: str) -> None:
+    """Drop the cached membership after adding/removing a user from an org."""
+    _membership_cache.pop(user_id)
+
+
 async def get_user_org(current_user: dict = Depends(get_current_user)) -> Tuple[str, str]:
     """
     Get user_id and organization_id from authenticated user.
@@ -113,16 +231,15 @@ async def get_user_org(current_user: dict = Depends(get_current_user)) -> Tuple[
             detail="Invalid user token"
         )
     
-    supabase = _get_supabase()
-    org_result = supabase.table("organization_members").select("organization_id").eq("user_id", user_id).limit(1).execute()
+    membership = await get_org_membership_async(user_id)
     
-    if not org_result.data:
+    if not membership:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="User has no organization"
         )
     
-    return user_id, org_result.data[0]["organization_id"]
+    return user_id, membership.organization_id
 
 
 def get_organization_id(user_id: str) -> str:
@@ -132,16 +249,15 @@ def get_organization_id(user_id: str) -> str:
     Use this in background tasks where you already have the user_id.
     For route handlers, prefer get_user_org() dependency.
     """
-    supabase = _get_supabase()
-    response = supabase.table("organization_members").select("organization_id").eq("user_id", user_id).limit(1).execute()
+    membership = get_org_membership(user_id)
     
-    if not response.data:
+    if not membership:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="User not in any organization"
         )
     
-    return response.data[0]["organization_id"]
+    return membership.organization_id
 
 
 # ============================================================
@@ -237,14 +353,7 @@ async def get_optional_admin(
     Useful for endpoints that behave differently for admins.
     """
     try:
-        token = credentials.credentials
-        payload = jwt.decode(
-            token, 
-            os.getenv("SUPABASE_JWT_SECRET"), 
-            algorithms=["HS256"],
-            audience="authenticated",
-            options={"verify_aud": False}
-        )
+        payload = verify_token(credentials.credentials)
         user_id = payload.get("sub")
         
         if not user_id:
@@ -143,6 +143,7 @@ class Events:
     
     # Coach
     COACH_INSIGHT_REQUESTED = "dealmotion/coach.insight.requested"
+    COACH_SUGGESTIONS_REFRESH = "dealmotion/coach.suggestions.refresh"
     
     # Deal/Prospect events (future automation)
     DEAL_CREATED = "dealmotion/deal.created"
@@ -160,6 +161,9 @@ class Events:
     
     # Follow-up Summarize (for imported transcripts)
     FOLLOWUP_SUMMARIZE = "dealmotion/followup.summarize"
+    
+    # Admin health scores
+    HEALTH_SCORES_REFRESH = "dealmotion/admin.health_scores.refresh"
 
 
 # =============================================================================
@@ -190,3 +194,14 @@ def use_inngest_for(feature: str) -> bool:
     logger.debug(f"use_inngest_for({feature}): {env_key}={feature_flag} -> {result}")
     return result
 
+
+
+def use_sync_fanout() -> bool:
+    """
+    Check if scheduled calendar/Fireflies syncs should fan out.
+    
+    With SCHEDULED_SYNC_MODE=fanout the sync crons send one sync event per
+    connection (synced in parallel within the configured concurrency
+    limits) instead of syncing every connection in the cron run itself.
+    """
+    return os.getenv("SCHEDULED_SYNC_MODE", "sequential").lower() == "fanout"
@@ -12,6 +12,8 @@ from .followup_actions import generate_followup_action_fn
 from .knowledge_base import process_knowledge_file_fn
 from .calendar import sync_all_calendars_fn, sync_calendar_connection_fn
 from .fireflies import sync_all_fireflies_fn, sync_fireflies_user_fn
+from .coach import refresh_coach_suggestions_fn, refresh_all_coach_suggestions_fn
+from .health_scores import refresh_health_scores_fn, recompute_all_health_scores_fn
 
 # All functions to register with Inngest
 all_functions = [
@@ -26,6 +28,10 @@ all_functions = [
     sync_calendar_connection_fn,
     sync_all_fireflies_fn,
     sync_fireflies_user_fn,
+    refresh_coach_suggestions_fn,
+    refresh_all_coach_suggestions_fn,
+    refresh_health_scores_fn,
+    recompute_all_health_scores_fn,
 ]
 
 __all__ = [
@@ -41,5 +47,9 @@ __all__ = [
     "sync_calendar_connection_fn",
     "sync_all_fireflies_fn",
     "sync_fireflies_user_fn",
+    "refresh_coach_suggestions_fn",
+    "refresh_all_coach_suggestions_fn",
+    "refresh_health_scores_fn",
+    "recompute_all_health_scores_fn",
 ]
 
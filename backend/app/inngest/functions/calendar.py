@@ -9,12 +9,14 @@ Functions:
 - cleanup_old_meetings: Daily job to remove old calendar meetings
 """
 
+import os
 import logging
 from datetime import datetime, timedelta
 import inngest
 from inngest import TriggerEvent, TriggerCron
 
 from app.inngest.client import inngest_client
+from app.inngest.events import Events, use_sync_fanout
 from app.database import get_supabase_service
 from app.services.calendar_sync import CalendarSyncService
 
@@ -23,6 +25,18 @@ logger = logging.getLogger(__name__)
 # Database client
 supabase = get_supabase_service()
 
+# Fan-out mode (SCHEDULED_SYNC_MODE=fanout): connections synced at the same time,
+# in total and per provider (keeps us within each provider's rate limits)
+CALENDAR_SYNC_CONCURRENCY = int(os.getenv("CALENDAR_SYNC_CONCURRENCY", "10"))
+CALENDAR_SYNC_PROVIDER_CONCURRENCY = int(os.getenv("CALENDAR_SYNC_PROVIDER_CONCURRENCY", "5"))
+
+# Time the fanned-out syncs get before the cron run summarizes them
+# (well within the 15 minute schedule)
+SYNC_SUMMARY_DELAY = timedelta(minutes=10)
+
+# Events sent per step when fanning out
+FANOUT_BATCH_SIZE = 500
+
 
 @inngest_client.create_function(
     fn_id="sync-all-calendars",
@@ -46,6 +60,9 @@ async def sync_all_calendars_fn(ctx, step):
     
     logger.info(f"Found {len(connections)} active connections to sync")
     
+    if use_sync_fanout():
+        return await fan_out_calendar_sync(step, connections)
+    
     # Step 2: Sync each connection
     results = []
     for conn in connections:
@@ -81,9 +98,53 @@ async def sync_all_calendars_fn(ctx, step):
     }
 
 
+async def fan_out_calendar_sync(step, connections: list) -> dict:
+    """
+    Send one sync event per connection and summarize the results.
+    
+    The connections are synced by sync_calendar_connection_fn in parallel
+    (within its concurrency limits), so the scheduled sync takes about as
+    long as the slowest connection instead of the sum of all of them.
+    """
+    started_at = await step.run("get-sync-start", get_sync_start)
+    
+    for start in range(0, len(connections), FANOUT_BATCH_SIZE):
+        batch = connections[start:start + FANOUT_BATCH_SIZE]
+        await step.send_event(
+            f"send-sync-events-{start}",
+            [
+                inngest.Event(
+                    name=Events.CALENDAR_SYNC_REQUESTED,
+                    data={"connection_id": conn["id"], "provider": conn["provider"]},
+                )
+                for conn in batch
+            ]
+        )
+    
+    # Step 3: Summarize once the syncs have had time to finish
+    await step.sleep("wait-for-syncs", SYNC_SUMMARY_DELAY)
+    summary = await step.run(
+        "summarize-sync",
+        summarize_calendar_sync,
+        [conn["id"] for conn in connections],
+        started_at
+    )
+    
+    logger.info(
+        f"Calendar sync fan-out complete: {summary['successful']}/{summary['synced']} successful, "
+        f"{summary['pending']} still running"
+    )
+    
+    return summary
+
+
 @inngest_client.create_function(
     fn_id="sync-calendar-connection",
-    trigger=TriggerEvent(event="dealmotion/calendar.sync.requested"),
+    trigger=TriggerEvent(event=Events.CALENDAR_SYNC_REQUESTED),
+    concurrency=[
+        inngest.Concurrency(limit=CALENDAR_SYNC_CONCURRENCY),
+        inngest.Concurrency(limit=CALENDAR_SYNC_PROVIDER_CONCURRENCY, key="event.data.provider"),
+    ],
     retries=2,
 )
 async def sync_calendar_connection_fn(ctx, step):
@@ -94,6 +155,7 @@ async def sync_calendar_connection_fn(ctx, step):
     - A new calendar connection is created
     - User manually requests a sync
     - Calendar needs re-authentication
+    - The scheduled sync fans out (SCHEDULED_SYNC_MODE=fanout)
     """
     event_data = ctx.event.data
     connection_id = event_data["connection_id"]
@@ -158,11 +220,11 @@ def get_connection(connection_id: str) -> dict:
         return None
 
 
-def sync_connection(connection_id: str) -> dict:
+async def sync_connection(connection_id: str) -> dict:
     """Sync a calendar connection using the sync service."""
     try:
         sync_service = CalendarSyncService()
-        result = sync_service.sync_connection(connection_id)
+        result = await sync_service.sync_connection_async(connection_id)
         
         return {
             "synced_meetings": result.synced_meetings,
@@ -176,6 +238,48 @@ def sync_connection(connection_id: str) -> dict:
         raise
 
 
+def get_sync_start() -> str:
+    """Get the start time of a fanned-out sync (as a step, so replays agree)."""
+    return datetime.utcnow().isoformat()
+
+
+def summarize_calendar_sync(connection_ids: list, started_at: str) -> dict:
+    """Aggregate the sync status of the connections synced since started_at."""
+    summary = {
+        "synced": len(connection_ids),
+        "successful": 0,
+        "partial": 0,
+        "failed": 0,
+        "pending": 0,
+        "by_provider": {},
+    }
+    started = datetime.fromisoformat(started_at)
+    
+    for i in range(0, len(connection_ids), 100):
+        result = supabase.table("calendar_connections").select(
+            "id, provider, last_sync_at, last_sync_status"
+        ).in_("id", connection_ids[i:i + 100]).execute()
+        
+        for conn in result.data or []:
+            last_sync_at = conn.get("last_sync_at")
+            synced = last_sync_at and datetime.fromisoformat(
+                last_sync_at.replace("Z", "+00:00")
+            ).replace(tzinfo=None) >= started
+            
+            if not synced:
+                status = "pending"
+            elif conn.get("last_sync_status") == "success":
+                status = "successful"
+            else:
+                status = conn.get("last_sync_status") or "failed"
+            
+            summary[status] += 1
+            provider_summary = summary["by_provider"].setdefault(conn["provider"], {})
+            provider_summary[status] = provider_summary.get(status, 0) + 1
+    
+    return summary
+
+
 # =============================================================================
 # Cleanup Job
 # =============================================================================
@@ -0,0 +1,177 @@
+"""
+Coach Suggestion Inngest Functions.
+
+Keeps the materialized coach suggestions in sync with the user's data
+(only active with COACH_SUGGESTIONS_MODE=materialized).
+
+Functions:
+- refresh_coach_suggestions: Re-evaluates a user's suggestions when a lifecycle event fires
+- refresh_all_coach_suggestions: Daily job for time-based rules and expired snoozes
+"""
+
+import logging
+import inngest
+from inngest import TriggerEvent, TriggerCron
+
+from app.inngest.client import inngest_client
+from app.inngest.events import Events
+from app.database import get_supabase_async, get_supabase_service
+from app.deps import get_org_membership_async
+from app.models.coach import SuggestionType
+from app.services.coach_suggestion_state import (
+    ALL_SUGGESTION_TYPES,
+    refresh_user_suggestions,
+    use_materialized_suggestions,
+)
+
+logger = logging.getLogger(__name__)
+
+# Database client
+supabase = get_supabase_service()
+
+# Suggestion types that can change when a lifecycle event fires.
+# Profile completeness has no event of its own, so it is re-checked on every refresh.
+EVENT_SUGGESTION_TYPES = {
+    Events.RESEARCH_COMPLETED: {SuggestionType.ADD_CONTACTS, SuggestionType.OVERDUE_PROSPECT},
+    Events.CONTACT_ADDED: {SuggestionType.ADD_CONTACTS},
+    Events.PREP_COMPLETED: {SuggestionType.CREATE_FOLLOWUP},
+    Events.FOLLOWUP_COMPLETED: {SuggestionType.CREATE_FOLLOWUP, SuggestionType.GENERATE_ACTION},
+    Events.FOLLOWUP_ACTION_COMPLETED: {SuggestionType.GENERATE_ACTION},
+}
+
+# Events sent per step when fanning out the daily refresh
+REFRESH_BATCH_SIZE = 500
+
+# Users read per step (PostgREST caps responses at 1000 rows)
+USER_PAGE_SIZE = 1000
+
+
+@inngest_client.create_function(
+    fn_id="coach-refresh-suggestions",
+    trigger=[
+        TriggerEvent(event=Events.COACH_SUGGESTIONS_REFRESH),
+        *[TriggerEvent(event=event_name) for event_name in EVENT_SUGGESTION_TYPES],
+    ],
+    concurrency=[inngest.Concurrency(limit=1, key="event.data.user_id")],
+    retries=2,
+)
+async def refresh_coach_suggestions_fn(ctx, step):
+    """
+    Re-evaluate a user's coach suggestions after a lifecycle event.
+
+    Only the suggestion types the event can affect are re-evaluated;
+    runs for the same user are serialized.
+    """
+    if not use_materialized_suggestions():
+        return {"skipped": True, "reason": "COACH_SUGGESTIONS_MODE is not materialized"}
+
+    event_data = ctx.event.data
+    user_id = event_data.get("user_id")
+
+    if not user_id:
+        logger.warning(f"Coach refresh for {ctx.event.name} without user_id, skipping")
+        return {"skipped": True, "reason": "No user_id"}
+
+    result = await step.run(
+        "refresh-suggestions",
+        refresh_suggestions,
+        user_id,
+        event_data.get("organization_id"),
+        ctx.event.name,
+    )
+
+    return {"user_id": user_id, **result}
+
+
+@inngest_client.create_function(
+    fn_id="coach-refresh-all-suggestions",
+    trigger=TriggerCron(cron="0 5 * * *"),  # Daily at 05:00 UTC
+    retries=1,
+)
+async def refresh_all_coach_suggestions_fn(ctx, step):
+    """
+    Daily full refresh of all materialized coach suggestions.
+
+    Picks up rules that change with time alone (overdue prospects) and
+    suggestions whose snooze has expired. Users are read one page per
+    step, so every materialized user is refreshed.
+    """
+    if not use_materialized_suggestions():
+        return {"skipped": True, "reason": "COACH_SUGGESTIONS_MODE is not materialized"}
+
+    scheduled = 0
+    page = 0
+    while True:
+        user_ids = await step.run(
+            f"get-materialized-users-{page}",
+            get_materialized_users,
+            page
+        )
+
+        for start in range(0, len(user_ids), REFRESH_BATCH_SIZE):
+            batch = user_ids[start:start + REFRESH_BATCH_SIZE]
+            await step.send_event(
+                f"send-refresh-events-{page}-{start}",
+                [
+                    inngest.Event(
+                        name=Events.COACH_SUGGESTIONS_REFRESH,
+                        data={"user_id": user_id},
+                    )
+                    for user_id in batch
+                ]
+            )
+
+        scheduled += len(user_ids)
+        if len(user_ids) < USER_PAGE_SIZE:
+            break
+        page += 1
+
+    logger.info(f"Scheduled coach suggestion refresh for {scheduled} users")
+
+    return {"scheduled": scheduled}
+
+
+# =============================================================================
+# Step Functions
+# =============================================================================
+
+async def refresh_suggestions(user_id: str, organization_id: str, event_name: str) -> dict:
+    """Refresh the suggestion types affected by event_name for a user."""
+    organization_ids = [organization_id] if organization_id else []
+
+    membership = await get_org_membership_async(user_id)
+    if membership:
+        for member_org_id in membership.organization_ids:
+            if member_org_id not in organization_ids:
+                organization_ids.append(member_org_id)
+
+    if not organization_ids:
+        return {"skipped": True, "reason": "No organization"}
+
+    client = await get_supabase_async()
+    return await refresh_user_suggestions(
+        client,
+        user_id,
+        organization_ids,
+        suggestion_types_for_event(event_name),
+    )
+
+
+def suggestion_types_for_event(event_name: str) -> set:
+    """Suggestion types to re-evaluate for an event (all for scheduled/manual refreshes)."""
+    types = EVENT_SUGGESTION_TYPES.get(event_name)
+    if types is None:
+        return set(ALL_SUGGESTION_TYPES)
+    return types | {SuggestionType.COMPLETE_PROFILE}
+
+
+def get_materialized_users(page: int) -> list:
+    """Get one page of the users that have materialized suggestion state."""
+    start = page * USER_PAGE_SIZE
+    result = supabase.table("coach_suggestion_state") \
+        .select("user_id") \
+        .order("user_id") \
+        .range(start, start + USER_PAGE_SIZE - 1) \
+        .execute()
+
+    return [row["user_id"] for row in (result.data or [])]
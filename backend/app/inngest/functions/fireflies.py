@@ -8,12 +8,14 @@ Functions:
 - sync_fireflies_user: Event-triggered sync for a specific user
 """
 
+import os
 import logging
-from datetime import datetime
+from datetime import datetime, timedelta
 import inngest
 from inngest import TriggerEvent, TriggerCron
 
 from app.inngest.client import inngest_client
+from app.inngest.events import Events, use_sync_fanout
 from app.database import get_supabase_service
 from app.services.fireflies_service import FirefliesService, sync_fireflies_recordings
 
@@ -22,6 +24,19 @@ logger = logging.getLogger(__name__)
 # Database client
 supabase = get_supabase_service()
 
+# Fan-out mode (SCHEDULED_SYNC_MODE=fanout): integrations synced at the same time
+FIREFLIES_SYNC_CONCURRENCY = int(os.getenv("FIREFLIES_SYNC_CONCURRENCY", "5"))
+
+# Time the fanned-out syncs get before the cron run summarizes them
+# (within the 5 minute schedule)
+SYNC_SUMMARY_DELAY = timedelta(minutes=4)
+
+# Days of recordings fetched by a scheduled sync
+SCHEDULED_DAYS_BACK = 7
+
+# Events sent per step when fanning out
+FANOUT_BATCH_SIZE = 500
+
 
 @inngest_client.create_function(
     fn_id="sync-all-fireflies",
@@ -45,6 +60,9 @@ async def sync_all_fireflies_fn(ctx, step):
     
     logger.info(f"Found {len(integrations)} active Fireflies integrations to sync")
     
+    if use_sync_fanout():
+        return await fan_out_fireflies_sync(step, integrations)
+    
     # Step 2: Sync each integration
     results = []
     for integration in integrations:
@@ -80,9 +98,50 @@ async def sync_all_fireflies_fn(ctx, step):
     }
 
 
+async def fan_out_fireflies_sync(step, integrations: list) -> dict:
+    """
+    Send one sync event per integration and summarize the results.
+    
+    The integrations are synced by sync_fireflies_user_fn in parallel
+    (within FIREFLIES_SYNC_CONCURRENCY), so the scheduled sync takes about
+    as long as the slowest integration.
+    """
+    started_at = await step.run("get-sync-start", get_sync_start)
+    
+    for start in range(0, len(integrations), FANOUT_BATCH_SIZE):
+        batch = integrations[start:start + FANOUT_BATCH_SIZE]
+        await step.send_event(
+            f"send-sync-events-{start}",
+            [
+                inngest.Event(
+                    name=Events.FIREFLIES_SYNC_REQUESTED,
+                    data={"user_id": integration["user_id"], "days_back": SCHEDULED_DAYS_BACK},
+                )
+                for integration in batch
+            ]
+        )
+    
+    # Step 3: Summarize once the syncs have had time to finish
+    await step.sleep("wait-for-syncs", SYNC_SUMMARY_DELAY)
+    summary = await step.run(
+        "summarize-sync",
+        summarize_fireflies_sync,
+        [integration["id"] for integration in integrations],
+        started_at
+    )
+    
+    logger.info(
+        f"Fireflies sync fan-out complete: {summary['successful']}/{summary['synced']} successful, "
+        f"{summary['pending']} still running"
+    )
+    
+    return summary
+
+
 @inngest_client.create_function(
     fn_id="sync-fireflies-user",
-    trigger=TriggerEvent(event="dealmotion/fireflies.sync.requested"),
+    trigger=TriggerEvent(event=Events.FIREFLIES_SYNC_REQUESTED),
+    concurrency=[inngest.Concurrency(limit=FIREFLIES_SYNC_CONCURRENCY)],
     retries=2,
 )
 async def sync_fireflies_user_fn(ctx, step):
@@ -92,6 +151,7 @@ async def sync_fireflies_user_fn(ctx, step):
     Triggered when:
     - A new Fireflies connection is created
     - User manually requests a sync
+    - The scheduled sync fans out (SCHEDULED_SYNC_MODE=fanout)
     """
     event_data = ctx.event.data
     user_id = event_data["user_id"]
@@ -156,7 +216,38 @@ def get_user_fireflies_integration(user_id: str) -> dict:
 
 async def sync_fireflies_integration(integration: dict) -> dict:
     """Sync a Fireflies integration (default 7 days for scheduled sync)."""
-    return await sync_fireflies_integration_with_days(integration, days_back=7)
+    return await sync_fireflies_integration_with_days(integration, days_back=SCHEDULED_DAYS_BACK)
+
+
+def get_sync_start() -> str:
+    """Get the start time of a fanned-out sync (as a step, so replays agree)."""
+    return datetime.utcnow().isoformat()
+
+
+def summarize_fireflies_sync(integration_ids: list, started_at: str) -> dict:
+    """Aggregate the sync status of the integrations synced since started_at."""
+    summary = {"synced": len(integration_ids), "successful": 0, "failed": 0, "pending": 0}
+    started = datetime.fromisoformat(started_at)
+    
+    for i in range(0, len(integration_ids), 100):
+        result = supabase.table("recording_integrations").select(
+            "id, last_sync_at, last_sync_status"
+        ).in_("id", integration_ids[i:i + 100]).execute()
+        
+        for integration in result.data or []:
+            last_sync_at = integration.get("last_sync_at")
+            synced = last_sync_at and datetime.fromisoformat(
+                last_sync_at.replace("Z", "+00:00")
+            ).replace(tzinfo=None) >= started
+            
+            if not synced:
+                summary["pending"] += 1
+            elif integration.get("last_sync_status") == "success":
+                summary["successful"] += 1
+            else:
+                summary["failed"] += 1
+    
+    return summary
 
 
 async def sync_fireflies_integration_with_days(integration: dict, days_back: int = 7) -> dict:
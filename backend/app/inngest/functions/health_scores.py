@@ -0,0 +1,133 @@
+"""
+User Health Score Inngest Functions.
+
+Keeps the user_health_scores snapshot used by the admin panel up to date.
+
+Functions:
+- refresh_health_scores: Recomputes an organization's scores on activity/billing events
+- recompute_all_health_scores: Scheduled full recompute (inactivity changes with time alone)
+"""
+
+import logging
+from inngest import TriggerEvent, TriggerCron
+
+from app.inngest.client import inngest_client
+from app.inngest.events import Events
+from app.database import get_supabase_service
+from app.services.user_health import (
+    USER_SCAN_PAGE_SIZE,
+    refresh_organization_health_scores,
+    store_health_scores,
+)
+
+logger = logging.getLogger(__name__)
+
+# Database client
+supabase = get_supabase_service()
+
+
+@inngest_client.create_function(
+    fn_id="refresh-health-scores",
+    trigger=[
+        TriggerEvent(event=Events.HEALTH_SCORES_REFRESH),
+        TriggerEvent(event=Events.RESEARCH_COMPLETED),
+        TriggerEvent(event=Events.PREP_COMPLETED),
+        TriggerEvent(event=Events.FOLLOWUP_COMPLETED),
+    ],
+    retries=2,
+)
+async def refresh_health_scores_fn(ctx, step):
+    """
+    Recompute the health scores of an organization's members.
+
+    Triggered by:
+    - Completed research/preps/follow-ups (activity, usage, error rate)
+    - Stripe billing webhooks (plan, failed payments), via stripe_customer_id
+    """
+    event_data = ctx.event.data
+    organization_id = event_data.get("organization_id")
+
+    if not organization_id and event_data.get("stripe_customer_id"):
+        organization_id = await step.run(
+            "get-organization",
+            get_organization_for_customer,
+            event_data["stripe_customer_id"]
+        )
+
+    if not organization_id:
+        logger.warning(f"Health score refresh for {ctx.event.name} without organization, skipping")
+        return {"updated": 0}
+
+    updated = await step.run(
+        "refresh-organization-scores",
+        refresh_organization_scores,
+        organization_id
+    )
+
+    return {"organization_id": organization_id, "updated": updated}
+
+
+@inngest_client.create_function(
+    fn_id="recompute-all-health-scores",
+    trigger=TriggerCron(cron="0 */6 * * *"),  # Every 6 hours
+    retries=1,
+)
+async def recompute_all_health_scores_fn(ctx, step):
+    """
+    Recompute the health scores of all users.
+
+    Catches changes no event reports (inactivity growing over time,
+    failed jobs), one step per page of users so each step stays small.
+    """
+    updated = 0
+    page = 0
+    while True:
+        page_count = await step.run(
+            f"recompute-page-{page}",
+            recompute_page,
+            page
+        )
+        updated += page_count
+        if page_count < USER_SCAN_PAGE_SIZE:
+            break
+        page += 1
+
+    logger.info(f"Recomputed health scores for {updated} users")
+
+    return {"updated": updated}
+
+
+# =============================================================================
+# Step Functions
+# =============================================================================
+
+def get_organization_for_customer(stripe_customer_id: str) -> str:
+    """Get the organization ID for a Stripe customer."""
+    result = supabase.table("organization_subscriptions") \
+        .select("organization_id") \
+        .eq("stripe_customer_id", stripe_customer_id) \
+        .limit(1) \
+        .execute()
+
+    return result.data[0]["organization_id"] if result.data else None
+
+
+def refresh_organization_scores(organization_id: str) -> int:
+    """Recompute the scores of an organization's members."""
+    return refresh_organization_health_scores(supabase, organization_id)
+
+
+def recompute_page(page: int) -> int:
+    """Recompute and store the scores of one page of users."""
+    start = page * USER_SCAN_PAGE_SIZE
+    result = supabase.table("users") \
+        .select("id") \
+        .order("id") \
+        .range(start, start + USER_SCAN_PAGE_SIZE - 1) \
+        .execute()
+
+    user_ids = [row["id"] for row in (result.data or [])]
+    if not user_ids:
+        return 0
+
+    return store_health_scores(supabase, user_ids)
@@ -10,27 +10,32 @@ Events:
 
 Steps:
 1. Update status to processing
-2. Download file from Supabase Storage
-3. Extract text from file (PDF, DOCX, TXT, MD)
-4. Chunk text into 500-char segments
-5. Generate embeddings via Voyage AI
-6. Store vectors in Pinecone
-7. Save chunks to database
-8. Update status to completed
+2. Download the file, extract its text page by page (PDF, DOCX, TXT, MD),
+   chunk it into 500-token segments and save the chunks as they are made
+3. Per batch of chunks: generate embeddings via Voyage AI (reusing
+   embeddings of unchanged chunks) and store the vectors in Pinecone
+4. Update status to completed
+
+Step outputs only carry counts; text and chunks stay out of step payloads
+so large documents don't grow them.
 """
 
 import logging
-import io
-from typing import List, Dict, Any
+from contextlib import aclosing
 import inngest
 from inngest import NonRetriableError, TriggerEvent
 
 from app.inngest.client import inngest_client
 from app.database import get_supabase_service
-from app.services.file_processor import FileProcessor
-from app.services.text_chunker import TextChunker
+from app.services.document_parsing import parse_document
 from app.services.embeddings import EmbeddingsService
-from app.services.vector_store import VectorStore
+from app.services.vector_store import get_vector_store
+from app.services.kb_chunks import (
+    KB_INGEST_BATCH_SIZE,
+    chunk_record,
+    chunk_vector,
+    embed_chunks,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -49,13 +54,9 @@ async def process_knowledge_file_fn(ctx, step):
     
     Steps:
     1. Update status to processing
-    2. Download file from storage
-    3. Extract text
-    4. Chunk text
-    5. Generate embeddings
-    6. Store in Pinecone
-    7. Save chunks to database
-    8. Update status to completed
+    2. Download, extract and chunk the file, saving chunks to the database
+    3. Embed and store vectors, one step per batch of chunks
+    4. Update status to completed
     """
     event_data = ctx.event.data
     file_id = event_data["file_id"]
@@ -73,50 +74,22 @@ async def process_knowledge_file_fn(ctx, step):
             file_id, "processing", None, None
         )
         
-        # Step 2: Download file from storage
-        file_data = await step.run(
-            "download-file",
-            download_file_from_storage,
-            file_path
-        )
-        
-        # Step 3: Extract text from file
-        text = await step.run(
-            "extract-text",
-            extract_text_from_file,
-            file_data, file_type
-        )
-        
-        # Step 4: Chunk text
-        chunks = await step.run(
-            "chunk-text",
-            chunk_text,
-            text
-        )
-        
-        # Step 5: Generate embeddings
-        embeddings = await step.run(
-            "generate-embeddings",
-            generate_embeddings,
-            chunks
+        # Step 2: Download, extract and chunk (streamed page by page)
+        chunk_count = await step.run(
+            "chunk-file",
+            chunk_file,
+            file_id, organization_id, file_path, file_type
         )
         
-        # Step 6: Store vectors in Pinecone
-        await step.run(
-            "store-vectors-pinecone",
-            store_vectors_in_pinecone,
-            file_id, organization_id, chunks, embeddings
-        )
-        
-        # Step 7: Save chunks to database
-        await step.run(
-            "save-chunks-db",
-            save_chunks_to_database,
-            file_id, organization_id, chunks
-        )
+        # Step 3: Generate embeddings and store vectors, per batch of chunks
+        for start in range(0, chunk_count, KB_INGEST_BATCH_SIZE):
+            await step.run(
+                f"embed-chunks-{start}",
+                embed_chunk_batch,
+                file_id, organization_id, start
+            )
         
-        # Step 8: Update status to completed
-        chunk_count = len(chunks)
+        # Step 4: Update status to completed
         await step.run(
             "update-status-completed",
             update_file_status,
@@ -207,113 +180,69 @@ async def download_file_from_storage(file_path: str) -> bytes:
         raise NonRetriableError(f"Download failed: {e}")
 
 
-async def extract_text_from_file(file_data: bytes, file_type: str) -> str:
-    """Extract text from file using FileProcessor."""
+async def chunk_file(
+    file_id: str,
+    organization_id: str,
+    file_path: str,
+    file_type: str
+) -> int:
+    """
+    Download, extract and chunk a file, saving chunks as they are made.
+    
+    Parsing runs off the event loop (see document_parsing); chunks are
+    saved in batches. Returns the number of chunks.
+    """
+    file_data = await download_file_from_storage(file_path)
+    
     try:
-        file_processor = FileProcessor()
-        text = file_processor.extract_text(io.BytesIO(file_data), file_type)
-        
-        if not text or not text.strip():
-            raise NonRetriableError("No text could be extracted from file")
-        
-        logger.info(f"Extracted {len(text)} characters from file")
-        return text
-    except NonRetriableError:
-        raise
+        # Drop chunks saved by a previous attempt
+        supabase.table("knowledge_base_chunks").delete().eq("file_id", file_id).execute()
+        
+        # Extraction and tokenization run in a worker process (see document_parsing)
+        chunk_count = 0
+        async with aclosing(parse_document(file_data, file_type, chunk_size=500, chunk_overlap=50)) as batches:
+            async for batch in batches:
+                supabase.table("knowledge_base_chunks").insert(
+                    [chunk_record(file_id, organization_id, chunk) for chunk in batch]
+                ).execute()
+                chunk_count += len(batch)
     except Exception as e:
-        logger.error(f"Failed to extract text: {e}")
-        raise NonRetriableError(f"Text extraction failed: {e}")
-
-
-async def chunk_text(text: str) -> List[Dict[str, Any]]:
-    """Split text into chunks."""
-    try:
-        chunker = TextChunker(chunk_size=500, chunk_overlap=50)
-        chunks = chunker.chunk_text(text)
-        
-        if not chunks:
-            raise NonRetriableError("No chunks created from text")
-        
-        logger.info(f"Created {len(chunks)} chunks")
-        return chunks
-    except NonRetriableError:
-        raise
-    except Exception as e:
-        logger.error(f"Failed to chunk text: {e}")
+        logger.error(f"Failed to chunk file: {e}")
         raise NonRetriableError(f"Chunking failed: {e}")
+    
+    if not chunk_count:
+        raise NonRetriableError("No text could be extracted from file")
+    
+    logger.info(f"Created {chunk_count} chunks")
+    return chunk_count
 
 
-async def generate_embeddings(chunks: List[Dict[str, Any]]) -> List[List[float]]:
-    """Generate embeddings for chunks using Voyage AI."""
-    try:
-        embeddings_service = EmbeddingsService()
-        chunk_texts = [chunk["content"] for chunk in chunks]
-        embeddings = embeddings_service.generate_embeddings(chunk_texts, input_type="document")
-        
-        logger.info(f"Generated {len(embeddings)} embeddings")
-        return embeddings
-    except Exception as e:
-        logger.error(f"Failed to generate embeddings: {e}")
-        # Embeddings can fail due to rate limits - allow retry
-        raise
-
-
-async def store_vectors_in_pinecone(
-    file_id: str,
-    organization_id: str,
-    chunks: List[Dict[str, Any]],
-    embeddings: List[List[float]]
-) -> dict:
-    """Store vectors in Pinecone."""
+async def embed_chunk_batch(file_id: str, organization_id: str, start: int) -> dict:
+    """Generate embeddings for a batch of saved chunks and store the vectors in Pinecone."""
     try:
-        vector_store = VectorStore()
-        vectors = []
+        result = supabase.table("knowledge_base_chunks") \
+            .select("chunk_index, content, token_count") \
+            .eq("file_id", file_id) \
+            .gte("chunk_index", start) \
+            .lt("chunk_index", start + KB_INGEST_BATCH_SIZE) \
+            .order("chunk_index") \
+            .execute()
+        chunks = result.data or []
+        
+        vector_store = get_vector_store()
+        embeddings, reused = await embed_chunks(
+            supabase, EmbeddingsService(), vector_store, organization_id, chunks,
+            file_id=file_id, file_start=start
+        )
         
-        for i, (chunk, embedding) in enumerate(zip(chunks, embeddings)):
-            vector_id = f"{file_id}:{i}"
-            vectors.append({
-                "id": vector_id,
-                "values": embedding,
-                "metadata": {
-                    "file_id": file_id,
-                    "chunk_index": i,
-                    "organization_id": organization_id,
-                    "content_preview": chunk["content"][:200]
-                }
-            })
+        vector_store.upsert_vectors([
+            chunk_vector(file_id, organization_id, chunk, embedding)
+            for chunk, embedding in zip(chunks, embeddings)
+        ])
         
-        vector_store.upsert_vectors(vectors)
-        logger.info(f"Stored {len(vectors)} vectors in Pinecone")
-        return {"stored": len(vectors)}
+        logger.info(f"Stored {len(chunks)} vectors ({reused} reused embeddings)")
+        return {"stored": len(chunks), "reused": reused}
     except Exception as e:
-        logger.error(f"Failed to store vectors: {e}")
-        # Pinecone can have transient failures - allow retry
+        logger.error(f"Failed to embed chunks: {e}")
+        # Voyage rate limits and Pinecone hiccups are transient - allow retry
         raise
-
-
-async def save_chunks_to_database(
-    file_id: str,
-    organization_id: str,
-    chunks: List[Dict[str, Any]]
-) -> dict:
-    """Save chunks to database."""
-    try:
-        chunk_records = []
-        for i, chunk in enumerate(chunks):
-            vector_id = f"{file_id}:{i}"
-            chunk_records.append({
-                "file_id": file_id,
-                "organization_id": organization_id,
-                "chunk_index": i,
-                "content": chunk["content"],
-                "token_count": chunk["token_count"],
-                "embedding_id": vector_id
-            })
-        
-        supabase.table("knowledge_base_chunks").insert(chunk_records).execute()
-        logger.info(f"Saved {len(chunk_records)} chunks to database")
-        return {"saved": len(chunk_records)}
-    except Exception as e:
-        logger.error(f"Failed to save chunks: {e}")
-        raise NonRetriableError(f"Database save failed: {e}")
-
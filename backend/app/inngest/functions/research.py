@@ -44,13 +44,15 @@ async def research_company_fn(ctx, step):
     
     Steps:
     1. Update status to 'researching'
-    2. Claude AI research
-    3. Gemini AI research
-    4. KVK lookup (if Dutch company)
-    5. Website scraping (if URL provided)
-    6. Merge results and generate brief
-    7. Save to database
-    8. Emit completion event
+    2. Get seller context
+    3. Research sources, in parallel:
+       - Claude AI research
+       - Gemini AI research
+       - KVK lookup (if Dutch company)
+       - Website scraping (if URL provided)
+    4. Merge results and generate brief
+    5. Save to database
+    6. Emit completion event
     """
     # Extract event data
     event_data = ctx.event.data
@@ -72,45 +74,51 @@ async def research_company_fn(ctx, step):
     # Step 2: Get seller context (for personalized research)
     seller_context = await step.run("get-seller-context", get_seller_context, organization_id, user_id)
     
-    # Step 3: Claude research with retry
-    claude_result = await step.run(
-        "claude-research",
-        run_claude_research,
-        company_name, country, city, linkedin_url, seller_context, language
-    )
-    
-    # Step 4: Gemini research with retry
-    gemini_result = await step.run(
-        "gemini-research",
-        run_gemini_research,
-        company_name, country, city, linkedin_url, seller_context, language
-    )
+    # Step 3: Research sources in parallel. The sources are independent, and
+    # each one stays its own step (retried and memoized separately), so the
+    # wall time is that of the slowest source instead of their sum.
+    source_steps = {
+        "claude": lambda: step.run(
+            "claude-research",
+            run_claude_research,
+            company_name, country, city, linkedin_url, seller_context, language
+        ),
+        "gemini": lambda: step.run(
+            "gemini-research",
+            run_gemini_research,
+            company_name, country, city, linkedin_url, seller_context, language
+        ),
+    }
     
-    # Step 5: KVK lookup (conditional - only for Dutch companies)
-    kvk_result = None
+    # KVK lookup (conditional - only for Dutch companies)
     if kvk_api.is_dutch_company(country):
-        kvk_result = await step.run("kvk-lookup", run_kvk_lookup, company_name, city)
+        source_steps["kvk"] = lambda: step.run("kvk-lookup", run_kvk_lookup, company_name, city)
     
-    # Step 6: Website scraping (conditional - if URL provided)
-    website_result = None
+    # Website scraping (conditional - if URL provided)
     if website_url:
-        website_result = await step.run("website-scrape", run_website_scrape, website_url)
+        source_steps["website"] = lambda: step.run("website-scrape", run_website_scrape, website_url)
+    
+    source_results = dict(zip(source_steps, await ctx.group.parallel(tuple(source_steps.values()))))
+    claude_result = source_results["claude"]
+    gemini_result = source_results["gemini"]
+    kvk_result = source_results.get("kvk")
+    website_result = source_results.get("website")
     
-    # Step 7: Merge results and generate brief
+    # Step 4: Merge results and generate brief
     brief_content = await step.run(
         "generate-brief",
         merge_and_generate_brief,
         company_name, country, city, claude_result, gemini_result, kvk_result, website_result, seller_context, language
     )
     
-    # Step 8: Save results to database
+    # Step 5: Save results to database
     await step.run(
         "save-results",
         save_research_results,
         research_id, claude_result, gemini_result, kvk_result, website_result, brief_content
     )
     
-    # Step 9: Emit completion event
+    # Step 6: Emit completion event
     await step.send_event(
         "emit-completion",
         inngest.Event(
@@ -7,11 +7,16 @@ Endpoints for admin dashboard metrics and trends.
 
 from fastapi import APIRouter, Depends
 from typing import Optional, List, Dict, Any
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 import logging
 
 from app.deps import get_admin_user, AdminContext
 from app.database import get_supabase_service
+from app.services.user_health import (
+    compute_health_scores,
+    get_health_status_counts,
+    iter_user_id_pages,
+)
 from .models import CamelModel
 
 logger = logging.getLogger(__name__)
@@ -224,49 +229,20 @@ async def _calculate_metrics_fallback(supabase) -> DashboardMetrics:
     users_result = supabase.table("users").select("id", count="exact").execute()
     total_users = users_result.count or 0
     
-    # Users this week
-    week_ago = datetime.utcnow() - timedelta(days=7)
-    week_result = supabase.table("users") \
-        .select("id", count="exact") \
-        .gte("created_at", week_ago.isoformat()) \
-        .execute()
-    users_growth_week = week_result.count or 0
+    # Users this week and active users (7 days) from one fetch per table
+    now = datetime.utcnow()
+    week_ago = now - timedelta(days=7)
+    window = _fetch_activity_window(supabase, week_ago)
+    
+    users_growth_week = len(window["users"])
     
     # Active users (7 days) - count unique users with activity in last 7 days
-    active_users_7d = 0
-    try:
-        # Get unique user_ids from research_briefs in last 7 days
-        research_users = supabase.table("research_briefs") \
-            .select("user_id") \
-            .gte("created_at", week_ago.isoformat()) \
-            .execute()
-        
-        unique_users = set()
-        for r in (research_users.data or []):
-            if r.get("user_id"):
-                unique_users.add(r["user_id"])
-        
-        # Also check meeting_preps
-        prep_users = supabase.table("meeting_preps") \
-            .select("user_id") \
-            .gte("created_at", week_ago.isoformat()) \
-            .execute()
-        for p in (prep_users.data or []):
-            if p.get("user_id"):
-                unique_users.add(p["user_id"])
-        
-        # Also check followups
-        followup_users = supabase.table("followups") \
-            .select("user_id") \
-            .gte("created_at", week_ago.isoformat()) \
-            .execute()
-        for f in (followup_users.data or []):
-            if f.get("user_id"):
-                unique_users.add(f["user_id"])
-        
-        active_users_7d = len(unique_users)
-    except Exception:
-        pass
+    unique_users = set()
+    for table in ("research_briefs", "meeting_preps", "followups"):
+        for row in window[table]:
+            if row.get("user_id"):
+                unique_users.add(row["user_id"])
+    active_users_7d = len(unique_users)
     
     # MRR (Monthly Recurring Revenue) - sum of active subscriptions
     mrr_cents = 0
@@ -308,28 +284,15 @@ async def _calculate_metrics_fallback(supabase) -> DashboardMetrics:
     
     # Error rate (24h) - percentage of failed jobs
     error_rate_24h = 0.0
-    try:
-        day_ago = (datetime.utcnow() - timedelta(days=1)).isoformat()
-        
-        # Total research briefs in 24h
-        total_result = supabase.table("research_briefs") \
-            .select("id", count="exact") \
-            .gte("created_at", day_ago) \
-            .execute()
-        total_24h = total_result.count or 0
-        
-        # Failed research briefs in 24h
-        failed_result = supabase.table("research_briefs") \
-            .select("id", count="exact") \
-            .gte("created_at", day_ago) \
-            .eq("status", "failed") \
-            .execute()
-        failed_24h = failed_result.count or 0
-        
-        if total_24h > 0:
-            error_rate_24h = round((failed_24h / total_24h) * 100, 1)
-    except Exception:
-        pass
+    day_ago = now - timedelta(days=1)
+    research_24h = []
+    for r in window["research_briefs"]:
+        created_at = _parse_timestamp(r.get("created_at"))
+        if created_at and created_at >= day_ago:
+            research_24h.append(r)
+    if research_24h:
+        failed_24h = sum(1 for r in research_24h if r.get("status") == "failed")
+        error_rate_24h = round((failed_24h / len(research_24h)) * 100, 1)
     
     # Calculate MRR change
     mrr_change = await _calculate_mrr_change(supabase)
@@ -391,73 +354,104 @@ async def get_usage_trends(
 
 async def _calculate_trends_fallback(supabase, days: int) -> DashboardTrends:
     """Fallback calculation for trends if database function fails - uses REAL data."""
-    trends = []
-    
-    for i in range(days - 1, -1, -1):
-        day_start = (datetime.utcnow() - timedelta(days=i)).replace(hour=0, minute=0, second=0, microsecond=0)
-        day_end = day_start + timedelta(days=1)
-        date_str = day_start.strftime("%Y-%m-%d")
-        
-        researches = 0
-        preps = 0
-        followups = 0
-        new_users = 0
-        
-        try:
-            # Count researches for this day
-            research_result = supabase.table("research_briefs") \
-                .select("id", count="exact") \
-                .gte("created_at", day_start.isoformat()) \
-                .lt("created_at", day_end.isoformat()) \
-                .execute()
-            researches = research_result.count or 0
-        except Exception:
-            pass
-        
-        try:
-            # Count meeting preps for this day
-            prep_result = supabase.table("meeting_preps") \
-                .select("id", count="exact") \
-                .gte("created_at", day_start.isoformat()) \
-                .lt("created_at", day_end.isoformat()) \
-                .execute()
-            preps = prep_result.count or 0
-        except Exception:
-            pass
-        
-        try:
-            # Count followups for this day
-            followup_result = supabase.table("followups") \
-                .select("id", count="exact") \
-                .gte("created_at", day_start.isoformat()) \
-                .lt("created_at", day_end.isoformat()) \
-                .execute()
-            followups = followup_result.count or 0
-        except Exception:
-            pass
-        
-        try:
-            # Count new users for this day
-            users_result = supabase.table("users") \
-                .select("id", count="exact") \
-                .gte("created_at", day_start.isoformat()) \
-                .lt("created_at", day_end.isoformat()) \
-                .execute()
-            new_users = users_result.count or 0
-        except Exception:
-            pass
-        
-        trends.append(TrendDataPoint(
-            date=date_str,
-            researches=researches,
-            preps=preps,
-            followups=followups,
-            new_users=new_users
-        ))
+    first_day = (datetime.utcnow() - timedelta(days=days - 1)).replace(hour=0, minute=0, second=0, microsecond=0)
+    
+    # Each table is fetched once for the whole window and binned per day
+    window = _fetch_activity_window(supabase, first_day)
+    researches = _bucket_by_day(window["research_briefs"], first_day, days)
+    preps = _bucket_by_day(window["meeting_preps"], first_day, days)
+    followups = _bucket_by_day(window["followups"], first_day, days)
+    new_users = _bucket_by_day(window["users"], first_day, days)
+    
+    trends = [
+        TrendDataPoint(
+            date=(first_day + timedelta(days=i)).strftime("%Y-%m-%d"),
+            researches=researches[i],
+            preps=preps[i],
+            followups=followups[i],
+            new_users=new_users[i]
+        )
+        for i in range(days)
+    ]
     
     return DashboardTrends(trends=trends, period_days=days)
 
 
+# Tables used by the metrics/trends fallbacks, with the columns each needs
+_ACTIVITY_TABLES = {
+    "research_briefs": "created_at, user_id, status",
+    "meeting_preps": "created_at, user_id",
+    "followups": "created_at, user_id",
+    "users": "created_at",
+}
+
+# Page size when fetching a window (PostgREST caps responses at 1000 rows)
+_WINDOW_PAGE_SIZE = 1000
+
+
+def _fetch_activity_window(supabase, since: datetime) -> Dict[str, List[Dict[str, Any]]]:
+    """
+    Fetch all activity rows created since a point in time.
+    
+    One (paged) query per table for the whole window, selecting only the
+    columns the fallbacks aggregate on, so callers can bucket in memory.
+    
+    Returns: Dict[table, rows] (empty list for a table that fails)
+    """
+    window: Dict[str, List[Dict[str, Any]]] = {}
+    
+    for table, columns in _ACTIVITY_TABLES.items():
+        rows: List[Dict[str, Any]] = []
+        try:
+            start = 0
+            while True:
+                result = supabase.table(table) \
+                    .select(columns) \
+                    .gte("created_at", since.isoformat()) \
+                    .order("created_at") \
+                    .order("id") \
+                    .range(start, start + _WINDOW_PAGE_SIZE - 1) \
+                    .execute()
+                
+                page = result.data or []
+                rows.extend(page)
+                if len(page) < _WINDOW_PAGE_SIZE:
+                    break
+                start += _WINDOW_PAGE_SIZE
+        except Exception as e:
+            logger.warning(f"Error fetching {table} activity window: {e}")
+        
+        window[table] = rows
+    
+    return window
+
+
+def _parse_timestamp(value: Optional[str]) -> Optional[datetime]:
+    """Parse a database timestamp into a naive UTC datetime."""
+    if not value:
+        return None
+    try:
+        parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except (ValueError, TypeError):
+        return None
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed
+
+
+def _bucket_by_day(rows: List[Dict[str, Any]], first_day: datetime, days: int) -> List[int]:
+    """Count rows per day (by created_at), for `days` days starting at first_day."""
+    counts = [0] * days
+    for row in rows:
+        created_at = _parse_timestamp(row.get("created_at"))
+        if created_at is None:
+            continue
+        index = (created_at.date() - first_day.date()).days
+        if 0 <= index < days:
+            counts[index] += 1
+    return counts
+
+
 @router.get("/health-distribution", response_model=HealthDistribution)
 async def get_health_distribution(
     admin: AdminContext = Depends(get_admin_user)
@@ -470,27 +464,23 @@ async def get_health_distribution(
     - At Risk (50-79)
     - Critical (0-49)
     
-    Uses REAL data from database with BATCH queries to avoid N+1 problem.
+    Reads the user_health_scores snapshot (kept up to date by Inngest);
+    falls back to computing scores in batches while the snapshot is empty.
     """
     supabase = get_supabase_service()
     
     try:
-        # Pre-fetch all data in batch queries (avoiding N+1 problem)
-        user_health_data = await _batch_fetch_user_health_data(supabase)
+        counts = get_health_status_counts(supabase)
         
-        healthy = 0
-        at_risk = 0
-        critical = 0
+        if counts is None:
+            counts = {"healthy": 0, "at_risk": 0, "critical": 0}
+            for user_ids in iter_user_id_pages(supabase):
+                for row in compute_health_scores(supabase, user_ids):
+                    counts[row["health_status"]] += 1
         
-        for user_id, data in user_health_data.items():
-            health_score = _calculate_health_score_from_data(data)
-            
-            if health_score >= 80:
-                healthy += 1
-            elif health_score >= 50:
-                at_risk += 1
-            else:
-                critical += 1
+        healthy = counts["healthy"]
+        at_risk = counts["at_risk"]
+        critical = counts["critical"]
         
         total = healthy + at_risk + critical
         
@@ -506,195 +496,6 @@ async def get_health_distribution(
         return HealthDistribution(healthy=0, at_risk=0, critical=0, total=0)
 
 
-async def _batch_fetch_user_health_data(supabase) -> Dict[str, Dict[str, Any]]:
-    """
-    Fetch all user health data in batch queries.
-    
-    This avoids the N+1 query problem by fetching all data upfront
-    and then calculating health scores in memory.
-    
-    Returns: Dict[user_id, {last_activity, error_count, total_count, org_id, flow_count, flow_limit, profile_completeness, has_failed_payment}]
-    """
-    user_data: Dict[str, Dict[str, Any]] = {}
-    month_ago = datetime.utcnow() - timedelta(days=30)
-    
-    # 1. Get all users
-    users_result = supabase.table("users").select("id").execute()
-    for user in (users_result.data or []):
-        user_data[user["id"]] = {
-            "last_activity": None,
-            "error_count": 0,
-            "total_count": 0,
-            "org_id": None,
-            "flow_count": 0,
-            "flow_limit": 0,
-            "profile_completeness": 0,
-            "has_failed_payment": False
-        }
-    
-    if not user_data:
-        return user_data
-    
-    # 2. Get last activity per user (single query)
-    activities = supabase.table("research_briefs") \
-        .select("user_id, created_at, status") \
-        .gte("created_at", month_ago.isoformat()) \
-        .order("created_at", desc=True) \
-        .execute()
-    
-    for activity in (activities.data or []):
-        uid = activity.get("user_id")
-        if uid and uid in user_data:
-            # Update last activity (first one we see is the most recent due to ordering)
-            if user_data[uid]["last_activity"] is None:
-                user_data[uid]["last_activity"] = activity.get("created_at")
-            # Count totals and errors
-            user_data[uid]["total_count"] += 1
-            if activity.get("status") == "failed":
-                user_data[uid]["error_count"] += 1
-    
-    # 3. Get organization membership (single query)
-    org_members = supabase.table("organization_members") \
-        .select("user_id, organization_id") \
-        .execute()
-    
-    org_ids = set()
-    for member in (org_members.data or []):
-        uid = member.get("user_id")
-        org_id = member.get("organization_id")
-        if uid and uid in user_data:
-            user_data[uid]["org_id"] = org_id
-            if org_id:
-                org_ids.add(org_id)
-    
-    # 4. Get organization flow data from usage_records and subscription_plans
-    if org_ids:
-        # Get current month's flow usage from usage_records
-        current_month_start = datetime.utcnow().replace(day=1, hour=0, minute=0, second=0, microsecond=0)
-        usage_records = supabase.table("usage_records") \
-            .select("organization_id, flow_count") \
-            .in_("organization_id", list(org_ids)) \
-            .gte("period_start", current_month_start.isoformat()) \
-            .execute()
-        
-        usage_map = {ur["organization_id"]: ur.get("flow_count", 0) or 0 for ur in (usage_records.data or [])}
-        
-        # Get flow limits from subscription_plans via organization_subscriptions
-        subscriptions = supabase.table("organization_subscriptions") \
-            .select("organization_id, subscription_plans(features)") \
-            .in_("organization_id", list(org_ids)) \
-            .in_("status", ["active", "trialing"]) \
-            .execute()
-        
-        limit_map = {}
-        for sub in (subscriptions.data or []):
-            org_id = sub.get("organization_id")
-            features = (sub.get("subscription_plans") or {}).get("features") or {}
-            limit_map[org_id] = features.get("flow_limit", 2) or 2
-        
-        for uid, data in user_data.items():
-            org_id = data.get("org_id")
-            if org_id:
-                user_data[uid]["flow_count"] = usage_map.get(org_id, 0)
-                user_data[uid]["flow_limit"] = limit_map.get(org_id, 2)
-    
-    # 5. Get profile completeness (single query)
-    profiles = supabase.table("sales_profiles") \
-        .select("user_id, profile_completeness") \
-        .execute()
-    
-    for profile in (profiles.data or []):
-        uid = profile.get("user_id")
-        if uid and uid in user_data:
-            user_data[uid]["profile_completeness"] = profile.get("profile_completeness", 0) or 0
-    
-    # 6. Get failed payments per org (single query)
-    if org_ids:
-        failed_payments = supabase.table("payment_history") \
-            .select("organization_id") \
-            .eq("status", "failed") \
-            .gte("created_at", month_ago.isoformat()) \
-            .in_("organization_id", list(org_ids)) \
-            .execute()
-        
-        orgs_with_failed = {fp.get("organization_id") for fp in (failed_payments.data or [])}
-        
-        for uid, data in user_data.items():
-            if data.get("org_id") in orgs_with_failed:
-                user_data[uid]["has_failed_payment"] = True
-    
-    return user_data
-
-
-def _calculate_health_score_from_data(data: Dict[str, Any]) -> int:
-    """
-    Calculate health score from pre-fetched data.
-    
-    Scoring (start at 100, deduct for issues):
-    - Inactivity: -10 (7d), -20 (14d), -30 (30d+)
-    - Errors: -10 per 10% error rate (max -25)
-    - Low usage: -15 if <10% of limit used
-    - Incomplete profile: -10 if <50%, -5 if <80%
-    - Payment issues: -20 if has failed payment
-    """
-    score = 100
-    now = datetime.utcnow()
-    week_ago = now - timedelta(days=7)
-    two_weeks_ago = now - timedelta(days=14)
-    month_ago = now - timedelta(days=30)
-    
-    # Activity penalty
-    last_activity_str = data.get("last_activity")
-    if last_activity_str:
-        try:
-            last_active = datetime.fromisoformat(last_activity_str.replace("Z", "+00:00")).replace(tzinfo=None)
-            if last_active < month_ago:
-                score -= 30
-            elif last_active < two_weeks_ago:
-                score -= 20
-            elif last_active < week_ago:
-                score -= 10
-        except (ValueError, TypeError):
-            score -= 30  # Can't parse = assume inactive
-    else:
-        score -= 30  # No activity
-    
-    # Error rate penalty
-    total_count = data.get("total_count", 0)
-    error_count = data.get("error_count", 0)
-    if total_count > 0:
-        error_rate = error_count / total_count
-        if error_rate > 0.3:
-            score -= 25
-        elif error_rate > 0.2:
-            score -= 15
-        elif error_rate > 0.1:
-            score -= 10
-    
-    # Usage penalty
-    flow_limit = data.get("flow_limit", 0)
-    flow_count = data.get("flow_count", 0)
-    if flow_limit > 0:
-        usage_pct = flow_count / flow_limit
-        if usage_pct < 0.1:
-            score -= 15
-        elif usage_pct < 0.3:
-            score -= 10
-    
-    # Profile penalty
-    completeness = data.get("profile_completeness", 0)
-    if completeness < 50:
-        score -= 10
-    elif completeness < 80:
-        score -= 5
-    
-    # Payment penalty
-    if data.get("has_failed_payment"):
-        score -= 20
-    
-    return max(0, min(100, score))
-
-
 @router.get("/recent-activity", response_model=RecentActivityResponse)
 async def get_recent_activity(
     limit: int = 10,
@@ -7,14 +7,20 @@ Endpoints for user management in the admin panel.
 
 from fastapi import APIRouter, Depends, HTTPException, Query, Request
 from pydantic import BaseModel
-from typing import Optional, List, Any, Dict
+from typing import Optional, List, Any, Dict, Tuple
+import re
 from uuid import UUID
 from datetime import datetime
 
 from app.deps import get_admin_user, require_admin_role, AdminContext
 from app.database import get_supabase_service
+from app.services.user_health import (
+    calculate_health_score_breakdown,
+    get_health_scores,
+    get_health_status,
+)
 from .models import CamelModel
-from .utils import log_admin_action, calculate_health_score, get_health_status
+from .utils import log_admin_action
 
 router = APIRouter(prefix="/users", tags=["admin-users"])
 
@@ -183,54 +189,67 @@ async def list_users(
     
     Sorting:
     - created_at, last_active, email
+    
+    All filters are applied in the database before pagination, so pages
+    are full and total counts the matching users. Only the returned page is
+    enriched, in bulk (one query per related table).
     """
     supabase = get_supabase_service()
-    
-    # Build base query - get all users with their org membership
-    query = supabase.table("users").select(
-        "id, email, full_name, created_at",
-        count="exact"
-    )
-    
-    # Get users first
-    users_result = query.range(offset, offset + limit - 1).execute()
-    
-    if not users_result.data:
-        return UserListResponse(users=[], total=0, offset=offset, limit=limit)
-    
-    # Enrich with organization and subscription data
-    enriched_users = []
-    for user in users_result.data:
-        user_data = await _enrich_user_data(supabase, user)
-        
-        # Apply filters
-        if plan and user_data.get("plan") != plan:
-            continue
-        
-        if health_status:
-            health_data = await _get_health_data(supabase, user["id"])
-            score = calculate_health_score(health_data)
-            status = get_health_status(score)
-            if status != health_status:
-                continue
-            user_data["health_score"] = score
-            user_data["health_status"] = status
-        else:
-            health_data = await _get_health_data(supabase, user["id"])
-            score = calculate_health_score(health_data)
-            user_data["health_score"] = score
-            user_data["health_status"] = get_health_status(score)
-        
-        if search:
-            search_lower = search.lower()
-            if not (
-                search_lower in user.get("email", "").lower() or
-                search_lower in (user.get("full_name") or "").lower() or
-                search_lower in (user_data.get("organization_name") or "").lower()
-            ):
-                continue
+    descending = sort_order.lower() != "asc"
+    if sort_by not in ("created_at", "last_active", "email"):
+        sort_by = "created_at"
+    
+    term = _search_term(search) if search else None
+    
+    if not term and not plan and not health_status and sort_by != "last_active":
+        # Everything can be done on the users table: sort and paginate there,
+        # then enrich just this page
+        users_result = supabase.table("users").select(
+            "id, email, full_name, created_at",
+            count="exact"
+        ) \
+            .order(sort_by, desc=descending) \
+            .range(offset, offset + limit - 1) \
+            .execute()
         
-        enriched_users.append(AdminUserListItem(
+        page = users_result.data or []
+        total = users_result.count or 0
+    else:
+        try:
+            # Organization name, plan, health and last activity come from the
+            # admin_user_list view, so filtering, sorting and pagination still
+            # happen in the database
+            query = supabase.table("admin_user_list").select(
+                "id, email, full_name, created_at",
+                count="exact"
+            )
+            if term:
+                query = query.or_(_build_search_filter(term))
+            if plan:
+                query = query.eq("plan", plan)
+            if health_status:
+                query = query.eq("health_status", health_status)
+            
+            # Users without activity always sort last
+            users_result = query \
+                .order(sort_by, desc=descending, nullsfirst=False) \
+                .range(offset, offset + limit - 1) \
+                .execute()
+            
+            page = users_result.data or []
+            total = users_result.count or 0
+        except Exception as e:
+            print(f"admin_user_list view unavailable, filtering in memory: {e}")
+            page, total = await _filter_users_in_memory(
+                supabase, term, plan, health_status, sort_by, descending, offset, limit
+            )
+    
+    enriched = await _bulk_enrich_users(supabase, page)
+    
+    users = []
+    for user in page:
+        user_data = enriched[user["id"]]
+        users.append(AdminUserListItem(
             id=user["id"],
             email=user["email"],
             full_name=user.get("full_name"),
@@ -249,8 +268,8 @@ async def list_users(
         ))
     
     return UserListResponse(
-        users=enriched_users,
-        total=users_result.count or len(enriched_users),
+        users=users,
+        total=total,
         offset=offset,
         limit=limit
     )
@@ -290,7 +309,7 @@ async def get_user_detail(
     # Get enriched data
     user_data = await _enrich_user_data(supabase, user)
     health_data = await _get_health_data(supabase, user_id)
-    score = calculate_health_score(health_data)
+    score = get_health_scores(supabase, [user_id])[user_id]["health_score"]
     
     # Get flow packs
     packs_result = supabase.table("flow_packs") \
@@ -1002,51 +1021,15 @@ async def get_user_health_breakdown(
     """Get detailed health score breakdown for a user."""
     supabase = get_supabase_service()
     
-    health_data = await _get_health_data(supabase, user_id)
+    # Same data and calculation as the stored health score
+    health_data = get_health_scores(supabase, [user_id])[user_id]["health_data"] or {}
+    breakdown = calculate_health_score_breakdown(health_data)
     
-    # Calculate individual components (same logic as calculate_health_score but separated)
-    activity_score = 30  # Base: 30 points
-    error_score = 25  # Base: 25 points
-    usage_score = 15  # Base: 15 points
-    profile_score = 10  # Base: 10 points
-    payment_score = 20  # Base: 20 points
-    
-    # Inactivity penalty (max -30)
-    days_inactive = health_data.get("days_since_last_activity", 0)
-    if days_inactive > 30:
-        activity_score = 0
-    elif days_inactive > 14:
-        activity_score = 10
-    elif days_inactive > 7:
-        activity_score = 20
-    
-    # Error rate penalty (max -25)
-    error_rate = health_data.get("error_rate_30d", 0)
-    if error_rate > 0.3:
-        error_score = 0
-    elif error_rate > 0.2:
-        error_score = 10
-    elif error_rate > 0.1:
-        error_score = 15
-    
-    # Low usage penalty (max -15) - only for paid plans
-    if health_data.get("plan") != "free":
-        usage_percent = health_data.get("flow_usage_percent", 0)
-        if usage_percent < 0.1:
-            usage_score = 0
-        elif usage_percent < 0.3:
-            usage_score = 5
-    
-    # Incomplete profile penalty (max -10)
-    profile_completeness = health_data.get("profile_completeness", 0)
-    if profile_completeness < 50:
-        profile_score = 0
-    elif profile_completeness < 80:
-        profile_score = 5
-    
-    # Payment issues penalty (max -20)
-    if health_data.get("has_failed_payment"):
-        payment_score = 0
+    activity_score = breakdown["activity_score"]
+    error_score = breakdown["error_score"]
+    usage_score = breakdown["usage_score"]
+    profile_score = breakdown["profile_score"]
+    payment_score = breakdown["payment_score"]
     
     total_score = activity_score + error_score + usage_score + profile_score + payment_score
     
@@ -1385,3 +1368,206 @@ async def _get_health_data(supabase, user_id: str) -> dict:
     
     return health_data
 
+
+
+# Batch size for in_() filters (keeps request URLs well below server limits)
+_BULK_BATCH_SIZE = 100
+
+# Page size when scanning users (PostgREST caps responses at 1000 rows)
+_USER_SCAN_PAGE_SIZE = 1000
+
+
+def _search_term(search: str) -> Optional[str]:
+    """Strip characters with a meaning in PostgREST filter syntax from a search."""
+    term = re.sub(r'[,()*%"\\]', " ", search).strip()
+    return term or None
+
+
+def _build_search_filter(term: str) -> str:
+    """Build a PostgREST or() filter on admin_user_list matching email, name or organization name."""
+    return ",".join(
+        f'{column}.ilike."*{term}*"'
+        for column in ("email", "full_name", "organization_name")
+    )
+
+
+def _fetch_users(supabase) -> List[dict]:
+    """Fetch all users, newest first."""
+    users = []
+    start = 0
+    while True:
+        result = supabase.table("users") \
+            .select("id, email, full_name, created_at") \
+            .order("created_at", desc=True) \
+            .range(start, start + _USER_SCAN_PAGE_SIZE - 1) \
+            .execute()
+        
+        rows = result.data or []
+        users.extend(rows)
+        if len(rows) < _USER_SCAN_PAGE_SIZE:
+            return users
+        start += _USER_SCAN_PAGE_SIZE
+
+
+async def _filter_users_in_memory(
+    supabase,
+    term: Optional[str],
+    plan: Optional[str],
+    health_status: Optional[str],
+    sort_by: str,
+    descending: bool,
+    offset: int,
+    limit: int
+) -> Tuple[List[dict], int]:
+    """
+    Filter, sort and paginate users on enriched data (without the admin_user_list view).
+    
+    Enriches every user, so only used until the view is migrated. The
+    search is matched here too (on the enriched organization name), rather
+    than expanding organization matches into user ID filters.
+    
+    Returns: (page of users, total matching users)
+    """
+    candidates = _fetch_users(supabase)
+    enriched = await _bulk_enrich_users(supabase, candidates)
+    
+    def matches_search(user: dict) -> bool:
+        needle = term.lower()
+        return any(
+            needle in (value or "").lower()
+            for value in (user["email"], user.get("full_name"), enriched[user["id"]]["organization_name"])
+        )
+    
+    matching = [
+        user for user in candidates
+        if (not term or matches_search(user))
+        and (not plan or enriched[user["id"]]["plan"] == plan)
+        and (not health_status or enriched[user["id"]]["health_status"] == health_status)
+    ]
+    
+    if sort_by == "last_active":
+        # Users without activity always sort last
+        active = [u for u in matching if enriched[u["id"]]["last_active"]]
+        inactive = [u for u in matching if not enriched[u["id"]]["last_active"]]
+        active.sort(key=lambda u: enriched[u["id"]]["last_active"], reverse=descending)
+        matching = active + inactive
+    elif sort_by == "email":
+        matching.sort(key=lambda u: u["email"], reverse=descending)
+    elif not descending:
+        matching.reverse()
+    
+    return matching[offset:offset + limit], len(matching)
+
+
+async def _bulk_enrich_users(supabase, users: List[dict]) -> Dict[str, dict]:
+    """
+    Bulk version of _enrich_user_data plus health score, for list views.
+    
+    Runs one query per related table for each batch of users instead of
+    several queries per user.
+    
+    Returns: Dict[user_id, user_data] (same keys as _enrich_user_data,
+    plus health_score and health_status)
+    """
+    enriched: Dict[str, dict] = {}
+    
+    for i in range(0, len(users), _BULK_BATCH_SIZE):
+        batch = users[i:i + _BULK_BATCH_SIZE]
+        user_ids = [u["id"] for u in batch]
+        
+        for user_id in user_ids:
+            enriched[user_id] = {
+                "organization_id": None,
+                "organization_name": None,
+                "plan": "free",
+                "flow_count": 0,
+                "flow_limit": 2,
+                "pack_balance": 0,
+                "subscription_status": None,
+                "stripe_customer_id": None,
+                "trial_ends_at": None,
+                "last_active": None
+            }
+        
+        try:
+            # Organization membership (first membership per user)
+            members_result = supabase.table("organization_members") \
+                .select("user_id, organization_id, organizations(name)") \
+                .in_("user_id", user_ids) \
+                .order("created_at") \
+                .execute()
+            
+            user_org: Dict[str, str] = {}
+            for member in (members_result.data or []):
+                user_id = member["user_id"]
+                if user_id in user_org:
+                    continue
+                user_org[user_id] = member["organization_id"]
+                enriched[user_id]["organization_id"] = member["organization_id"]
+                enriched[user_id]["organization_name"] = (member.get("organizations") or {}).get("name")
+            
+            org_ids = sorted(set(user_org.values()))
+            org_data: Dict[str, dict] = {org_id: {} for org_id in org_ids}
+            
+            if org_ids:
+                # Subscriptions
+                subs_result = supabase.table("organization_subscriptions") \
+                    .select("organization_id, plan_id, status, stripe_customer_id, trial_ends_at, subscription_plans(features)") \
+                    .in_("organization_id", org_ids) \
+                    .execute()
+                
+                for sub in (subs_result.data or []):
+                    data = org_data[sub["organization_id"]]
+                    data["plan"] = sub.get("plan_id", "free")
+                    data["subscription_status"] = sub.get("status")
+                    data["stripe_customer_id"] = sub.get("stripe_customer_id")
+                    data["trial_ends_at"] = sub.get("trial_ends_at")
+                    if sub.get("subscription_plans"):
+                        data["flow_limit"] = (sub["subscription_plans"].get("features") or {}).get("flow_limit", 2)
+                
+                # Usage this month
+                usage_result = supabase.table("usage_records") \
+                    .select("organization_id, flow_count") \
+                    .in_("organization_id", org_ids) \
+                    .gte("period_start", datetime.utcnow().replace(day=1).isoformat()) \
+                    .execute()
+                
+                for usage in (usage_result.data or []):
+                    org_data[usage["organization_id"]]["flow_count"] = usage.get("flow_count", 0)
+                
+                # Flow pack balance
+                packs_result = supabase.table("flow_packs") \
+                    .select("organization_id, flows_remaining") \
+                    .in_("organization_id", org_ids) \
+                    .eq("status", "active") \
+                    .execute()
+                
+                for pack in (packs_result.data or []):
+                    data = org_data[pack["organization_id"]]
+                    data["pack_balance"] = data.get("pack_balance", 0) + (pack.get("flows_remaining") or 0)
+                
+                # Last activity (latest prospect_activities row per organization)
+                activity_result = supabase.table("organizations") \
+                    .select("id, prospect_activities(created_at)") \
+                    .in_("id", org_ids) \
+                    .order("created_at", desc=True, foreign_table="prospect_activities") \
+                    .limit(1, foreign_table="prospect_activities") \
+                    .execute()
+                
+                for org in (activity_result.data or []):
+                    activities = org.get("prospect_activities") or []
+                    if activities:
+                        org_data[org["id"]]["last_active"] = activities[0].get("created_at")
+            
+            for user_id, org_id in user_org.items():
+                enriched[user_id].update(org_data[org_id])
+        except Exception as e:
+            # Log but don't fail - return basic user data
+            print(f"Error bulk enriching user data: {e}")
+        
+        # Health scores from the snapshot (missing ones are computed and stored)
+        for user_id, row in get_health_scores(supabase, user_ids).items():
+            enriched[user_id]["health_score"] = row["health_score"]
+            enriched[user_id]["health_status"] = row["health_status"]
+    
+    return enriched
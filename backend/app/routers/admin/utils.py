@@ -4,7 +4,6 @@ Admin Panel Utilities
 
 Shared utilities for admin panel endpoints including:
 - Audit logging
-- Health score calculation
 - Common queries
 """
 
@@ -73,89 +72,6 @@ async def log_admin_action(
         print(f"Failed to log admin action: {e}")
 
 
-# ============================================================
-# Health Score Calculation
-# ============================================================
-
-def calculate_health_score(user_data: Dict[str, Any]) -> int:
-    """
-    Calculate user health score based on activity and success metrics.
-    
-    Scoring:
-    - Base: 100 points
-    - Deductions for various issues
-    - Minimum: 0, Maximum: 100
-    
-    Args:
-        user_data: Dict with keys:
-            - plan: Subscription plan
-            - days_since_last_activity: Days since last activity
-            - error_count_30d: Errors in last 30 days
-            - flow_usage_percent: Usage as percentage (0-1)
-            - profile_completeness: Profile completeness (0-100)
-            - has_failed_payment: Whether payment has failed
-    
-    Returns:
-        Health score from 0-100
-    """
-    score = 100
-    
-    # Inactivity penalty (max -30)
-    days_inactive = user_data.get("days_since_last_activity", 0)
-    if days_inactive > 30:
-        score -= 30
-    elif days_inactive > 14:
-        score -= 20
-    elif days_inactive > 7:
-        score -= 10
-    
-    # Error rate penalty (max -25)
-    error_count = user_data.get("error_count_30d", 0)
-    if error_count > 10:
-        score -= 25
-    elif error_count > 5:
-        score -= 15
-    elif error_count > 2:
-        score -= 10
-    
-    # Low usage penalty (max -15) - only for paid plans
-    plan = user_data.get("plan", "free")
-    if plan != "free":
-        usage_percent = user_data.get("flow_usage_percent", 0)
-        if usage_percent < 0.1:
-            score -= 15
-        elif usage_percent < 0.3:
-            score -= 10
-    
-    # Incomplete profile penalty (max -10)
-    profile_completeness = user_data.get("profile_completeness", 0)
-    if profile_completeness < 50:
-        score -= 10
-    elif profile_completeness < 80:
-        score -= 5
-    
-    # Payment issues penalty (max -20)
-    if user_data.get("has_failed_payment"):
-        score -= 20
-    
-    return max(0, min(100, score))
-
-
-def get_health_status(score: int) -> str:
-    """
-    Get health status label from score.
-    
-    Returns:
-        'healthy' (80-100), 'at_risk' (50-79), or 'critical' (0-49)
-    """
-    if score >= 80:
-        return "healthy"
-    elif score >= 50:
-        return "at_risk"
-    else:
-        return "critical"
-
-
 # ============================================================
 # Common Queries
 # ============================================================
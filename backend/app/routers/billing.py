@@ -10,7 +10,7 @@ from fastapi import APIRouter, HTTPException, Depends
 from pydantic import BaseModel
 from typing import Optional, List, Dict, Any
 
-from app.deps import get_current_user
+from app.deps import get_current_user, get_org_membership_async
 from app.database import get_supabase_service
 from app.services.subscription_service import get_subscription_service
 from app.services.usage_service import get_usage_service
@@ -115,14 +115,12 @@ class PlanResponse(BaseModel):
 
 async def get_user_organization(user_id: str) -> str:
     """Get organization ID for a user"""
-    response = supabase.table("organization_members").select(
-        "organization_id"
-    ).eq("user_id", user_id).limit(1).execute()
+    membership = await get_org_membership_async(user_id)
     
-    if not response.data:
+    if not membership:
         raise HTTPException(status_code=404, detail="User not in any organization")
     
-    return response.data[0]["organization_id"]
+    return membership.organization_id
 
 
 async def get_user_email(user_id: str) -> str:
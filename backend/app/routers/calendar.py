@@ -235,6 +235,7 @@ async def google_auth_callback(
             "email": email,
             "sync_enabled": True,
             "needs_reauth": False,
+            "sync_token": None,  # (Re)connecting starts with a full sync
         }
         
         if existing.data and len(existing.data) > 0:
@@ -260,7 +261,7 @@ async def google_auth_callback(
         connection_id = result.data[0]["id"]
         await send_event(
             Events.CALENDAR_SYNC_REQUESTED,
-            {"connection_id": connection_id}
+            {"connection_id": connection_id, "provider": "google"}
         )
         logger.info(f"Triggered initial sync for connection {connection_id[:8]}...")
         
@@ -366,6 +367,7 @@ async def microsoft_auth_callback(
             "email": email,
             "sync_enabled": True,
             "needs_reauth": False,
+            "sync_token": None,  # (Re)connecting starts with a full sync
         }
         
         if existing.data and len(existing.data) > 0:
@@ -391,7 +393,7 @@ async def microsoft_auth_callback(
         connection_id = result.data[0]["id"]
         await send_event(
             Events.CALENDAR_SYNC_REQUESTED,
-            {"connection_id": connection_id}
+            {"connection_id": connection_id, "provider": "microsoft"}
         )
         logger.info(f"Triggered initial sync for Microsoft connection {connection_id[:8]}...")
         
@@ -518,7 +520,7 @@ async def trigger_calendar_sync(
     
     try:
         # Sync all user calendars
-        results = calendar_sync_service.sync_user_calendars(user_id)
+        results = await calendar_sync_service.sync_user_calendars(user_id)
         
         # Aggregate results
         total_synced = 0
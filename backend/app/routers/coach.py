@@ -13,8 +13,8 @@ import uuid
 from slowapi import Limiter
 from slowapi.util import get_remote_address
 
-from app.deps import get_current_user
-from app.database import get_supabase_service
+from app.deps import get_current_user, get_org_membership_async
+from app.database import get_supabase_service, get_supabase_async
 
 # Rate limiter
 limiter = Limiter(key_func=get_remote_address)
@@ -32,6 +32,11 @@ from app.models.coach import (
     UserContext,
 )
 from app.services.coach_rules import rule_engine, build_user_context
+from app.services.coach_suggestion_state import (
+    refresh_user_suggestions,
+    suggestion_from_row,
+    use_materialized_suggestions,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -45,11 +50,11 @@ router = APIRouter(prefix="/api/v1/coach", tags=["coach"])
 @router.get("/settings", response_model=CoachSettings)
 async def get_settings(current_user: dict = Depends(get_current_user)):
     """Get the current user's coach settings."""
-    supabase = get_supabase_service()
+    supabase = await get_supabase_async()
     user_id = current_user["sub"]
     
     try:
-        result = supabase.table("coach_settings") \
+        result = await supabase.table("coach_settings") \
             .select("*") \
             .eq("user_id", user_id) \
             .execute()
@@ -59,12 +64,9 @@ async def get_settings(current_user: dict = Depends(get_current_user)):
             return CoachSettings(**settings_data)
         
         # Create default settings if not exist
-        org_result = supabase.table("organization_members") \
-            .select("organization_id") \
-            .eq("user_id", user_id) \
-            .execute()
+        membership = await get_org_membership_async(user_id)
         
-        if not org_result.data:
+        if not membership:
             # Return default settings for users without organization
             return CoachSettings(
                 id=str(uuid.uuid4()),
@@ -89,7 +91,7 @@ async def get_settings(current_user: dict = Depends(get_current_user)):
             "dismissed_tip_ids": [],
         }
         
-        insert_result = supabase.table("coach_settings") \
+        insert_result = await supabase.table("coach_settings") \
             .insert(new_settings) \
             .execute()
         
@@ -111,14 +113,14 @@ async def update_settings(
     current_user: dict = Depends(get_current_user)
 ):
     """Update the current user's coach settings."""
-    supabase = get_supabase_service()
+    supabase = await get_supabase_async()
     user_id = current_user["sub"]
     
     # Debug: log what we received
     
     try:
         # Check if settings exist
-        existing_result = supabase.table("coach_settings") \
+        existing_result = await supabase.table("coach_settings") \
             .select("*") \
             .eq("user_id", user_id) \
             .execute()
@@ -129,7 +131,7 @@ async def update_settings(
         if existing_result.data:
             # Update existing settings
             update_data["updated_at"] = datetime.now().isoformat()
-            result = supabase.table("coach_settings") \
+            result = await supabase.table("coach_settings") \
                 .update(update_data) \
                 .eq("user_id", user_id) \
                 .execute()
@@ -146,7 +148,7 @@ async def update_settings(
             update_data.setdefault("widget_state", "minimized")
             update_data.setdefault("dismissed_tip_ids", [])
             
-            result = supabase.table("coach_settings") \
+            result = await supabase.table("coach_settings") \
                 .insert(update_data) \
                 .execute()
         
@@ -172,7 +174,7 @@ async def get_suggestions(
     current_user: dict = Depends(get_current_user)
 ):
     """Get prioritized suggestions for the current user."""
-    supabase = get_supabase_service()
+    supabase = await get_supabase_async()
     user_id = current_user["sub"]
     
     try:
@@ -188,14 +190,10 @@ async def get_suggestions(
             primary_org_id = jwt_org_id
         
         # 2. Get from organization_members (primary source)
-        org_members_result = supabase.table("organization_members") \
-            .select("organization_id") \
-            .eq("user_id", user_id) \
-            .execute()
+        membership = await get_org_membership_async(user_id)
         
-        if org_members_result.data:
-            for member in org_members_result.data:
-                member_org_id = member["organization_id"]
+        if membership:
+            for member_org_id in membership.organization_ids:
                 if member_org_id not in organization_ids:
                     organization_ids.append(member_org_id)
                 if not primary_org_id:
@@ -232,18 +230,47 @@ async def get_suggestions(
                 count=1,
                 has_priority=True,
             )
-        
-        
+
+        # Materialized mode: suggestions are kept up to date by lifecycle
+        # events, so serving them is a single indexed read
+        if use_materialized_suggestions():
+            # No state yet (first visit) or dropped because a change couldn't
+            # be reported (see notify_suggestions_changed) - evaluate now
+            state_result = await supabase.table("coach_suggestion_state") \
+                .select("user_id") \
+                .eq("user_id", user_id) \
+                .execute()
+
+            if not state_result.data:
+                await refresh_user_suggestions(supabase, user_id, organization_ids)
+
+            pending_result = await supabase.table("coach_suggestions") \
+                .select("*") \
+                .eq("user_id", user_id) \
+                .is_("action_taken", "null") \
+                .order("priority", desc=True) \
+                .limit(limit) \
+                .execute()
+
+            response_suggestions = [
+                suggestion_from_row(row) for row in (pending_result.data or [])
+            ]
+            return SuggestionsResponse(
+                suggestions=response_suggestions,
+                count=len(response_suggestions),
+                has_priority=any(s.priority >= 80 for s in response_suggestions),
+            )
+
         # First, check for existing suggestions (snoozed or pending)
         now = datetime.now()
-        existing_result = supabase.table("coach_suggestions") \
+        existing_result = await supabase.table("coach_suggestions") \
             .select("*") \
             .eq("user_id", user_id) \
             .is_("action_taken", "null") \
             .execute()
         
         # Also get snoozed suggestions that haven't expired
-        snoozed_result = supabase.table("coach_suggestions") \
+        snoozed_result = await supabase.table("coach_suggestions") \
             .select("*") \
             .eq("user_id", user_id) \
             .eq("action_taken", "snoozed") \
@@ -327,7 +354,7 @@ async def get_suggestions(
                     "shown_at": datetime.now().isoformat(),
                 }
                 
-                insert_result = supabase.table("coach_suggestions") \
+                insert_result = await supabase.table("coach_suggestions") \
                     .insert(suggestion_data) \
                     .execute()
                 
@@ -386,12 +413,12 @@ async def record_suggestion_action(
     current_user: dict = Depends(get_current_user)
 ):
     """Record user action on a suggestion (clicked, dismissed, snoozed)."""
-    supabase = get_supabase_service()
+    supabase = await get_supabase_async()
     user_id = current_user["sub"]
     
     try:
         # Verify ownership
-        check_result = supabase.table("coach_suggestions") \
+        check_result = await supabase.table("coach_suggestions") \
             .select("id") \
             .eq("id", suggestion_id) \
             .eq("user_id", user_id) \
@@ -412,7 +439,7 @@ async def record_suggestion_action(
         if action_request.feedback_rating:
             update_data["feedback_rating"] = action_request.feedback_rating
         
-        result = supabase.table("coach_suggestions") \
+        result = await supabase.table("coach_suggestions") \
             .update(update_data) \
             .eq("id", suggestion_id) \
             .execute()
@@ -421,16 +448,13 @@ async def record_suggestion_action(
             raise HTTPException(status_code=500, detail="Failed to update suggestion")
         
         # Also record as behavior event for pattern learning
-        org_result = supabase.table("organization_members") \
-            .select("organization_id") \
-            .eq("user_id", user_id) \
-            .execute()
+        membership = await get_org_membership_async(user_id)
         
-        if org_result.data:
+        if membership:
             event_type = f"suggestion_{action_request.action.value}"
-            supabase.table("coach_behavior_events").insert({
+            await supabase.table("coach_behavior_events").insert({
                 "user_id": user_id,
-                "organization_id": org_result.data[0]["organization_id"],
+                "organization_id": membership.organization_id,
                 "event_type": event_type,
                 "event_data": {"suggestion_id": suggestion_id},
             }).execute()
@@ -449,12 +473,12 @@ async def reset_snoozed_suggestions(
     current_user: dict = Depends(get_current_user)
 ):
     """Reset all snoozed suggestions AND enable coach for the current user."""
-    supabase = get_supabase_service()
+    supabase = await get_supabase_async()
     user_id = current_user["sub"]
     
     try:
         # 1. Clear snooze_until and action_taken for all snoozed suggestions
-        result = supabase.table("coach_suggestions") \
+        result = await supabase.table("coach_suggestions") \
             .update({
                 "action_taken": None,
                 "action_taken_at": None,
@@ -468,7 +492,7 @@ async def reset_snoozed_suggestions(
         logger.info(f"Reset {reset_count} snoozed suggestions for user {user_id}")
         
         # 2. Force enable the coach and set widget to minimized
-        settings_result = supabase.table("coach_settings") \
+        settings_result = await supabase.table("coach_settings") \
             .update({
                 "is_enabled": True,
                 "widget_state": "minimized",
@@ -481,7 +505,7 @@ async def reset_snoozed_suggestions(
             logger.info(f"Enabled coach for user {user_id}: is_enabled=True, widget_state=minimized")
         else:
             # Create new settings if they don't exist
-            supabase.table("coach_settings") \
+            await supabase.table("coach_settings") \
                 .insert({
                     "user_id": user_id,
                     "is_enabled": True,
@@ -541,29 +565,26 @@ async def record_event(
     current_user: dict = Depends(get_current_user)
 ):
     """Record a behavior event for pattern learning."""
-    supabase = get_supabase_service()
+    supabase = await get_supabase_async()
     user_id = current_user["sub"]
     
     try:
         # Get organization ID
-        org_result = supabase.table("organization_members") \
-            .select("organization_id") \
-            .eq("user_id", user_id) \
-            .execute()
+        membership = await get_org_membership_async(user_id)
         
         # Silently skip if user has no organization (new users)
-        if not org_result.data:
+        if not membership:
             return {"success": True, "event_id": None, "message": "Skipped - no organization"}
         
         event_data = {
             "user_id": user_id,
-            "organization_id": org_result.data[0]["organization_id"],
+            "organization_id": membership.organization_id,
             "event_type": event.event_type.value,
             "event_data": event.event_data,
             "page_context": event.page_context,
         }
         
-        result = supabase.table("coach_behavior_events") \
+        result = await supabase.table("coach_behavior_events") \
             .insert(event_data) \
             .execute()
         
@@ -586,11 +607,11 @@ async def record_event(
 @router.get("/patterns", response_model=PatternsResponse)
 async def get_patterns(current_user: dict = Depends(get_current_user)):
     """Get learned patterns for the current user."""
-    supabase = get_supabase_service()
+    supabase = await get_supabase_async()
     user_id = current_user["sub"]
     
     try:
-        result = supabase.table("coach_user_patterns") \
+        result = await supabase.table("coach_user_patterns") \
             .select("*") \
             .eq("user_id", user_id) \
             .execute()
@@ -609,31 +630,28 @@ async def get_patterns(current_user: dict = Depends(get_current_user)):
 @router.get("/stats", response_model=CoachStatsResponse)
 async def get_stats(current_user: dict = Depends(get_current_user)):
     """Get today's progress stats for the current user."""
-    supabase = get_supabase_service()
+    supabase = await get_supabase_async()
     user_id = current_user["sub"]
     
     try:
         # Get organization ID
-        org_result = supabase.table("organization_members") \
-            .select("organization_id") \
-            .eq("user_id", user_id) \
-            .execute()
+        membership = await get_org_membership_async(user_id)
         
         # Return empty stats for users without organization
-        if not org_result.data:
+        if not membership:
             return CoachStatsResponse(
                 today=TodayStats(),
                 suggestions_pending=0,
                 patterns_learned=0,
             )
         
-        organization_id = org_result.data[0]["organization_id"]
+        organization_id = membership.organization_id
         today_start = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0).isoformat()
         
         stats = TodayStats()
         
         # Count research completed today
-        research_result = supabase.table("research_briefs") \
+        research_result = await supabase.table("research_briefs") \
             .select("id", count="exact") \
             .eq("organization_id", organization_id) \
             .eq("status", "completed") \
@@ -642,7 +660,7 @@ async def get_stats(current_user: dict = Depends(get_current_user)):
         stats.research_completed = research_result.count or 0
         
         # Count preps completed today
-        preps_result = supabase.table("meeting_preps") \
+        preps_result = await supabase.table("meeting_preps") \
             .select("id", count="exact") \
             .eq("organization_id", organization_id) \
             .eq("status", "completed") \
@@ -651,7 +669,7 @@ async def get_stats(current_user: dict = Depends(get_current_user)):
         stats.preps_completed = preps_result.count or 0
         
         # Count follow-ups completed today
-        followups_result = supabase.table("followups") \
+        followups_result = await supabase.table("followups") \
             .select("id", count="exact") \
             .eq("organization_id", organization_id) \
             .eq("status", "completed") \
@@ -660,7 +678,7 @@ async def get_stats(current_user: dict = Depends(get_current_user)):
         stats.followups_completed = followups_result.count or 0
         
         # Count actions generated today
-        actions_result = supabase.table("followup_actions") \
+        actions_result = await supabase.table("followup_actions") \
             .select("id", count="exact") \
             .eq("organization_id", organization_id) \
             .gte("created_at", today_start) \
@@ -675,14 +693,14 @@ async def get_stats(current_user: dict = Depends(get_current_user)):
         )
         
         # Count pending suggestions
-        suggestions_result = supabase.table("coach_suggestions") \
+        suggestions_result = await supabase.table("coach_suggestions") \
             .select("id", count="exact") \
             .eq("user_id", user_id) \
             .is_("action_taken", "null") \
             .execute()
         
         # Count learned patterns
-        patterns_result = supabase.table("coach_user_patterns") \
+        patterns_result = await supabase.table("coach_user_patterns") \
             .select("id", count="exact") \
             .eq("user_id", user_id) \
             .execute()
@@ -710,12 +728,12 @@ async def get_inline_suggestions(
     current_user: dict = Depends(get_current_user)
 ):
     """Get contextual inline suggestions for a specific page."""
-    supabase = get_supabase_service()
+    supabase = await get_supabase_async()
     user_id = current_user["sub"]
     
     try:
         # Check if user has inline tips enabled
-        settings_result = supabase.table("coach_settings") \
+        settings_result = await supabase.table("coach_settings") \
             .select("show_inline_tips, dismissed_tip_ids") \
             .eq("user_id", user_id) \
             .execute()
@@ -795,15 +813,8 @@ async def get_tip_of_day(
     
     try:
         # Get organization IDs from organization_members (single source of truth)
-        organization_ids = []
-        
-        org_members = supabase.table("organization_members") \
-            .select("organization_id") \
-            .eq("user_id", user_id) \
-            .execute()
-        for member in (org_members.data or []):
-            if member["organization_id"] not in organization_ids:
-                organization_ids.append(member["organization_id"])
+        membership = await get_org_membership_async(user_id)
+        organization_ids = list(membership.organization_ids) if membership else []
         
         # Get user activity context (includes seller context)
         context = await get_user_activity_context(supabase, user_id, organization_ids)
@@ -832,13 +843,9 @@ async def get_success_patterns(request: Request, current_user: dict = Depends(ge
         # Get primary organization ID from organization_members (single source of truth)
         organization_id = None
         
-        org_members = supabase.table("organization_members") \
-            .select("organization_id") \
-            .eq("user_id", user_id) \
-            .limit(1) \
-            .execute()
-        if org_members.data:
-            organization_id = org_members.data[0]["organization_id"]
+        membership = await get_org_membership_async(user_id)
+        if membership:
+            organization_id = membership.organization_id
         
         if not organization_id:
             return {"patterns": {}, "score": 0, "recommendations": []}
@@ -873,15 +880,8 @@ async def get_predictions(request: Request, current_user: dict = Depends(get_cur
     
     try:
         # Get organization IDs from organization_members (single source of truth)
-        organization_ids = []
-        
-        org_members = supabase.table("organization_members") \
-            .select("organization_id") \
-            .eq("user_id", user_id) \
-            .execute()
-        for member in (org_members.data or []):
-            if member["organization_id"] not in organization_ids:
-                organization_ids.append(member["organization_id"])
+        membership = await get_org_membership_async(user_id)
+        organization_ids = list(membership.organization_ids) if membership else []
         
         if not organization_ids:
             return {"predictions": [], "count": 0}
@@ -5,7 +5,7 @@ from fastapi import APIRouter, Depends, HTTPException, status
 from pydantic import BaseModel, Field
 from typing import Optional, Dict, Any, List
 import uuid
-from app.deps import get_current_user
+from app.deps import get_current_user, get_org_membership, get_org_membership_async, invalidate_org_membership
 from app.database import get_supabase_service
 from app.services.profile_service import ProfileService
 from app.services.company_interview_service import get_company_interview_service
@@ -192,9 +192,9 @@ def check_admin_access(current_user: dict) -> str:
     # If no org_id in token, get from organization_members (single source of truth)
     if not organization_id:
         user_id = current_user.get("sub")
-        result = supabase.table("organization_members").select("organization_id").eq("user_id", user_id).limit(1).execute()
-        if result.data and len(result.data) > 0:
-            organization_id = result.data[0]["organization_id"]
+        membership = get_org_membership(user_id)
+        if membership:
+            organization_id = membership.organization_id
         else:
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
@@ -304,10 +304,10 @@ async def complete_company_interview(
         organization_id = current_user.get("organization_id")
         if not organization_id:
             # Get from organization_members
-            org_member_result = supabase.table("organization_members").select("organization_id").eq("user_id", user_id).limit(1).execute()
+            membership = await get_org_membership_async(user_id)
             
-            if org_member_result.data and len(org_member_result.data) > 0:
-                organization_id = org_member_result.data[0]["organization_id"]
+            if membership:
+                organization_id = membership.organization_id
             else:
                 # User not in any organization - create one and add them
                 email = current_user.get('email', 'User')
@@ -329,6 +329,7 @@ async def complete_company_interview(
                     "organization_id": organization_id,
                     "role": "owner"
                 }).execute()
+                invalidate_org_membership(user_id)
                 print(f"DEBUG: Created organization {organization_id} and added user {user_id}")
         
         # Check if company profile exists - upsert logic
@@ -455,9 +456,9 @@ async def get_company_profile(
         # If no org_id in token, get from organization_members (single source of truth)
         if not organization_id:
             user_id = current_user.get("sub")
-            result = supabase.table("organization_members").select("organization_id").eq("user_id", user_id).limit(1).execute()
-            if result.data and len(result.data) > 0:
-                organization_id = result.data[0]["organization_id"]
+            membership = await get_org_membership_async(user_id)
+            if membership:
+                organization_id = membership.organization_id
             else:
                 raise HTTPException(
                     status_code=status.HTTP_404_NOT_FOUND,
@@ -598,9 +599,9 @@ async def check_company_profile_exists(
         # If no org_id in token, get from organization_members (single source of truth)
         if not organization_id:
             user_id = current_user.get("sub")
-            result = supabase.table("organization_members").select("organization_id").eq("user_id", user_id).limit(1).execute()
-            if result.data and len(result.data) > 0:
-                organization_id = result.data[0]["organization_id"]
+            membership = await get_org_membership_async(user_id)
+            if membership:
+                organization_id = membership.organization_id
             else:
                 return {
                     "exists": False,
@@ -20,13 +20,14 @@ from uuid import uuid4
 from fastapi import APIRouter, HTTPException, Depends, BackgroundTasks
 from pydantic import BaseModel
 
-from app.deps import get_current_user
+from app.deps import get_current_user, get_org_membership
 from app.database import get_supabase_service
 from app.services.contact_analyzer import get_contact_analyzer
 from app.services.contact_search import get_contact_search_service, ContactMatch as ContactMatchModel
 
 # Inngest integration
 from app.inngest.events import send_event, use_inngest_for, Events
+from app.services.coach_suggestion_state import notify_suggestions_changed
 
 logger = logging.getLogger(__name__)
 
@@ -132,15 +133,12 @@ class ContactSearchResponse(BaseModel):
 
 def get_organization_id(user_id: str) -> str:
     """Get organization ID for user."""
-    response = supabase_service.table("organization_members")\
-        .select("organization_id")\
-        .eq("user_id", user_id)\
-        .execute()
+    membership = get_org_membership(user_id)
     
-    if not response.data:
+    if not membership:
         raise HTTPException(status_code=403, detail="User not in any organization")
     
-    return response.data[0]["organization_id"]
+    return membership.organization_id
 
 
 def get_prospect_id_from_research(research_id: str, organization_id: str) -> str:
@@ -558,6 +556,7 @@ async def add_contact_to_research(
         created_contact = result.data[0]
         
         # Start analysis via Inngest (if enabled) or BackgroundTasks (fallback)
+        event_sent = False
         if use_inngest_for("contacts"):
             event_sent = await send_event(
                 Events.CONTACT_ADDED,
@@ -614,6 +613,15 @@ async def add_contact_to_research(
             )
             logger.info(f"Contact {contact_id} analysis triggered via BackgroundTasks")
         
+        if not event_sent:
+            # CONTACT_ADDED would also start the Inngest analysis, so only
+            # ask for a coach suggestion refresh
+            background_tasks.add_task(
+                notify_suggestions_changed,
+                Events.COACH_SUGGESTIONS_REFRESH,
+                {"user_id": user_id, "organization_id": organization_id}
+            )
+        
         return ContactResponse(
             id=created_contact["id"],
             prospect_id=created_contact["prospect_id"],
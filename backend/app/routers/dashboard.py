@@ -10,7 +10,7 @@ from typing import List, Optional
 from datetime import datetime
 import logging
 
-from app.deps import get_current_user
+from app.deps import get_current_user, get_org_membership_async
 from app.database import get_supabase_service
 
 logger = logging.getLogger(__name__)
@@ -31,16 +31,12 @@ async def get_recent_activity(
     
     try:
         # Get organization ID
-        org_result = supabase.table("organization_members") \
-            .select("organization_id") \
-            .eq("user_id", user_id) \
-            .limit(1) \
-            .execute()
+        membership = await get_org_membership_async(user_id)
         
-        if not org_result.data:
+        if not membership:
             return {"activities": [], "count": 0}
         
-        organization_id = org_result.data[0]["organization_id"]
+        organization_id = membership.organization_id
         
         activities = []
         
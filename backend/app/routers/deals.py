@@ -18,7 +18,7 @@ from ..models.deals import (
     ProspectHub, ProspectHubSummary
 )
 from ..database import get_supabase_service, get_user_client
-from ..deps import get_current_user, get_auth_token
+from ..deps import get_current_user, get_auth_token, get_org_membership_async
 
 router = APIRouter(prefix="/api/v1/deals", tags=["deals"])
 
@@ -34,12 +34,12 @@ async def get_user_org(user: dict, supabase) -> tuple[str, str]:
         raise HTTPException(status_code=401, detail="Invalid user token")
     
     # Get organization
-    org_result = supabase.table("organization_members").select("organization_id").eq("user_id", user_id).limit(1).execute()
+    membership = await get_org_membership_async(user_id)
     
-    if not org_result.data:
+    if not membership:
         raise HTTPException(status_code=403, detail="User has no organization")
     
-    return user_id, org_result.data[0]["organization_id"]
+    return user_id, membership.organization_id
 
 
 # ============================================================
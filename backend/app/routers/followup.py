@@ -14,8 +14,8 @@ import asyncio
 from slowapi import Limiter
 from slowapi.util import get_remote_address
 
-from app.deps import get_current_user
-from app.database import get_supabase_service
+from app.deps import get_current_user, get_org_membership_async
+from app.database import get_supabase_service, get_supabase_async
 
 # Rate limiter
 limiter = Limiter(key_func=get_remote_address)
@@ -28,6 +28,7 @@ from app.services.usage_service import get_usage_service
 
 # Inngest integration
 from app.inngest.events import send_event, use_inngest_for, Events
+from app.services.coach_suggestion_state import notify_suggestions_changed
 
 logger = logging.getLogger(__name__)
 
@@ -257,6 +258,15 @@ async def _process_followup_async(
         
         logger.info(f"Successfully processed followup {followup_id}")
         
+        # Same completion event as the Inngest workflow
+        await notify_suggestions_changed(Events.FOLLOWUP_COMPLETED, {
+            "followup_id": followup_id,
+            "prospect_company": prospect_company,
+            "organization_id": organization_id,
+            "user_id": user_id,
+            "success": True
+        })
+        
     except Exception as e:
         logger.error(f"Error processing followup {followup_id}: {e}")
         supabase.table("followups").update({
@@ -321,14 +331,12 @@ async def upload_audio(
             )
         
         # Get user's organization
-        org_response = supabase.table("organization_members").select(
-            "organization_id"
-        ).eq("user_id", user_id).limit(1).execute()
+        membership = await get_org_membership_async(user_id)
         
-        if not org_response.data:
+        if not membership:
             raise HTTPException(status_code=404, detail="User not in any organization")
         
-        organization_id = org_response.data[0]["organization_id"]
+        organization_id = membership.organization_id
         
         # Check subscription limit (v3: includes flow pack balance)
         usage_service = get_usage_service()
@@ -623,6 +631,15 @@ async def _process_transcript_async(
         
         logger.info(f"Successfully processed transcript followup {followup_id}")
         
+        # Same completion event as the Inngest workflow
+        await notify_suggestions_changed(Events.FOLLOWUP_COMPLETED, {
+            "followup_id": followup_id,
+            "prospect_company": prospect_company,
+            "organization_id": organization_id,
+            "user_id": user_id,
+            "success": True
+        })
+        
     except Exception as e:
         logger.error(f"Error processing transcript followup {followup_id}: {e}")
         supabase.table("followups").update({
@@ -671,14 +688,12 @@ async def upload_transcript(
             )
         
         # Get user's organization
-        org_response = supabase.table("organization_members").select(
-            "organization_id"
-        ).eq("user_id", user_id).limit(1).execute()
+        membership = await get_org_membership_async(user_id)
         
-        if not org_response.data:
+        if not membership:
             raise HTTPException(status_code=404, detail="User not in any organization")
         
-        organization_id = org_response.data[0]["organization_id"]
+        organization_id = membership.organization_id
         
         # Check subscription limit (v3: includes flow pack balance)
         usage_service = get_usage_service()
@@ -841,21 +856,20 @@ async def list_followups(
     current_user: dict = Depends(get_current_user)
 ):
     """List all follow-ups for the user's organization"""
+    supabase = await get_supabase_async()
     try:
         user_id = current_user.get("sub") or current_user.get("id")
         
         # Get organization
-        org_response = supabase.table("organization_members").select(
-            "organization_id"
-        ).eq("user_id", user_id).limit(1).execute()
+        membership = await get_org_membership_async(user_id)
         
-        if not org_response.data:
+        if not membership:
             raise HTTPException(status_code=404, detail="User not in any organization")
         
-        organization_id = org_response.data[0]["organization_id"]
+        organization_id = membership.organization_id
         
         # Get followups
-        response = supabase.table("followups").select(
+        response = await supabase.table("followups").select(
             "id, prospect_company_name, meeting_subject, meeting_date, status, "
             "executive_summary, audio_duration_seconds, created_at, completed_at"
         ).eq(
@@ -879,21 +893,20 @@ async def get_followup(
     current_user: dict = Depends(get_current_user)
 ):
     """Get a specific follow-up by ID"""
+    supabase = await get_supabase_async()
     try:
         user_id = current_user.get("sub") or current_user.get("id")
         
         # Get organization
-        org_response = supabase.table("organization_members").select(
-            "organization_id"
-        ).eq("user_id", user_id).limit(1).execute()
+        membership = await get_org_membership_async(user_id)
         
-        if not org_response.data:
+        if not membership:
             raise HTTPException(status_code=404, detail="User not in any organization")
         
-        organization_id = org_response.data[0]["organization_id"]
+        organization_id = membership.organization_id
         
         # Get followup
-        response = supabase.table("followups").select("*").eq(
+        response = await supabase.table("followups").select("*").eq(
             "id", followup_id
         ).eq(
             "organization_id", organization_id
@@ -918,18 +931,17 @@ async def update_followup(
     current_user: dict = Depends(get_current_user)
 ):
     """Update a follow-up (action items, email draft, etc.)"""
+    supabase = await get_supabase_async()
     try:
         user_id = current_user.get("sub") or current_user.get("id")
         
         # Get organization
-        org_response = supabase.table("organization_members").select(
-            "organization_id"
-        ).eq("user_id", user_id).limit(1).execute()
+        membership = await get_org_membership_async(user_id)
         
-        if not org_response.data:
+        if not membership:
             raise HTTPException(status_code=404, detail="User not in any organization")
         
-        organization_id = org_response.data[0]["organization_id"]
+        organization_id = membership.organization_id
         
         # Build update data
         update_data = {}
@@ -950,7 +962,7 @@ async def update_followup(
             raise HTTPException(status_code=400, detail="No fields to update")
         
         # Update
-        response = supabase.table("followups").update(update_data).eq(
+        response = await supabase.table("followups").update(update_data).eq(
             "id", followup_id
         ).eq(
             "organization_id", organization_id
@@ -976,21 +988,20 @@ async def delete_followup(
     """Delete a follow-up"""
     from app.services.coach_cleanup import cleanup_suggestions_for_entity
     
+    supabase = await get_supabase_async()
     try:
         user_id = current_user.get("sub") or current_user.get("id")
         
         # Get organization
-        org_response = supabase.table("organization_members").select(
-            "organization_id"
-        ).eq("user_id", user_id).limit(1).execute()
+        membership = await get_org_membership_async(user_id)
         
-        if not org_response.data:
+        if not membership:
             raise HTTPException(status_code=404, detail="User not in any organization")
         
-        organization_id = org_response.data[0]["organization_id"]
+        organization_id = membership.organization_id
         
         # Get followup to delete audio file
-        followup_response = supabase.table("followups").select(
+        followup_response = await supabase.table("followups").select(
             "audio_filename"
         ).eq("id", followup_id).eq("organization_id", organization_id).limit(1).execute()
         
@@ -998,7 +1009,7 @@ async def delete_followup(
             # Delete audio file from storage
             storage_path = f"{organization_id}/{followup_id}/{followup_response.data[0]['audio_filename']}"
             try:
-                supabase.storage.from_("followup-audio").remove([storage_path])
+                await supabase.storage.from_("followup-audio").remove([storage_path])
             except Exception as e:
                 logger.warning(f"Could not delete audio file: {e}")
         
@@ -1006,7 +1017,7 @@ async def delete_followup(
         await cleanup_suggestions_for_entity(supabase, "followup", followup_id, user_id)
         
         # Delete followup record
-        response = supabase.table("followups").delete().eq(
+        response = await supabase.table("followups").delete().eq(
             "id", followup_id
         ).eq(
             "organization_id", organization_id
@@ -1028,21 +1039,20 @@ async def regenerate_email(
     current_user: dict = Depends(get_current_user)
 ):
     """Regenerate the email draft with different tone"""
+    supabase = await get_supabase_async()
     try:
         user_id = current_user.get("sub") or current_user.get("id")
         
         # Get organization
-        org_response = supabase.table("organization_members").select(
-            "organization_id"
-        ).eq("user_id", user_id).limit(1).execute()
+        membership = await get_org_membership_async(user_id)
         
-        if not org_response.data:
+        if not membership:
             raise HTTPException(status_code=404, detail="User not in any organization")
         
-        organization_id = org_response.data[0]["organization_id"]
+        organization_id = membership.organization_id
         
         # Get followup
-        followup_response = supabase.table("followups").select("*").eq(
+        followup_response = await supabase.table("followups").select("*").eq(
             "id", followup_id
         ).eq(
             "organization_id", organization_id
@@ -1091,7 +1101,7 @@ async def regenerate_email(
         )
         
         # Update followup
-        supabase.table("followups").update({
+        await supabase.table("followups").update({
             "email_draft": email_draft,
             "email_tone": request.tone
         }).eq("id", followup_id).execute()
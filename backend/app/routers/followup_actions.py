@@ -24,6 +24,7 @@ from app.models.followup_actions import (
 
 # Inngest integration
 from app.inngest.events import send_event, use_inngest_for, Events
+from app.services.coach_suggestion_state import notify_suggestions_changed
 
 logger = logging.getLogger(__name__)
 
@@ -327,6 +328,15 @@ async def generate_action_content(
         
         logger.info(f"Generated {action_type.value} for followup {followup_id}")
         
+        # Same completion event as the Inngest workflow
+        await notify_suggestions_changed(Events.FOLLOWUP_ACTION_COMPLETED, {
+            "action_id": action_id,
+            "followup_id": followup_id,
+            "action_type": action_type.value,
+            "user_id": user_id,
+            "success": True
+        })
+        
     except Exception as e:
         logger.error(f"Error generating action content: {e}")
         
@@ -5,15 +5,21 @@ Handles file uploads, processing, and retrieval.
 
 import uuid
 import logging
+from contextlib import aclosing
 from typing import List
 from fastapi import APIRouter, UploadFile, File, Depends, HTTPException, BackgroundTasks, Response
 from fastapi.responses import JSONResponse
-from app.deps import get_current_user, get_auth_token
+from app.deps import get_current_user, get_auth_token, get_org_membership_async
 from app.database import get_supabase_service, get_user_client
-from app.services.file_processor import FileProcessor
-from app.services.text_chunker import TextChunker
+from app.services.document_parsing import parse_document
 from app.services.embeddings import EmbeddingsService
-from app.services.vector_store import VectorStore
+from app.services.vector_store import get_vector_store
+from app.services.kb_chunks import (
+    chunk_record,
+    chunk_vector,
+    delete_file_vectors,
+    embed_chunks,
+)
 
 # Inngest integration
 from app.inngest.events import send_event, use_inngest_for, Events
@@ -60,64 +66,39 @@ async def process_file_background(
         # Download file from storage (use service client for background tasks)
         file_data = supabase_service.storage.from_("knowledge-base-files").download(file_path)
         
-        # Extract text
-        file_processor = FileProcessor()
-        import io
-        text = file_processor.extract_text(io.BytesIO(file_data), file_type)
-        
-        if not text or not text.strip():
-            raise ValueError("No text could be extracted from file")
-        
-        # Chunk text
-        chunker = TextChunker(chunk_size=500, chunk_overlap=50)
-        chunks = chunker.chunk_text(text)
-        
-        if not chunks:
-            raise ValueError("No chunks created from text")
-        
-        # Generate embeddings
         embeddings_service = EmbeddingsService()
-        chunk_texts = [chunk["content"] for chunk in chunks]
-        embeddings = embeddings_service.generate_embeddings(chunk_texts, input_type="document")
-        
-        # Prepare vectors for Pinecone
-        vector_store = VectorStore()
-        vectors = []
-        chunk_records = []
+        vector_store = get_vector_store()
+        chunk_count = 0
         
-        for i, (chunk, embedding) in enumerate(zip(chunks, embeddings)):
-            vector_id = f"{file_id}:{i}"
-            
-            vectors.append({
-                "id": vector_id,
-                "values": embedding,
-                "metadata": {
-                    "file_id": file_id,
-                    "chunk_index": i,
-                    "organization_id": organization_id,
-                    "content_preview": chunk["content"][:200]  # First 200 chars
-                }
-            })
-            
-            chunk_records.append({
-                "file_id": file_id,
-                "organization_id": organization_id,
-                "chunk_index": i,
-                "content": chunk["content"],
-                "token_count": chunk["token_count"],
-                "embedding_id": vector_id
-            })
-        
-        # Store vectors in Pinecone
-        vector_store.upsert_vectors(vectors)
+        # Extract and chunk text off the event loop (see document_parsing),
+        # then embed and store each batch of chunks as it fills
+        async with aclosing(parse_document(file_data, file_type, chunk_size=500, chunk_overlap=50)) as batches:
+            async for batch in batches:
+                # Generate embeddings (unchanged chunks reuse stored ones)
+                embeddings, _ = await embed_chunks(
+                    supabase_service, embeddings_service, vector_store, organization_id, batch
+                )
+                
+                # Store vectors in Pinecone
+                vector_store.upsert_vectors([
+                    chunk_vector(file_id, organization_id, chunk, embedding)
+                    for chunk, embedding in zip(batch, embeddings)
+                ])
+                
+                # Store chunks in database (use service client for background tasks)
+                supabase_service.table("knowledge_base_chunks").insert(
+                    [chunk_record(file_id, organization_id, chunk) for chunk in batch]
+                ).execute()
+                
+                chunk_count += len(batch)
         
-        # Store chunks in database (use service client for background tasks)
-        supabase_service.table("knowledge_base_chunks").insert(chunk_records).execute()
+        if not chunk_count:
+            raise ValueError("No text could be extracted from file")
         
         # Update file status to completed (use service client for background tasks)
         supabase_service.table("knowledge_base_files").update({
             "status": "completed",
-            "chunk_count": len(chunks)
+            "chunk_count": chunk_count
         }).eq("id", file_id).execute()
         
     except Exception as e:
@@ -148,14 +129,14 @@ async def upload_file(
     # Create user-specific client for RLS security
     user_supabase = get_user_client(auth_token)
     
-    # Get user's organization (RLS ensures user can only see their own memberships)
+    # Get user's organization (membership is resolved from the verified token's user id)
     user_id = current_user.get("sub")
-    org_response = user_supabase.table("organization_members").select("organization_id").eq("user_id", user_id).execute()
+    membership = await get_org_membership_async(user_id)
     
-    if not org_response.data:
+    if not membership:
         raise HTTPException(status_code=403, detail=f"User not in any organization")
     
-    organization_id = org_response.data[0]["organization_id"]
+    organization_id = membership.organization_id
     
     # Get file extension
     file_extension = file.filename.split(".")[-1].lower() if "." in file.filename else ""
@@ -300,14 +281,14 @@ async def list_files(
     # Create user-specific client for RLS security
     user_supabase = get_user_client(auth_token)
     
-    # Get user's organization (RLS ensures user can only see their own memberships)
+    # Get user's organization (membership is resolved from the verified token's user id)
     user_id = current_user.get("sub")
-    org_response = user_supabase.table("organization_members").select("organization_id").eq("user_id", user_id).execute()
+    membership = await get_org_membership_async(user_id)
     
-    if not org_response.data:
+    if not membership:
         raise HTTPException(status_code=403, detail="User not in any organization")
     
-    organization_id = org_response.data[0]["organization_id"]
+    organization_id = membership.organization_id
     
     # Get files
     files_response = user_supabase.table("knowledge_base_files").select("*").eq("organization_id", organization_id).order("created_at", desc=True).execute()
@@ -323,14 +304,14 @@ async def delete_file(
     """
     Delete a file from the knowledge base.
     """
-    # Get user's organization (use service client to bypass RLS for delete operations)
+    # Get user's organization (membership is resolved from the verified token's user id)
     user_id = current_user.get("sub")
-    org_response = supabase_service.table("organization_members").select("organization_id").eq("user_id", user_id).execute()
+    membership = await get_org_membership_async(user_id)
     
-    if not org_response.data:
+    if not membership:
         raise HTTPException(status_code=403, detail="User not in any organization")
     
-    organization_id = org_response.data[0]["organization_id"]
+    organization_id = membership.organization_id
     
     # Get file (ensure it belongs to user's organization)
     file_response = supabase_service.table("knowledge_base_files").select("*").eq("id", file_id).eq("organization_id", organization_id).execute()
@@ -342,9 +323,8 @@ async def delete_file(
     storage_path = file_data["storage_path"]
     
     try:
-        # Delete from Pinecone
-        vector_store = VectorStore()
-        vector_store.delete_by_file(file_id)
+        # Delete vectors (by the chunk IDs, before the chunks are deleted)
+        delete_file_vectors(supabase_service, get_vector_store(), file_id, organization_id)
         
         # Delete from storage (use service client)
         supabase_service.storage.from_("knowledge-base-files").remove([storage_path])
@@ -367,14 +347,14 @@ async def get_file_status(
     """
     Get processing status of a file.
     """
-    # Get user's organization (use service client)
+    # Get user's organization (membership is resolved from the verified token's user id)
     user_id = current_user.get("sub")
-    org_response = supabase_service.table("organization_members").select("organization_id").eq("user_id", user_id).execute()
+    membership = await get_org_membership_async(user_id)
     
-    if not org_response.data:
+    if not membership:
         raise HTTPException(status_code=403, detail="User not in any organization")
     
-    organization_id = org_response.data[0]["organization_id"]
+    organization_id = membership.organization_id
     
     # Get file (use service client)
     file_response = supabase_service.table("knowledge_base_files").select("*").eq("id", file_id).eq("organization_id", organization_id).execute()
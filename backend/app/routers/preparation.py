@@ -11,7 +11,7 @@ from datetime import datetime
 import logging
 from slowapi import Limiter
 from slowapi.util import get_remote_address
-from app.deps import get_current_user
+from app.deps import get_current_user, get_org_membership_async
 from app.database import get_supabase_service
 
 # Rate limiter
@@ -23,6 +23,7 @@ from app.services.usage_service import get_usage_service
 
 # Inngest integration
 from app.inngest.events import send_event, use_inngest_for, Events
+from app.services.coach_suggestion_state import notify_suggestions_changed
 
 logger = logging.getLogger(__name__)
 
@@ -129,6 +130,16 @@ def generate_prep_background(
             
             logger.info(f"Successfully completed prep generation for {prep_id}")
             
+            # Same completion event as the Inngest workflow
+            await notify_suggestions_changed(Events.PREP_COMPLETED, {
+                "prep_id": prep_id,
+                "prospect_company": prospect_company,
+                "meeting_type": meeting_type,
+                "organization_id": organization_id,
+                "user_id": user_id,
+                "success": True
+            })
+            
         except Exception as e:
             logger.error(f"Error generating prep {prep_id}: {e}")
             
@@ -163,14 +174,12 @@ async def start_prep(
             raise HTTPException(status_code=401, detail="Could not get user ID from token")
         
         # Get user's organization
-        org_response = supabase.table("organization_members").select(
-            "organization_id"
-        ).eq("user_id", user_id).limit(1).execute()
+        membership = await get_org_membership_async(user_id)
         
-        if not org_response.data:
+        if not membership:
             raise HTTPException(status_code=404, detail="User not in any organization")
         
-        organization_id = org_response.data[0]["organization_id"]
+        organization_id = membership.organization_id
         
         # Check subscription limit
         usage_service = get_usage_service()
@@ -330,14 +339,12 @@ async def list_preps(
         user_id = current_user.get("sub") or current_user.get("id")
         
         # Get user's organization
-        org_response = supabase.table("organization_members").select(
-            "organization_id"
-        ).eq("user_id", user_id).limit(1).execute()
+        membership = await get_org_membership_async(user_id)
         
-        if not org_response.data:
+        if not membership:
             raise HTTPException(status_code=404, detail="User not in any organization")
         
-        organization_id = org_response.data[0]["organization_id"]
+        organization_id = membership.organization_id
         
         # Build query
         query = supabase.table("meeting_preps").select(
@@ -383,14 +390,12 @@ async def get_prep(
         user_id = current_user.get("sub") or current_user.get("id")
         
         # Get user's organization
-        org_response = supabase.table("organization_members").select(
-            "organization_id"
-        ).eq("user_id", user_id).limit(1).execute()
+        membership = await get_org_membership_async(user_id)
         
-        if not org_response.data:
+        if not membership:
             raise HTTPException(status_code=404, detail="User not in any organization")
         
-        organization_id = org_response.data[0]["organization_id"]
+        organization_id = membership.organization_id
         
         # Get prep
         response = supabase.table("meeting_preps").select("*").eq(
@@ -428,14 +433,12 @@ async def update_prep(
         user_id = current_user.get("sub") or current_user.get("id")
         
         # Get user's organization
-        org_response = supabase.table("organization_members").select(
-            "organization_id"
-        ).eq("user_id", user_id).limit(1).execute()
+        membership = await get_org_membership_async(user_id)
         
-        if not org_response.data:
+        if not membership:
             raise HTTPException(status_code=404, detail="User not in any organization")
         
-        organization_id = org_response.data[0]["organization_id"]
+        organization_id = membership.organization_id
         
         # Build update data
         update_data = {}
@@ -476,14 +479,12 @@ async def delete_prep(
         user_id = current_user.get("sub") or current_user.get("id")
         
         # Get user's organization
-        org_response = supabase.table("organization_members").select(
-            "organization_id"
-        ).eq("user_id", user_id).limit(1).execute()
+        membership = await get_org_membership_async(user_id)
         
-        if not org_response.data:
+        if not membership:
             raise HTTPException(status_code=404, detail="User not in any organization")
         
-        organization_id = org_response.data[0]["organization_id"]
+        organization_id = membership.organization_id
         
         # Clean up related coach suggestions
         await cleanup_suggestions_for_entity(supabase, "prep", prep_id, user_id)
@@ -10,18 +10,15 @@ from typing import List, Dict, Any, Optional
 from datetime import datetime
 import logging
 
-from app.deps import get_current_user
-from app.database import get_supabase_service
+from app.deps import get_current_user, get_org_membership_async
+from app.database import get_supabase_async
 from app.services.prospect_service import get_prospect_service
+from app.services.prospect_matcher import invalidate_prospect_index
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/prospects", tags=["prospects"])
 
-# Use centralized database module
-supabase = get_supabase_service()
-
-
 # Request/Response models
 class ProspectCreate(BaseModel):
     company_name: str = Field(..., min_length=1, max_length=255)
@@ -112,18 +109,16 @@ class ContactCreate(BaseModel):
     decision_authority: Optional[str] = Field(None, pattern="^(decision_maker|influencer|gatekeeper|end_user)$")
 
 
-def get_organization_id(current_user: dict) -> str:
+async def get_organization_id(current_user: dict) -> str:
     """Helper to get user's organization ID."""
     user_id = current_user.get("sub") or current_user.get("id")
     
-    org_response = supabase.table("organization_members").select(
-        "organization_id"
-    ).eq("user_id", user_id).limit(1).execute()
+    membership = await get_org_membership_async(user_id)
     
-    if not org_response.data:
+    if not membership:
         raise HTTPException(status_code=404, detail="User not in any organization")
     
-    return org_response.data[0]["organization_id"]
+    return membership.organization_id
 
 
 @router.get("/stats", response_model=ProspectStatsResponse)
@@ -135,11 +130,12 @@ async def get_prospect_stats(
     
     Returns total count and breakdown by status.
     """
+    supabase = await get_supabase_async()
     try:
-        organization_id = get_organization_id(current_user)
+        organization_id = await get_organization_id(current_user)
         
         # Get all prospects with just status field
-        response = supabase.table("prospects").select(
+        response = await supabase.table("prospects").select(
             "status"
         ).eq("organization_id", organization_id).execute()
         
@@ -182,8 +178,9 @@ async def list_prospects(
         limit: Max results (default 50, max 100)
         offset: Pagination offset
     """
+    supabase = await get_supabase_async()
     try:
-        organization_id = get_organization_id(current_user)
+        organization_id = await get_organization_id(current_user)
         
         # Build query - also get contact count
         query = supabase.table("prospects").select(
@@ -200,7 +197,7 @@ async def list_prospects(
         # Apply sorting
         query = query.order(sort_by, desc=(sort_order == "desc")).range(offset, offset + limit - 1)
         
-        response = query.execute()
+        response = await query.execute()
         
         # Transform data to include activity counts
         prospects = []
@@ -242,14 +239,15 @@ async def search_prospects(
         q: Search query (min 2 characters)
         limit: Max results to return
     """
+    supabase = await get_supabase_async()
     if len(q) < 2:
         return []
     
     try:
-        organization_id = get_organization_id(current_user)
+        organization_id = await get_organization_id(current_user)
         
         # Search by normalized name
-        response = supabase.table("prospects").select(
+        response = await supabase.table("prospects").select(
             "id, company_name, status, industry, last_activity_at"
         ).eq(
             "organization_id", organization_id
@@ -274,8 +272,9 @@ async def create_prospect(
     """
     Create a new prospect.
     """
+    supabase = await get_supabase_async()
     try:
-        organization_id = get_organization_id(current_user)
+        organization_id = await get_organization_id(current_user)
         
         # Use prospect service for proper handling
         prospect_service = get_prospect_service()
@@ -314,11 +313,12 @@ async def create_prospect(
         # Remove None values
         prospect_data = {k: v for k, v in prospect_data.items() if v is not None}
         
-        response = supabase.table("prospects").insert(prospect_data).execute()
+        response = await supabase.table("prospects").insert(prospect_data).execute()
         
         if not response.data:
             raise HTTPException(status_code=500, detail="Failed to create prospect")
         
+        invalidate_prospect_index(organization_id)
         logger.info(f"Created prospect: {request.company_name}")
         
         return response.data[0]
@@ -338,11 +338,12 @@ async def get_prospect(
     """
     Get a specific prospect with activity details.
     """
+    supabase = await get_supabase_async()
     try:
-        organization_id = get_organization_id(current_user)
+        organization_id = await get_organization_id(current_user)
         
         # Get prospect with related data
-        response = supabase.table("prospects").select(
+        response = await supabase.table("prospects").select(
             "*, research_briefs(id, status, created_at), meeting_preps(id, status, meeting_type, created_at), followups(id, status, created_at)"
         ).eq(
             "id", prospect_id
@@ -378,11 +379,12 @@ async def get_prospect_hub(
     Get complete prospect hub data for the Prospect Hub page.
     Returns prospect, research, contacts, stats, and recent activities.
     """
+    supabase = await get_supabase_async()
     try:
-        organization_id = get_organization_id(current_user)
+        organization_id = await get_organization_id(current_user)
         
         # Get prospect basic info
-        prospect_response = supabase.table("prospects").select("*").eq(
+        prospect_response = await supabase.table("prospects").select("*").eq(
             "id", prospect_id
         ).eq(
             "organization_id", organization_id
@@ -394,7 +396,7 @@ async def get_prospect_hub(
         prospect = prospect_response.data[0]
         
         # Get latest completed research for this prospect
-        research_response = supabase.table("research_briefs").select(
+        research_response = await supabase.table("research_briefs").select(
             "id, company_name, brief_content, status, created_at, completed_at"
         ).eq(
             "prospect_id", prospect_id
@@ -407,7 +409,7 @@ async def get_prospect_hub(
         research = research_response.data[0] if research_response.data else None
         
         # Get contacts for this prospect
-        contacts_response = supabase.table("prospect_contacts").select(
+        contacts_response = await supabase.table("prospect_contacts").select(
             "id, name, role, email, linkedin_url, communication_style, decision_authority, is_primary"
         ).eq(
             "prospect_id", prospect_id
@@ -420,7 +422,7 @@ async def get_prospect_hub(
         contacts = contacts_response.data or []
         
         # Get deals for this prospect
-        deals_response = supabase.table("deals").select(
+        deals_response = await supabase.table("deals").select(
             "id, name, is_active, created_at"
         ).eq(
             "prospect_id", prospect_id
@@ -431,7 +433,7 @@ async def get_prospect_hub(
         deals = deals_response.data or []
         
         # Count preps and followups linked to this prospect
-        preps_response = supabase.table("meeting_preps").select(
+        preps_response = await supabase.table("meeting_preps").select(
             "id", count="exact"
         ).eq(
             "prospect_id", prospect_id
@@ -439,7 +441,7 @@ async def get_prospect_hub(
             "status", "completed"
         ).execute()
         
-        followups_response = supabase.table("followups").select(
+        followups_response = await supabase.table("followups").select(
             "id", count="exact"
         ).eq(
             "prospect_id", prospect_id
@@ -448,7 +450,7 @@ async def get_prospect_hub(
         ).execute()
         
         # Get recent activities
-        activities_response = supabase.table("prospect_activities").select(
+        activities_response = await supabase.table("prospect_activities").select(
             "id, activity_type, title, description, created_at"
         ).eq(
             "prospect_id", prospect_id
@@ -498,8 +500,9 @@ async def update_prospect(
     """
     Update a prospect.
     """
+    supabase = await get_supabase_async()
     try:
-        organization_id = get_organization_id(current_user)
+        organization_id = await get_organization_id(current_user)
         
         # Build update data (only non-None values)
         update_data = request.model_dump(exclude_unset=True)
@@ -515,7 +518,7 @@ async def update_prospect(
                 detail=f"Invalid status. Must be one of: {', '.join(valid_statuses)}"
             )
         
-        response = supabase.table("prospects").update(update_data).eq(
+        response = await supabase.table("prospects").update(update_data).eq(
             "id", prospect_id
         ).eq(
             "organization_id", organization_id
@@ -524,6 +527,7 @@ async def update_prospect(
         if not response.data:
             raise HTTPException(status_code=404, detail="Prospect not found")
         
+        invalidate_prospect_index(organization_id)
         logger.info(f"Updated prospect {prospect_id}")
         
         return response.data[0]
@@ -546,10 +550,11 @@ async def delete_prospect(
     Note: This will NOT delete related research/preps/followups,
     but will set their prospect_id to NULL.
     """
+    supabase = await get_supabase_async()
     try:
-        organization_id = get_organization_id(current_user)
+        organization_id = await get_organization_id(current_user)
         
-        response = supabase.table("prospects").delete().eq(
+        response = await supabase.table("prospects").delete().eq(
             "id", prospect_id
         ).eq(
             "organization_id", organization_id
@@ -558,6 +563,7 @@ async def delete_prospect(
         if not response.data:
             raise HTTPException(status_code=404, detail="Prospect not found")
         
+        invalidate_prospect_index(organization_id)
         logger.info(f"Deleted prospect {prospect_id}")
         
         return None
@@ -580,11 +586,12 @@ async def get_prospect_timeline(
     
     Returns chronological list of all activities (research, preps, followups).
     """
+    supabase = await get_supabase_async()
     try:
-        organization_id = get_organization_id(current_user)
+        organization_id = await get_organization_id(current_user)
         
         # Verify prospect exists and belongs to org
-        prospect_response = supabase.table("prospects").select("id").eq(
+        prospect_response = await supabase.table("prospects").select("id").eq(
             "id", prospect_id
         ).eq(
             "organization_id", organization_id
@@ -596,7 +603,7 @@ async def get_prospect_timeline(
         timeline = []
         
         # Get research briefs
-        research = supabase.table("research_briefs").select(
+        research = await supabase.table("research_briefs").select(
             "id, company_name, status, created_at, completed_at"
         ).eq("prospect_id", prospect_id).execute()
         
@@ -611,7 +618,7 @@ async def get_prospect_timeline(
             })
         
         # Get meeting preps
-        preps = supabase.table("meeting_preps").select(
+        preps = await supabase.table("meeting_preps").select(
             "id, prospect_company_name, meeting_type, status, created_at, completed_at"
         ).eq("prospect_id", prospect_id).execute()
         
@@ -626,7 +633,7 @@ async def get_prospect_timeline(
             })
         
         # Get followups
-        followups = supabase.table("followups").select(
+        followups = await supabase.table("followups").select(
             "id, prospect_company_name, meeting_subject, status, created_at, completed_at"
         ).eq("prospect_id", prospect_id).execute()
         
@@ -664,10 +671,11 @@ async def update_prospect_status(
     """
     Quick status update for a prospect (for drag & drop / quick actions).
     """
+    supabase = await get_supabase_async()
     try:
-        organization_id = get_organization_id(current_user)
+        organization_id = await get_organization_id(current_user)
         
-        response = supabase.table("prospects").update({
+        response = await supabase.table("prospects").update({
             "status": request.status
         }).eq(
             "id", prospect_id
@@ -700,11 +708,12 @@ async def list_prospect_notes(
     """
     Get all notes for a prospect, pinned first then by date.
     """
+    supabase = await get_supabase_async()
     try:
-        organization_id = get_organization_id(current_user)
+        organization_id = await get_organization_id(current_user)
         
         # Verify prospect exists
-        prospect = supabase.table("prospects").select("id").eq(
+        prospect = await supabase.table("prospects").select("id").eq(
             "id", prospect_id
         ).eq(
             "organization_id", organization_id
@@ -714,7 +723,7 @@ async def list_prospect_notes(
             raise HTTPException(status_code=404, detail="Prospect not found")
         
         # Get notes sorted by pinned then created_at
-        response = supabase.table("prospect_notes").select(
+        response = await supabase.table("prospect_notes").select(
             "id, prospect_id, user_id, content, is_pinned, created_at, updated_at"
         ).eq(
             "prospect_id", prospect_id
@@ -742,12 +751,13 @@ async def create_prospect_note(
     """
     Create a note for a prospect.
     """
+    supabase = await get_supabase_async()
     try:
-        organization_id = get_organization_id(current_user)
+        organization_id = await get_organization_id(current_user)
         user_id = current_user.get("sub") or current_user.get("id")
         
         # Verify prospect exists
-        prospect = supabase.table("prospects").select("id").eq(
+        prospect = await supabase.table("prospects").select("id").eq(
             "id", prospect_id
         ).eq(
             "organization_id", organization_id
@@ -757,7 +767,7 @@ async def create_prospect_note(
             raise HTTPException(status_code=404, detail="Prospect not found")
         
         # Create note
-        response = supabase.table("prospect_notes").insert({
+        response = await supabase.table("prospect_notes").insert({
             "prospect_id": prospect_id,
             "organization_id": organization_id,
             "user_id": user_id,
@@ -789,6 +799,7 @@ async def update_prospect_note(
     """
     Update a note (only the owner can update).
     """
+    supabase = await get_supabase_async()
     try:
         user_id = current_user.get("sub") or current_user.get("id")
         
@@ -799,7 +810,7 @@ async def update_prospect_note(
             raise HTTPException(status_code=400, detail="No fields to update")
         
         # Update note (RLS ensures only owner can update)
-        response = supabase.table("prospect_notes").update(update_data).eq(
+        response = await supabase.table("prospect_notes").update(update_data).eq(
             "id", note_id
         ).eq(
             "prospect_id", prospect_id
@@ -830,11 +841,12 @@ async def delete_prospect_note(
     """
     Delete a note (only the owner can delete).
     """
+    supabase = await get_supabase_async()
     try:
         user_id = current_user.get("sub") or current_user.get("id")
         
         # Delete note (RLS ensures only owner can delete)
-        response = supabase.table("prospect_notes").delete().eq(
+        response = await supabase.table("prospect_notes").delete().eq(
             "id", note_id
         ).eq(
             "prospect_id", prospect_id
@@ -868,11 +880,12 @@ async def add_prospect_contact(
     """
     Quickly add a contact to a prospect (creates in prospect_contacts table).
     """
+    supabase = await get_supabase_async()
     try:
-        organization_id = get_organization_id(current_user)
+        organization_id = await get_organization_id(current_user)
         
         # Verify prospect exists
-        prospect = supabase.table("prospects").select("id").eq(
+        prospect = await supabase.table("prospects").select("id").eq(
             "id", prospect_id
         ).eq(
             "organization_id", organization_id
@@ -882,7 +895,7 @@ async def add_prospect_contact(
             raise HTTPException(status_code=404, detail="Prospect not found")
         
         # Check if contact already exists by name
-        existing = supabase.table("prospect_contacts").select("id").eq(
+        existing = await supabase.table("prospect_contacts").select("id").eq(
             "prospect_id", prospect_id
         ).eq(
             "name", request.name
@@ -906,7 +919,7 @@ async def add_prospect_contact(
         # Remove None values
         contact_data = {k: v for k, v in contact_data.items() if v is not None}
         
-        response = supabase.table("prospect_contacts").insert(contact_data).execute()
+        response = await supabase.table("prospect_contacts").insert(contact_data).execute()
         
         if not response.data:
             raise HTTPException(status_code=500, detail="Failed to create contact")
@@ -932,11 +945,12 @@ async def get_known_prospects_legacy(
     
     Returns prospects in legacy format for backwards compatibility.
     """
+    supabase = await get_supabase_async()
     try:
-        organization_id = get_organization_id(current_user)
+        organization_id = await get_organization_id(current_user)
         
         # Get all prospects with activity counts
-        response = supabase.table("prospects").select(
+        response = await supabase.table("prospects").select(
             "id, company_name, status, last_activity_at, research_briefs(id), meeting_preps(id), followups(id)"
         ).eq(
             "organization_id", organization_id
@@ -12,7 +12,7 @@ from slowapi.util import get_remote_address
 
 logger = logging.getLogger(__name__)
 
-from app.deps import get_current_user, get_auth_token
+from app.deps import get_current_user, get_auth_token, get_org_membership_async
 
 # Get limiter from app state
 limiter = Limiter(key_func=get_remote_address)
@@ -21,6 +21,7 @@ from app.services.prospect_service import get_prospect_service
 from app.services.company_lookup import get_company_lookup
 from app.services.usage_service import get_usage_service
 from app.inngest.events import send_event, Events, use_inngest_for
+from app.services.coach_suggestion_state import notify_suggestions_changed
 
 
 router = APIRouter()
@@ -202,6 +203,15 @@ def process_research_background(
         
         logger.info(f"Research {research_id} completed successfully")
         
+        # Same completion event as the Inngest workflow (coach suggestions, health scores)
+        asyncio.run(notify_suggestions_changed(Events.RESEARCH_COMPLETED, {
+            "research_id": research_id,
+            "company_name": company_name,
+            "organization_id": organization_id,
+            "user_id": user_id,
+            "success": True
+        }))
+        
     except Exception as e:
         logger.error(f"Research failed: {type(e).__name__}: {str(e)}", exc_info=True)
         
@@ -231,12 +241,12 @@ async def start_research(
     
     # Get user's organization
     user_id = current_user.get("sub")
-    org_response = user_supabase.table("organization_members").select("organization_id").eq("user_id", user_id).execute()
+    membership = await get_org_membership_async(user_id)
     
-    if not org_response.data:
+    if not membership:
         raise HTTPException(status_code=403, detail="User not in any organization")
     
-    organization_id = org_response.data[0]["organization_id"]
+    organization_id = membership.organization_id
     
     # Get user's preferred output language from settings (consistent with other routers)
     output_language = "en"  # Default to English
@@ -380,12 +390,12 @@ async def list_research_briefs(
     
     # Get user's organization
     user_id = current_user.get("sub")
-    org_response = user_supabase.table("organization_members").select("organization_id").eq("user_id", user_id).execute()
+    membership = await get_org_membership_async(user_id)
     
-    if not org_response.data:
+    if not membership:
         raise HTTPException(status_code=403, detail="User not in any organization")
     
-    organization_id = org_response.data[0]["organization_id"]
+    organization_id = membership.organization_id
     
     # Get research briefs
     briefs_response = user_supabase.table("research_briefs").select("*").eq(
@@ -5,7 +5,7 @@ from fastapi import APIRouter, Depends, HTTPException, status
 from pydantic import BaseModel, Field
 from typing import Optional, Dict, Any, List
 import uuid
-from app.deps import get_current_user
+from app.deps import get_current_user, get_org_membership_async, invalidate_org_membership
 from app.database import get_supabase_service
 from app.services.profile_service import ProfileService
 from app.services.interview_service import InterviewService
@@ -200,10 +200,10 @@ async def complete_interview(
         organization_id = current_user.get("organization_id")
         if not organization_id:
             # Get from organization_members
-            org_member_result = supabase.table("organization_members").select("organization_id").eq("user_id", user_id).limit(1).execute()
+            membership = await get_org_membership_async(user_id)
             
-            if org_member_result.data and len(org_member_result.data) > 0:
-                organization_id = org_member_result.data[0]["organization_id"]
+            if membership:
+                organization_id = membership.organization_id
             else:
                 # User not in any organization - create one and add them
                 email = current_user.get('email', 'User')
@@ -226,6 +226,7 @@ async def complete_interview(
                     "organization_id": organization_id,
                     "role": "owner"
                 }).execute()
+                invalidate_org_membership(user_id)
                 print(f"DEBUG: Created organization {organization_id} and added user {user_id}")
         
         # Create profile
@@ -12,6 +12,7 @@ import stripe
 from app.database import get_supabase_service
 from app.services.subscription_service import get_subscription_service
 from app.services.flow_pack_service import get_flow_pack_service
+from app.inngest.events import send_event, Events
 
 logger = logging.getLogger(__name__)
 
@@ -133,6 +134,12 @@ async def stripe_webhook(
         else:
             logger.info(f"Unhandled event type: {event_type}")
         
+        # Plan and payment status feed the admin health scores
+        if event_type.startswith(("customer.subscription.", "invoice.")):
+            customer_id = event["data"]["object"].get("customer")
+            if customer_id:
+                await send_event(Events.HEALTH_SCORES_REFRESH, {"stripe_customer_id": customer_id})
+        
         # Mark event as processed (idempotency)
         supabase.table("stripe_webhook_events").insert({
             "id": event_id,
@@ -2,28 +2,28 @@
 Calendar Sync Service - Fetches and syncs calendar events
 SPEC-038: Meetings & Calendar Integration
 """
-import os
 import base64
 import logging
 from datetime import datetime, timedelta, timezone
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Tuple
 from dataclasses import dataclass
 import asyncio
 
-from google.oauth2.credentials import Credentials
-from googleapiclient.discovery import build
-from googleapiclient.errors import HttpError
-
 from app.database import get_supabase_service
 from app.services.prospect_matcher import ProspectMatcher
+from app.services.google_calendar import google_calendar_service, TokenExpiredError
 from app.services.microsoft_calendar import microsoft_calendar_service
 
 logger = logging.getLogger(__name__)
 
 # Configuration
-GOOGLE_CLIENT_ID = os.getenv("GOOGLE_CLIENT_ID")
-GOOGLE_CLIENT_SECRET = os.getenv("GOOGLE_CLIENT_SECRET")
 SYNC_DAYS_AHEAD = 14  # Sync meetings for the next 14 days
+UPSERT_BATCH_SIZE = 500  # Meetings per bulk upsert request
+CANCEL_BATCH_SIZE = 100  # Meeting IDs per cancellation update (keeps in_() URLs short)
+EXISTING_PAGE_SIZE = 1000  # PostgREST caps responses at 1000 rows
+EVENT_ID_BATCH_SIZE = 50  # External event IDs per in_() filter (Graph IDs are long)
+FULL_RESYNC_INTERVAL = timedelta(hours=24)  # Full sync moves the window forward
+TOKEN_REFRESH_MARGIN = timedelta(minutes=5)  # Refresh Google tokens this long before they expire
 
 
 @dataclass
@@ -110,41 +110,52 @@ class CalendarSyncService:
             logger.error(f"Failed to decode token: {e}")
             raise ValueError("Invalid token encoding")
     
-    def _get_google_credentials(self, connection: Dict) -> Optional[Credentials]:
-        """Build Google credentials from stored connection data."""
+    def _token_expired(self, expires_at: Optional[str]) -> bool:
+        """Check if a stored token expiry has passed (or is about to)."""
+        if not expires_at:
+            return False
+        try:
+            expiry = datetime.fromisoformat(expires_at.replace("Z", "+00:00"))
+        except ValueError:
+            return False
+        if expiry.tzinfo is None:
+            expiry = expiry.replace(tzinfo=timezone.utc)
+        return expiry - TOKEN_REFRESH_MARGIN <= datetime.now(timezone.utc)
+    
+    async def _get_google_access_token(self, connection: Dict, force_refresh: bool = False) -> Optional[str]:
+        """
+        Get a valid Google access token for a connection.
+        
+        Refreshes the token when it has expired (or when force_refresh is
+        set, after the API rejected it) and stores the new one.
+        """
         try:
             access_token = self._decode_token(connection["access_token_encrypted"])
             refresh_token = None
             if connection.get("refresh_token_encrypted"):
                 refresh_token = self._decode_token(connection["refresh_token_encrypted"])
             
-            credentials = Credentials(
-                token=access_token,
-                refresh_token=refresh_token,
-                token_uri="https://oauth2.googleapis.com/token",
-                client_id=GOOGLE_CLIENT_ID,
-                client_secret=GOOGLE_CLIENT_SECRET,
-            )
-            
-            # Check if token is expired and refresh if needed
-            if credentials.expired and credentials.refresh_token:
-                import google.auth.transport.requests
-                request = google.auth.transport.requests.Request()
-                credentials.refresh(request)
+            if refresh_token and (force_refresh or self._token_expired(connection.get("token_expires_at"))):
+                tokens = await google_calendar_service.refresh_access_token_async(refresh_token)
+                if not tokens:
+                    raise ValueError("Token refresh failed")
+                
+                access_token = tokens["access_token"]
+                connection["token_expires_at"] = tokens["token_expires_at"]
                 
                 # Update stored tokens
-                new_access_token = base64.b64encode(credentials.token.encode()).decode()
+                new_access_token = base64.b64encode(access_token.encode()).decode()
                 self.supabase.table("calendar_connections").update({
                     "access_token_encrypted": new_access_token,
-                    "token_expires_at": credentials.expiry.isoformat() if credentials.expiry else None,
+                    "token_expires_at": tokens["token_expires_at"],
                 }).eq("id", connection["id"]).execute()
                 
                 logger.info(f"Refreshed expired token for connection {connection['id']}")
             
-            return credentials
+            return access_token
             
         except Exception as e:
-            logger.error(f"Failed to build Google credentials: {e}")
+            logger.error(f"Failed to get Google access token: {e}")
             # Mark connection as needing reauth
             self.supabase.table("calendar_connections").update({
                 "needs_reauth": True,
@@ -232,131 +243,188 @@ class CalendarSyncService:
             logger.error(f"Failed to parse event {event.get('id')}: {e}")
             return None
     
-    def _fetch_google_events(self, credentials: Credentials) -> List[Dict]:
-        """Fetch upcoming events from Google Calendar."""
+    def _sync_window(self) -> Tuple[datetime, datetime]:
+        """Window of synced meetings: start of yesterday through SYNC_DAYS_AHEAD."""
+        now = datetime.now(timezone.utc)
+        from_date = (now - timedelta(days=1)).replace(hour=0, minute=0, second=0, microsecond=0)
+        return from_date, now + timedelta(days=SYNC_DAYS_AHEAD)
+    
+    def _get_sync_token(self, conn: Dict) -> Optional[str]:
+        """
+        Get the stored Google sync token / Graph delta link of a connection.
+        
+        Returns None when a full sync is due: no token yet, or the last full
+        sync is older than FULL_RESYNC_INTERVAL (the window only moves
+        forward on a full sync).
+        """
+        sync_token = conn.get("sync_token")
+        full_synced_at = conn.get("full_synced_at")
+        if not sync_token or not full_synced_at:
+            return None
+        
         try:
-            service = build("calendar", "v3", credentials=credentials)
-            
-            # Fetch events from yesterday (to catch recent meetings) through SYNC_DAYS_AHEAD
-            now = datetime.utcnow()
-            # Start from beginning of yesterday to include recent meetings
-            from_date = (now - timedelta(days=1)).replace(hour=0, minute=0, second=0, microsecond=0)
-            time_min = from_date.isoformat() + "Z"
-            time_max = (now + timedelta(days=SYNC_DAYS_AHEAD)).isoformat() + "Z"
-            
-            events = []
-            page_token = None
-            
-            while True:
-                result = service.events().list(
-                    calendarId="primary",
-                    timeMin=time_min,
-                    timeMax=time_max,
-                    maxResults=250,
-                    singleEvents=True,  # Expand recurring events
-                    orderBy="startTime",
-                    pageToken=page_token,
-                ).execute()
-                
-                events.extend(result.get("items", []))
-                page_token = result.get("nextPageToken")
-                
-                if not page_token:
-                    break
-            
-            logger.info(f"Fetched {len(events)} events from Google Calendar")
-            return events
-            
-        except HttpError as e:
-            logger.error(f"Google Calendar API error: {e}")
-            if e.resp.status == 401:
-                raise ValueError("Token expired or revoked")
-            raise
+            full_synced_at = datetime.fromisoformat(full_synced_at.replace("Z", "+00:00"))
+        except ValueError:
+            return None
+        
+        if datetime.now(timezone.utc) - full_synced_at > FULL_RESYNC_INTERVAL:
+            return None
+        return sync_token
+    
+    def _store_sync_token(self, connection_id: str, sync_token: Optional[str], full_sync: bool) -> None:
+        """Store the sync token / delta link to use for the next sync."""
+        data = {"sync_token": sync_token}
+        if full_sync:
+            data["full_synced_at"] = datetime.now(timezone.utc).isoformat()
+        
+        try:
+            self.supabase.table("calendar_connections").update(data).eq("id", connection_id).execute()
         except Exception as e:
-            logger.error(f"Failed to fetch Google events: {e}")
-            raise
+            # Next run falls back to a full sync
+            logger.warning(f"Failed to store sync token for connection {connection_id}: {e}")
     
-    def _upsert_meeting(
+    def _build_meeting_row(
         self, 
         event: CalendarEvent, 
         connection_id: str, 
         organization_id: str,
         user_id: str
-    ) -> str:
-        """Insert or update a calendar meeting. Returns 'new', 'updated', or 'unchanged'."""
-        try:
-            # Check if meeting already exists
-            existing = self.supabase.table("calendar_meetings").select("id, status").eq(
-                "calendar_connection_id", connection_id
-            ).eq(
-                "external_event_id", event.external_event_id
-            ).execute()
-            
-            meeting_data = {
-                "calendar_connection_id": connection_id,
-                "organization_id": organization_id,
-                "user_id": user_id,
-                "external_event_id": event.external_event_id,
-                "title": event.title,
-                "description": event.description,
-                "start_time": event.start_time.isoformat(),
-                "end_time": event.end_time.isoformat(),
-                "original_timezone": event.original_timezone,
-                "location": event.location,
-                "is_online": event.is_online,
-                "meeting_url": event.meeting_url,
-                "attendees": event.attendees,
-                "organizer_email": event.organizer_email,
-                "status": event.status,
-                "is_recurring": event.is_recurring,
-                "recurrence_rule": event.recurrence_rule,
-                "recurring_event_id": event.recurring_event_id,
-            }
-            
-            if existing.data and len(existing.data) > 0:
-                # Update existing
-                self.supabase.table("calendar_meetings").update(
-                    meeting_data
-                ).eq("id", existing.data[0]["id"]).execute()
-                return "updated"
-            else:
-                # Insert new
-                self.supabase.table("calendar_meetings").insert(
-                    meeting_data
-                ).execute()
-                return "new"
-                
-        except Exception as e:
-            logger.error(f"Failed to upsert meeting {event.external_event_id}: {e}")
-            raise
+    ) -> Dict[str, Any]:
+        """Map a parsed Google event to a calendar_meetings row."""
+        return {
+            "calendar_connection_id": connection_id,
+            "organization_id": organization_id,
+            "user_id": user_id,
+            "external_event_id": event.external_event_id,
+            "title": event.title,
+            "description": event.description,
+            "start_time": event.start_time.isoformat(),
+            "end_time": event.end_time.isoformat(),
+            "original_timezone": event.original_timezone,
+            "location": event.location,
+            "is_online": event.is_online,
+            "meeting_url": event.meeting_url,
+            "attendees": event.attendees,
+            "organizer_email": event.organizer_email,
+            "status": event.status,
+            "is_recurring": event.is_recurring,
+            "recurrence_rule": event.recurrence_rule,
+            "recurring_event_id": event.recurring_event_id,
+        }
     
-    def _mark_cancelled_meetings(
+    def _get_existing_meetings(
         self, 
         connection_id: str, 
-        synced_event_ids: List[str]
-    ) -> int:
-        """Mark meetings as cancelled if they no longer appear in the calendar."""
-        try:
-            # Get current non-cancelled meetings for this connection
-            current = self.supabase.table("calendar_meetings").select("id, external_event_id").eq(
+        external_event_ids: Optional[List[str]] = None
+    ) -> Dict[str, Dict]:
+        """Get the stored meetings of a connection (all, or the given events), keyed by external_event_id."""
+        existing = {}
+        
+        if external_event_ids is not None:
+            for i in range(0, len(external_event_ids), EVENT_ID_BATCH_SIZE):
+                batch = self.supabase.table("calendar_meetings").select(
+                    "id, external_event_id, status"
+                ).eq(
+                    "calendar_connection_id", connection_id
+                ).in_(
+                    "external_event_id", external_event_ids[i:i + EVENT_ID_BATCH_SIZE]
+                ).execute()
+                
+                for meeting in batch.data or []:
+                    existing[meeting["external_event_id"]] = meeting
+            return existing
+        
+        start = 0
+        
+        while True:
+            page = self.supabase.table("calendar_meetings").select(
+                "id, external_event_id, status"
+            ).eq(
                 "calendar_connection_id", connection_id
-            ).neq(
-                "status", "cancelled"
-            ).execute()
-            
-            cancelled_count = 0
-            for meeting in current.data or []:
-                if meeting["external_event_id"] not in synced_event_ids:
-                    self.supabase.table("calendar_meetings").update({
-                        "status": "cancelled"
-                    }).eq("id", meeting["id"]).execute()
-                    cancelled_count += 1
+            ).order("id").range(start, start + EXISTING_PAGE_SIZE - 1).execute()
             
-            return cancelled_count
+            rows = page.data or []
+            for meeting in rows:
+                existing[meeting["external_event_id"]] = meeting
             
-        except Exception as e:
-            logger.error(f"Failed to mark cancelled meetings: {e}")
-            return 0
+            if len(rows) < EXISTING_PAGE_SIZE:
+                return existing
+            start += EXISTING_PAGE_SIZE
+    
+    def _save_meetings(
+        self, 
+        connection_id: str, 
+        meeting_rows: List[Dict[str, Any]],
+        result: SyncResult,
+        cancelled_event_ids: Optional[List[str]] = None,
+        full_sync: bool = True
+    ) -> None:
+        """
+        Bulk-save the synced meetings of a connection.
+        
+        Upserts all rows on (calendar_connection_id, external_event_id) and
+        marks cancelled meetings as such: the given cancelled_event_ids and,
+        on a full sync, every stored meeting that no longer appears in the
+        calendar. Existing meetings are read once up front so new and
+        updated meetings can still be counted in the result.
+        """
+        # Last occurrence wins if the provider returns an event twice
+        rows_by_event_id = {row["external_event_id"]: row for row in meeting_rows}
+        rows = list(rows_by_event_id.values())
+        cancelled_event_ids = set(cancelled_event_ids or []) - set(rows_by_event_id)
+        
+        if full_sync:
+            existing = self._get_existing_meetings(connection_id)
+            cancelled_event_ids |= set(existing) - set(rows_by_event_id)
+        else:
+            existing = self._get_existing_meetings(
+                connection_id, list(rows_by_event_id) + list(cancelled_event_ids)
+            )
+        
+        for i in range(0, len(rows), UPSERT_BATCH_SIZE):
+            batch = rows[i:i + UPSERT_BATCH_SIZE]
+            try:
+                self.supabase.table("calendar_meetings").upsert(
+                    batch, on_conflict="calendar_connection_id,external_event_id"
+                ).execute()
+            except Exception as e:
+                logger.error(f"Failed to upsert {len(batch)} meetings for connection {connection_id}: {e}")
+                result.errors.append(f"Failed to save {len(batch)} events: {str(e)}")
+                continue
+            
+            for row in batch:
+                if row["external_event_id"] in existing:
+                    result.updated_meetings += 1
+                else:
+                    result.new_meetings += 1
+                result.synced_meetings += 1
+        
+        result.deleted_meetings = self._mark_cancelled_meetings(cancelled_event_ids, existing)
+    
+    def _mark_cancelled_meetings(
+        self, 
+        cancelled_event_ids: set,
+        existing: Dict[str, Dict]
+    ) -> int:
+        """Mark stored meetings as cancelled if they were removed from the calendar."""
+        vanished_ids = [
+            existing[external_event_id]["id"]
+            for external_event_id in cancelled_event_ids
+            if external_event_id in existing and existing[external_event_id].get("status") != "cancelled"
+        ]
+        
+        cancelled_count = 0
+        for i in range(0, len(vanished_ids), CANCEL_BATCH_SIZE):
+            batch = vanished_ids[i:i + CANCEL_BATCH_SIZE]
+            try:
+                self.supabase.table("calendar_meetings").update({
+                    "status": "cancelled"
+                }).in_("id", batch).execute()
+                cancelled_count += len(batch)
+            except Exception as e:
+                logger.error(f"Failed to mark cancelled meetings: {e}")
+        
+        return cancelled_count
     
     async def _sync_microsoft_connection(self, conn: Dict, connection_id: str) -> SyncResult:
         """Sync calendar events for a Microsoft connection."""
@@ -383,23 +451,36 @@ class CalendarSyncService:
                         "refresh_token_encrypted": new_tokens.get("refresh_token", refresh_token),
                     }).eq("id", connection_id).execute()
             
-            # Fetch events from Microsoft Graph
-            # Start from beginning of yesterday to include recent meetings
-            now = datetime.now(timezone.utc)
-            from_date = (now - timedelta(days=1)).replace(hour=0, minute=0, second=0, microsecond=0)
-            to_date = now + timedelta(days=SYNC_DAYS_AHEAD)
+            # Fetch changes from Microsoft Graph since the stored delta link,
+            # or all events in the sync window when a full sync is due
+            from_date, to_date = self._sync_window()
+            delta_link = self._get_sync_token(conn)
             
-            events = await microsoft_calendar_service.fetch_calendar_events(
-                access_token, from_date, to_date
-            )
+            delta = None
+            if delta_link:
+                delta = await microsoft_calendar_service.fetch_calendar_delta(
+                    access_token, from_date, to_date, delta_link
+                )
+            if delta is None:
+                delta_link = None
+                delta = await microsoft_calendar_service.fetch_calendar_delta(
+                    access_token, from_date, to_date
+                )
+            events, next_delta_link = delta
+            full_sync = delta_link is None
             
             if not events:
                 logger.info(f"No events fetched from Microsoft for connection {connection_id}")
             
-            synced_event_ids = []
+            meeting_rows = []
+            cancelled_event_ids = []
             
             # Process each event
             for event_data in events:
+                if "@removed" in event_data:
+                    cancelled_event_ids.append(event_data["id"])
+                    continue
+                
                 # Parse Microsoft event to our format
                 parsed = microsoft_calendar_service.parse_event_to_meeting(
                     event_data, 
@@ -409,54 +490,32 @@ class CalendarSyncService:
                 )
                 
                 if parsed.get("status") == "cancelled":
+                    cancelled_event_ids.append(parsed["external_id"])
                     continue
                 
-                synced_event_ids.append(parsed["external_id"])
-                
-                try:
-                    # Check if meeting already exists
-                    existing = self.supabase.table("calendar_meetings").select("id").eq(
-                        "calendar_connection_id", connection_id
-                    ).eq(
-                        "external_event_id", parsed["external_id"]
-                    ).execute()
-                    
-                    # Map parsed data to meeting schema
-                    meeting_data = {
-                        "calendar_connection_id": connection_id,
-                        "organization_id": parsed["organization_id"],
-                        "user_id": parsed["user_id"],
-                        "external_event_id": parsed["external_id"],
-                        "title": parsed["title"],
-                        "start_time": parsed["start_time"],
-                        "end_time": parsed["end_time"],
-                        "original_timezone": parsed.get("timezone"),
-                        "location": parsed.get("location"),
-                        "is_online": parsed.get("is_online", False),
-                        "meeting_url": parsed.get("meeting_url"),
-                        "attendees": parsed.get("attendees", []),
-                        "status": parsed.get("status", "confirmed"),
-                        "is_recurring": False,  # Graph API expands recurring events
-                    }
-                    
-                    if existing.data and len(existing.data) > 0:
-                        self.supabase.table("calendar_meetings").update(
-                            meeting_data
-                        ).eq("id", existing.data[0]["id"]).execute()
-                        result.updated_meetings += 1
-                    else:
-                        self.supabase.table("calendar_meetings").insert(
-                            meeting_data
-                        ).execute()
-                        result.new_meetings += 1
-                    
-                    result.synced_meetings += 1
-                    
-                except Exception as e:
-                    result.errors.append(f"Failed to save Microsoft event {parsed['external_id']}: {str(e)}")
-            
-            # Mark meetings that no longer exist as cancelled
-            result.deleted_meetings = self._mark_cancelled_meetings(connection_id, synced_event_ids)
+                # Map parsed data to meeting schema
+                meeting_rows.append({
+                    "calendar_connection_id": connection_id,
+                    "organization_id": parsed["organization_id"],
+                    "user_id": parsed["user_id"],
+                    "external_event_id": parsed["external_id"],
+                    "title": parsed["title"],
+                    "start_time": parsed["start_time"],
+                    "end_time": parsed["end_time"],
+                    "original_timezone": parsed.get("timezone"),
+                    "location": parsed.get("location"),
+                    "is_online": parsed.get("is_online", False),
+                    "meeting_url": parsed.get("meeting_url"),
+                    "attendees": parsed.get("attendees", []),
+                    "status": parsed.get("status", "confirmed"),
+                    "is_recurring": False,  # Graph API expands recurring events
+                })
+            
+            self._save_meetings(connection_id, meeting_rows, result, cancelled_event_ids, full_sync)
+            
+            # Keep the previous delta link if saving failed, so the changes are fetched again
+            if not result.errors:
+                self._store_sync_token(connection_id, next_delta_link, full_sync)
             
             return result
             
@@ -465,7 +524,74 @@ class CalendarSyncService:
             result.errors.append(str(e))
             return result
     
-    def sync_connection(self, connection_id: str) -> SyncResult:
+    async def _sync_google_connection(self, conn: Dict, connection_id: str) -> SyncResult:
+        """Sync calendar events for a Google connection."""
+        result = SyncResult()
+        
+        access_token = await self._get_google_access_token(conn)
+        if not access_token:
+            raise ValueError("Failed to get valid credentials")
+        
+        # Fetch changes since the stored sync token, or all events
+        # in the sync window when a full sync is due
+        from_date, to_date = self._sync_window()
+        sync_token = self._get_sync_token(conn)
+        
+        try:
+            fetched = await google_calendar_service.fetch_calendar_events(
+                access_token, from_date, to_date, sync_token
+            )
+        except TokenExpiredError:
+            # Stored expiry missing or wrong, refresh once and retry
+            access_token = await self._get_google_access_token(conn, force_refresh=True)
+            if not access_token:
+                raise
+            fetched = await google_calendar_service.fetch_calendar_events(
+                access_token, from_date, to_date, sync_token
+            )
+        
+        if fetched is None:
+            logger.info(f"Sync token expired for connection {connection_id}, running full sync")
+            sync_token = None
+            fetched = await google_calendar_service.fetch_calendar_events(
+                access_token, from_date, to_date
+            )
+        events, next_sync_token = fetched
+        full_sync = sync_token is None
+        
+        meeting_rows = []
+        cancelled_event_ids = []
+        
+        # Process each event
+        for event_data in events:
+            # Deleted events only carry their id and status
+            if event_data.get("status") == "cancelled":
+                cancelled_event_ids.append(event_data["id"])
+                continue
+            
+            event = self._parse_google_event(event_data, connection_id)
+            if not event:
+                continue
+            
+            # Changes aren't limited to the sync window; an event moved
+            # out of it is dropped, as a full sync would
+            if event.end_time < from_date or event.start_time > to_date:
+                cancelled_event_ids.append(event.external_event_id)
+                continue
+            
+            meeting_rows.append(
+                self._build_meeting_row(event, connection_id, conn["organization_id"], conn["user_id"])
+            )
+        
+        self._save_meetings(connection_id, meeting_rows, result, cancelled_event_ids, full_sync)
+        
+        # Keep the previous sync token if saving failed, so the changes are fetched again
+        if not result.errors:
+            self._store_sync_token(connection_id, next_sync_token, full_sync)
+        
+        return result
+    
+    async def sync_connection_async(self, connection_id: str) -> SyncResult:
         """Sync calendar events for a specific connection."""
         result = SyncResult()
         
@@ -489,54 +615,9 @@ class CalendarSyncService:
             
             # Route to appropriate provider sync
             if provider == "microsoft":
-                # Microsoft sync is async, run it properly
-                try:
-                    loop = asyncio.get_running_loop()
-                    # We're already in an async context
-                    import concurrent.futures
-                    with concurrent.futures.ThreadPoolExecutor() as executor:
-                        future = executor.submit(
-                            asyncio.run,
-                            self._sync_microsoft_connection(conn, connection_id)
-                        )
-                        result = future.result()
-                except RuntimeError:
-                    # No running loop
-                    result = asyncio.run(self._sync_microsoft_connection(conn, connection_id))
+                result = await self._sync_microsoft_connection(conn, connection_id)
             else:
-                # Google sync (existing logic)
-                credentials = self._get_google_credentials(conn)
-                if not credentials:
-                    result.errors.append("Failed to get valid credentials")
-                    return result
-                
-                # Fetch events
-                events = self._fetch_google_events(credentials)
-                synced_event_ids = []
-                
-                # Process each event
-                for event_data in events:
-                    event = self._parse_google_event(event_data, connection_id)
-                    if not event:
-                        continue
-                    
-                    if event.status == "cancelled":
-                        continue  # Skip cancelled events
-                    
-                    synced_event_ids.append(event.external_event_id)
-                    
-                    try:
-                        action = self._upsert_meeting(event, connection_id, conn["organization_id"], conn["user_id"])
-                        if action == "new":
-                            result.new_meetings += 1
-                        elif action == "updated":
-                            result.updated_meetings += 1
-                        result.synced_meetings += 1
-                    except Exception as e:
-                        result.errors.append(f"Failed to save event {event.external_event_id}: {str(e)}")
-                
-                # Mark meetings that no longer exist as cancelled
-                result.deleted_meetings = self._mark_cancelled_meetings(connection_id, synced_event_ids)
+                result = await self._sync_google_connection(conn, connection_id)
             
             # Update connection sync status
             self.supabase.table("calendar_connections").update({
@@ -555,13 +636,7 @@ class CalendarSyncService:
             if result.new_meetings > 0 or result.updated_meetings > 0:
                 try:
                     matcher = ProspectMatcher(self.supabase)
-                    try:
-                        loop = asyncio.get_running_loop()
-                        # Already in async context, create task
-                        asyncio.create_task(matcher.match_all_unlinked(conn["organization_id"]))
-                    except RuntimeError:
-                        # No running loop, use asyncio.run()
-                        asyncio.run(matcher.match_all_unlinked(conn["organization_id"]))
+                    await matcher.match_all_unlinked(conn["organization_id"])
                     logger.info(f"Ran prospect matching for organization {conn['organization_id']}")
                 except Exception as match_error:
                     logger.error(f"Prospect matching failed: {match_error}")
@@ -582,8 +657,8 @@ class CalendarSyncService:
             
             return result
     
-    def sync_user_calendars(self, user_id: str) -> Dict[str, SyncResult]:
-        """Sync all calendar connections for a user."""
+    async def sync_user_calendars(self, user_id: str) -> Dict[str, SyncResult]:
+        """Sync all calendar connections for a user (concurrently)."""
         results = {}
         
         try:
@@ -592,8 +667,12 @@ class CalendarSyncService:
                 "id, provider"
             ).eq("user_id", user_id).eq("sync_enabled", True).execute()
             
-            for conn in connections.data or []:
-                results[conn["provider"]] = self.sync_connection(conn["id"])
+            conns = connections.data or []
+            synced = await asyncio.gather(
+                *[self.sync_connection_async(conn["id"]) for conn in conns]
+            )
+            for conn, result in zip(conns, synced):
+                results[conn["provider"]] = result
             
             return results
             
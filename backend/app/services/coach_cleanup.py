@@ -5,6 +5,7 @@ This service handles cleanup of coach suggestions when related entities
 (research, preps, followups) are deleted.
 """
 
+import inspect
 import logging
 from typing import Optional, List
 
@@ -21,7 +22,7 @@ async def cleanup_suggestions_for_entity(
     Delete coach suggestions related to a deleted entity.
     
     Args:
-        supabase: Supabase client
+        supabase: Supabase client (sync or async)
         entity_type: Type of entity ('research', 'prep', 'followup')
         entity_id: ID of the deleted entity
         user_id: Optional user ID to scope the cleanup
@@ -38,6 +39,8 @@ async def cleanup_suggestions_for_entity(
             query = query.eq("user_id", user_id)
         
         result = query.execute()
+        if inspect.isawaitable(result):
+            result = await result
         
         deleted_count = len(result.data) if result.data else 0
         
@@ -6,7 +6,8 @@ This service evaluates rules to generate suggestions based on user context.
 """
 
 from typing import List, Dict, Any, Optional
-from datetime import datetime, timedelta
+from datetime import datetime
+import asyncio
 import logging
 
 from app.models.coach import (
@@ -286,18 +287,45 @@ class CoachRuleEngine:
 # CONTEXT BUILDER
 # =============================================================================
 
+# Context sections, and the suggestion types that depend on each
+CONTEXT_SECTIONS: Dict[str, set] = {
+    "profiles": {SuggestionType.COMPLETE_PROFILE},
+    "research": {SuggestionType.ADD_CONTACTS, SuggestionType.OVERDUE_PROSPECT},
+    "preps": {SuggestionType.CREATE_FOLLOWUP},
+    "followups": {SuggestionType.CREATE_FOLLOWUP, SuggestionType.GENERATE_ACTION},
+}
+
+
+def sections_for_types(suggestion_types) -> set:
+    """Context sections needed to evaluate the given suggestion types."""
+    return {
+        section for section, types in CONTEXT_SECTIONS.items()
+        if types & set(suggestion_types)
+    }
+
+
 async def build_user_context(
     supabase,
     user_id: str,
-    organization_ids: list[str]
+    organization_ids: list[str],
+    sections: Optional[set] = None
 ) -> UserContext:
     """
     Build the user context by gathering all relevant data.
     This is used by the rule engine to evaluate suggestions.
     
+    Expects the async Supabase client (see get_supabase_async).
+    
     Note: organization_ids is a list to support users who may be members
     of multiple organizations. All data should be stored under the user's
     primary organization from organization_members table.
+    
+    All rule inputs come from a fixed set of bulk queries (filtered with
+    in_() over all organizations, related rows embedded), run concurrently,
+    so the query count does not grow with the number of briefs/follow-ups.
+    
+    sections limits which parts of the context are loaded (see
+    CONTEXT_SECTIONS); None loads everything.
     """
     
     # Use first org as primary for backward compatibility
@@ -311,139 +339,119 @@ async def build_user_context(
     )
     
     try:
-        # Check sales profile (user-based, not org-based)
-        profile_result = supabase.table("sales_profiles") \
-            .select("full_name") \
-            .eq("user_id", user_id) \
-            .execute()
-        context.has_sales_profile = bool(
-            profile_result.data and 
-            profile_result.data[0].get("full_name")
-        )
+        if sections is None:
+            sections = set(CONTEXT_SECTIONS)
+        load_preps = "preps" in sections
+        load_followups = "followups" in sections or load_preps
+        
+        async def no_rows():
+            return None
         
-        # Check company profile - check ALL organizations
-        context.has_company_profile = False
-        for org_id in organization_ids:
-            company_result = supabase.table("company_profiles") \
+        def when(condition: bool, query):
+            return query.execute() if condition else no_rows()
+        
+        has_orgs = bool(organization_ids)
+        
+        results = await asyncio.gather(
+            # Sales profile (user-based, not org-based)
+            when("profiles" in sections, supabase.table("sales_profiles") \
+                .select("full_name") \
+                .eq("user_id", user_id)),
+            # Learned patterns
+            supabase.table("coach_user_patterns") \
+                .select("pattern_type, pattern_data") \
+                .eq("user_id", user_id) \
+                .execute(),
+            # Company profiles - check ALL organizations
+            when(has_orgs and "profiles" in sections, supabase.table("company_profiles") \
                 .select("company_name") \
-                .eq("organization_id", org_id) \
-                .execute()
-            if company_result.data and company_result.data[0].get("company_name"):
-                context.has_company_profile = True
-                break
+                .in_("organization_id", organization_ids)),
+            # Completed research, with the prospect's contact IDs embedded
+            when(has_orgs and "research" in sections, supabase.table("research_briefs") \
+                .select("id, company_name, prospect_id, status, completed_at, prospects(prospect_contacts(id))") \
+                .in_("organization_id", organization_ids) \
+                .eq("status", "completed")),
+            # Completed preps
+            when(has_orgs and load_preps, supabase.table("meeting_preps") \
+                .select("id, prospect_company_name, status, completed_at") \
+                .in_("organization_id", organization_ids) \
+                .eq("status", "completed")),
+            # All follow-ups, with generated action IDs embedded
+            when(has_orgs and load_followups, supabase.table("followups") \
+                .select("id, prospect_company_name, status, completed_at, followup_actions(id)") \
+                .in_("organization_id", organization_ids)),
+        )
+        profile_result, patterns_result = results[0], results[1]
+        company_rows, research_rows, prep_rows, followup_rows = [
+            (r.data or []) if r is not None else [] for r in results[2:]
+        ]
+        
+        if "profiles" in sections:
+            context.has_sales_profile = bool(
+                profile_result.data and 
+                profile_result.data[0].get("full_name")
+            )
+            
+            context.has_company_profile = any(
+                row.get("company_name") for row in company_rows
+            )
         
-        # Get completed research briefs - check ALL organizations
+        # Research briefs and which of them still need contacts
         all_research = []
-        for org_id in organization_ids:
-            research_result = supabase.table("research_briefs") \
-                .select("id, company_name, prospect_id, status, completed_at") \
-                .eq("organization_id", org_id) \
-                .eq("status", "completed") \
-                .execute()
-            if research_result.data:
-                all_research.extend(research_result.data)
+        for row in research_rows:
+            prospect = row.pop("prospects", None) or {}
+            all_research.append(row)
+            if row.get("prospect_id") and not prospect.get("prospect_contacts"):
+                context.research_without_contacts.append(row)
         
         if all_research:
             context.research_briefs = all_research
-            
-            # For each research, check if it has contacts
-            for research in all_research:
-                prospect_id = research.get("prospect_id")
-                if prospect_id:
-                    contacts_result = supabase.table("prospect_contacts") \
-                        .select("id") \
-                        .eq("prospect_id", prospect_id) \
-                        .execute()
-                    
-                    if not contacts_result.data:
-                        context.research_without_contacts.append(research)
         
-        # Get completed preps - check ALL organizations
-        all_preps = []
-        all_followups = []
-        for org_id in organization_ids:
-            preps_result = supabase.table("meeting_preps") \
-                .select("id, prospect_company_name, status, completed_at") \
-                .eq("organization_id", org_id) \
-                .eq("status", "completed") \
-                .execute()
-            if preps_result.data:
-                all_preps.extend(preps_result.data)
-            
-            followups_result = supabase.table("followups") \
-                .select("prospect_company_name") \
-                .eq("organization_id", org_id) \
-                .execute()
-            if followups_result.data:
-                all_followups.extend(followups_result.data)
-        
-        if all_preps:
-            context.preps_completed = all_preps
+        # Preps without a follow-up for the same company
+        if load_preps and prep_rows:
+            context.preps_completed = prep_rows
             
             followup_companies = {
-                f.get("prospect_company_name", "").lower() 
-                for f in all_followups
+                (f.get("prospect_company_name") or "").lower()
+                for f in followup_rows
             }
             
-            for prep in all_preps:
-                company = prep.get("prospect_company_name", "").lower()
+            for prep in prep_rows:
+                company = (prep.get("prospect_company_name") or "").lower()
                 if company not in followup_companies:
                     context.preps_without_followup.append(prep)
         
-        # Get completed follow-ups - check ALL organizations
+        # Completed follow-ups and which of them have no actions yet
         all_completed_followups = []
-        for org_id in organization_ids:
-            followups_result = supabase.table("followups") \
-                .select("id, prospect_company_name, status, completed_at") \
-                .eq("organization_id", org_id) \
-                .eq("status", "completed") \
-                .execute()
-            if followups_result.data:
-                all_completed_followups.extend(followups_result.data)
+        for row in followup_rows:
+            actions = row.pop("followup_actions", None)
+            if row.get("status") != "completed":
+                continue
+            all_completed_followups.append(row)
+            if not actions:
+                context.followups_without_actions.append(row)
         
         if all_completed_followups:
             context.followups_completed = all_completed_followups
-            
-            # Check which follow-ups have generated actions
-            for followup in all_completed_followups:
-                actions_result = supabase.table("followup_actions") \
-                    .select("id") \
-                    .eq("followup_id", followup.get("id")) \
-                    .execute()
-                
-                if not actions_result.data:
-                    context.followups_without_actions.append(followup)
         
-        # Get inactive prospects (no activity in 7+ days) - check ALL organizations
-        week_ago = (datetime.now() - timedelta(days=7)).isoformat()
-        
-        for org_id in organization_ids:
-            inactive_research = supabase.table("research_briefs") \
-                .select("id, company_name, completed_at") \
-                .eq("organization_id", org_id) \
-                .eq("status", "completed") \
-                .lt("completed_at", week_ago) \
-                .execute()
+        # Inactive prospects (research completed 7+ days ago)
+        now = datetime.now()
+        for research in all_research:
+            completed_at = research.get("completed_at")
+            if not completed_at:
+                continue
+            completed = datetime.fromisoformat(
+                completed_at.replace("Z", "+00:00")
+            ).replace(tzinfo=None)
+            days_ago = (now - completed).days
             
-            if inactive_research.data:
-                for research in inactive_research.data:
-                    days_ago = (datetime.now() - datetime.fromisoformat(
-                        research.get("completed_at", datetime.now().isoformat()).replace("Z", "+00:00")
-                    )).days
-                    
-                    if days_ago >= 7:
-                        context.inactive_prospects.append({
-                            "company_name": research.get("company_name"),
-                            "research_id": research.get("id"),
-                            "days_inactive": days_ago,
-                            "last_activity": research.get("completed_at"),
-                        })
-        
-        # Get learned patterns
-        patterns_result = supabase.table("coach_user_patterns") \
-            .select("pattern_type, pattern_data") \
-            .eq("user_id", user_id) \
-            .execute()
+            if days_ago >= 7:
+                context.inactive_prospects.append({
+                    "company_name": research.get("company_name"),
+                    "research_id": research.get("id"),
+                    "days_inactive": days_ago,
+                    "last_activity": completed_at,
+                })
         
         if patterns_result.data:
             for pattern in patterns_result.data:
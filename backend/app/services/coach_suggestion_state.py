@@ -0,0 +1,238 @@
+"""
+AI Sales Coach "Luna" - Materialized Suggestion State
+
+Keeps the pending rows in coach_suggestions in sync with the rule engine,
+so GET /suggestions can be served from a single indexed read instead of
+rebuilding the full user context on every widget poll.
+
+Refreshes are driven by lifecycle events (research/prep/follow-up
+completed, contact added); each event only re-evaluates the suggestion
+types it can affect. A daily cron does a full refresh to pick up
+time-based rules (overdue prospects) and expired snoozes.
+
+Work that runs as a BackgroundTasks fallback instead of in Inngest sends
+the same events through notify_suggestions_changed(); if they can't be
+delivered, the user's state is dropped so the next GET re-evaluates.
+
+Enabled with COACH_SUGGESTIONS_MODE=materialized (default: live).
+"""
+
+import os
+import asyncio
+import logging
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional
+
+from app.models.coach import EntityType, Suggestion, SuggestionAction, SuggestionType
+from app.services.coach_rules import (
+    CONTEXT_SECTIONS,
+    build_user_context,
+    rule_engine,
+    sections_for_types,
+)
+
+logger = logging.getLogger(__name__)
+
+COACH_SUGGESTIONS_MODE = os.getenv("COACH_SUGGESTIONS_MODE", "live").lower()
+
+# Every suggestion type the rule engine can produce
+ALL_SUGGESTION_TYPES = set().union(*CONTEXT_SECTIONS.values())
+
+
+def use_materialized_suggestions() -> bool:
+    """Whether GET /suggestions should read the materialized state."""
+    return COACH_SUGGESTIONS_MODE == "materialized"
+
+
+async def notify_suggestions_changed(event_name: str, data: Dict[str, Any]) -> None:
+    """
+    Send a lifecycle event from a BackgroundTasks (non-Inngest) code path.
+
+    If the event can't be delivered (Inngest disabled or unreachable), the
+    user's materialized state is dropped instead, so the next GET
+    /suggestions re-evaluates the rules rather than serving stale ones.
+    Safe to call from any event loop (uses the sync service client).
+    """
+    from app.database import get_supabase_service
+    from app.inngest.events import send_event
+
+    user_id = data.get("user_id")
+    if not user_id:
+        return
+
+    if await send_event(event_name, data, user={"id": user_id}):
+        return
+
+    if not use_materialized_suggestions():
+        return
+
+    def drop_state():
+        get_supabase_service().table("coach_suggestion_state") \
+            .delete() \
+            .eq("user_id", user_id) \
+            .execute()
+
+    try:
+        await asyncio.to_thread(drop_state)
+    except Exception as e:
+        logger.warning(f"Could not invalidate coach suggestions for user {user_id}: {e}")
+
+
+def suggestion_key(suggestion_type: str, related_entity_id: Optional[str]) -> str:
+    """Identity of a suggestion: one pending row per type/entity."""
+    return f"{suggestion_type}:{related_entity_id or ''}"
+
+
+def _parse_datetime(value: Optional[str]) -> Optional[datetime]:
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except ValueError:
+        return None
+
+
+def suggestion_from_row(row: Dict[str, Any]) -> Suggestion:
+    """Build a Suggestion from a coach_suggestions row."""
+    data = row.get("suggestion_data") or {}
+    return Suggestion(
+        id=row["id"],
+        user_id=row["user_id"],
+        organization_id=row.get("organization_id") or "",
+        suggestion_type=SuggestionType(row["suggestion_type"]),
+        title=data.get("title", ""),
+        description=data.get("description", ""),
+        reason=data.get("reason"),
+        priority=row.get("priority") or 50.0,
+        action_route=data.get("action_route"),
+        action_label=data.get("action_label"),
+        icon=data.get("icon") or "💡",
+        related_entity_type=EntityType(row["related_entity_type"]) if row.get("related_entity_type") else None,
+        related_entity_id=row.get("related_entity_id"),
+        shown_at=_parse_datetime(row.get("shown_at")) or datetime.now(),
+        expires_at=None,
+        action_taken=row.get("action_taken"),
+        action_taken_at=_parse_datetime(row.get("action_taken_at")),
+        snooze_until=_parse_datetime(row.get("snooze_until")),
+        feedback_rating=row.get("feedback_rating"),
+    )
+
+
+async def refresh_user_suggestions(
+    supabase,
+    user_id: str,
+    organization_ids: List[str],
+    suggestion_types: Optional[Iterable[SuggestionType]] = None
+) -> Dict[str, int]:
+    """
+    Re-evaluate the rules for a user and reconcile their pending suggestions.
+
+    Only the given suggestion types are touched (all if None): new
+    suggestions are inserted, changed ones updated in place, and pending
+    rows whose rule no longer fires are marked expired. Suggestions that
+    are still snoozed are left alone.
+
+    Expects the async Supabase client (see get_supabase_async).
+
+    Returns counts of inserted/updated/expired rows.
+    """
+    types = set(suggestion_types) if suggestion_types else set(ALL_SUGGESTION_TYPES)
+    type_values = [t.value for t in types]
+    primary_org_id = organization_ids[0] if organization_ids else None
+    now = datetime.now()
+    counts = {"inserted": 0, "updated": 0, "expired": 0}
+
+    if not primary_org_id:
+        return counts
+
+    context = await build_user_context(
+        supabase, user_id, organization_ids, sections=sections_for_types(types)
+    )
+
+    desired: Dict[str, Any] = {}
+    for suggestion in rule_engine.evaluate_all(context):
+        if suggestion.suggestion_type not in types:
+            continue
+        if context.patterns:
+            suggestion = rule_engine.adjust_priority_with_patterns(suggestion, context.patterns)
+        key = suggestion_key(suggestion.suggestion_type.value, suggestion.related_entity_id)
+        # Keep the highest-priority suggestion per type/entity
+        if key not in desired or suggestion.priority > desired[key].priority:
+            desired[key] = suggestion
+
+    existing_result = await supabase.table("coach_suggestions") \
+        .select("id, suggestion_type, related_entity_id, priority, suggestion_data, action_taken, snooze_until") \
+        .eq("user_id", user_id) \
+        .in_("suggestion_type", type_values) \
+        .or_("action_taken.is.null,action_taken.eq.snoozed") \
+        .execute()
+
+    pending: Dict[str, Dict[str, Any]] = {}
+    stale_ids = []
+    for row in (existing_result.data or []):
+        key = suggestion_key(row.get("suggestion_type", ""), row.get("related_entity_id"))
+        if row.get("action_taken") == SuggestionAction.SNOOZED.value:
+            snooze_until = _parse_datetime(row.get("snooze_until"))
+            if snooze_until and snooze_until.replace(tzinfo=None) > now:
+                desired.pop(key, None)
+            continue
+        if key in pending or key not in desired:
+            stale_ids.append(row["id"])
+        else:
+            pending[key] = row
+
+    new_rows = []
+    for key, suggestion in desired.items():
+        suggestion_data = {
+            "title": suggestion.title,
+            "description": suggestion.description,
+            "reason": suggestion.reason,
+            "action_route": suggestion.action_route,
+            "action_label": suggestion.action_label,
+            "icon": suggestion.icon,
+        }
+        row = pending.get(key)
+        if row is None:
+            new_rows.append({
+                "user_id": user_id,
+                "organization_id": primary_org_id,
+                "suggestion_type": suggestion.suggestion_type.value,
+                "suggestion_data": suggestion_data,
+                "priority": suggestion.priority,
+                "related_entity_type": suggestion.related_entity_type.value if suggestion.related_entity_type else None,
+                "related_entity_id": suggestion.related_entity_id,
+                "shown_at": now.isoformat(),
+            })
+        elif row.get("priority") != suggestion.priority or row.get("suggestion_data") != suggestion_data:
+            await supabase.table("coach_suggestions") \
+                .update({"priority": suggestion.priority, "suggestion_data": suggestion_data}) \
+                .eq("id", row["id"]) \
+                .execute()
+            counts["updated"] += 1
+
+    if new_rows:
+        await supabase.table("coach_suggestions") \
+            .insert(new_rows) \
+            .execute()
+        counts["inserted"] = len(new_rows)
+
+    if stale_ids:
+        await supabase.table("coach_suggestions") \
+            .update({
+                "action_taken": SuggestionAction.EXPIRED.value,
+                "action_taken_at": now.isoformat(),
+            }) \
+            .in_("id", stale_ids) \
+            .execute()
+        counts["expired"] = len(stale_ids)
+
+    await supabase.table("coach_suggestion_state") \
+        .upsert({
+            "user_id": user_id,
+            "organization_id": primary_org_id,
+            "refreshed_at": now.isoformat(),
+        }, on_conflict="user_id") \
+        .execute()
+
+    logger.info(f"Refreshed coach suggestions for user {user_id}: {counts}")
+    return counts
@@ -0,0 +1,193 @@
+"""
+Document parsing for knowledge base ingestion.
+
+Text extraction (PyPDF2, python-docx, markdown) and tokenization (tiktoken)
+are CPU-bound and can hold the event loop for seconds on large files. In
+"process" mode (the default) each file is parsed in a worker process of
+its own (at most KB_PARSE_WORKERS at once), so API requests on the same
+instance keep being served while files are ingested, and a file that
+hangs or crashes only stops its own worker; "inline" mode streams them in
+the calling process instead.
+
+Either way chunks are streamed in batches as they are made: workers send
+each batch back through a small bounded queue, so neither process holds a
+whole document's chunks, and a worker waits while the caller is still
+storing earlier batches.
+
+Configuration:
+- KB_PARSE_MODE: "process" or "inline"
+- KB_PARSE_WORKERS: Files parsed at once
+- KB_PARSE_TIMEOUT: Seconds a started worker may take to produce the next batch
+- KB_PARSE_TOTAL_TIMEOUT: Seconds a file may take from the worker's start
+  to its last batch (including time the caller spends on earlier batches)
+"""
+
+import io
+import os
+import queue
+import asyncio
+import logging
+import threading
+import multiprocessing
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+from app.services.file_processor import FileProcessor
+from app.services.kb_chunks import KB_INGEST_BATCH_SIZE, iter_chunk_batches
+from app.services.text_chunker import TextChunker
+
+logger = logging.getLogger(__name__)
+
+KB_PARSE_MODE = os.getenv("KB_PARSE_MODE", "process")
+KB_PARSE_WORKERS = int(os.getenv("KB_PARSE_WORKERS", "2"))
+KB_PARSE_TIMEOUT = float(os.getenv("KB_PARSE_TIMEOUT", "300"))
+KB_PARSE_TOTAL_TIMEOUT = float(os.getenv("KB_PARSE_TOTAL_TIMEOUT", "1800"))
+
+# Batches a worker may send ahead of the caller (bounds memory per file)
+KB_PARSE_QUEUE_SIZE = 2
+
+# Seconds between checks for a free slot or a finished worker
+_POLL_INTERVAL = 1.0
+
+# Sent by a worker once it starts on its file (the timeouts run from here)
+_STARTED = "started"
+
+# Marks an empty poll (None is the worker's end of file)
+_NOTHING = object()
+
+# spawn: workers don't inherit the server's threads and clients
+_context = multiprocessing.get_context("spawn")
+
+# Shared by every event loop in the process (API, Inngest, BackgroundTasks)
+_worker_slots = threading.BoundedSemaphore(KB_PARSE_WORKERS)
+
+
+def extract_chunk_batches(
+    file_data: bytes,
+    file_type: str,
+    chunk_size: int,
+    chunk_overlap: int,
+    batch_size: int,
+    batches
+) -> None:
+    """
+    Extract and chunk a file, sending batches as they fill (runs in a worker process).
+
+    Puts _STARTED on the batches queue, then each batch, then None when
+    the file is done, or the exception if parsing fails.
+    """
+    batches.put(_STARTED)
+    try:
+        chunker = TextChunker(chunk_size=chunk_size, chunk_overlap=chunk_overlap)
+        pieces = FileProcessor.iter_text(io.BytesIO(file_data), file_type)
+
+        for batch in iter_chunk_batches(chunker.iter_chunks(pieces), batch_size):
+            batches.put(batch)
+    except Exception as e:
+        batches.put(e)
+        return
+
+    batches.put(None)
+
+
+async def parse_document(
+    file_data: bytes,
+    file_type: str,
+    chunk_size: int = 500,
+    chunk_overlap: int = 50,
+    batch_size: int = KB_INGEST_BATCH_SIZE
+) -> AsyncIterator[List[Dict[str, Any]]]:
+    """
+    Extract and chunk a file without blocking the event loop.
+
+    Use it with contextlib.aclosing(), so a caller that stops early
+    releases the worker right away.
+
+    Args:
+        file_data: File contents
+        file_type: MIME type of the file
+        chunk_size: Target size of each chunk in tokens
+        chunk_overlap: Number of tokens to overlap between chunks
+        batch_size: Maximum chunks per batch
+
+    Yields:
+        Batches of chunks in order (see TextChunker.chunk_text)
+
+    Raises:
+        ValueError: If the file can't be parsed or parsing times out
+    """
+    if KB_PARSE_MODE != "process":
+        chunker = TextChunker(chunk_size=chunk_size, chunk_overlap=chunk_overlap)
+        chunks = chunker.iter_chunks(FileProcessor.iter_text(io.BytesIO(file_data), file_type))
+        for batch in iter_chunk_batches(chunks, batch_size):
+            yield batch
+        return
+
+    # Polled rather than awaited in a thread, so a cancelled caller can't
+    # leave a slot taken
+    while not _worker_slots.acquire(blocking=False):
+        await asyncio.sleep(_POLL_INTERVAL)
+
+    process = None
+    try:
+        batches = _context.Queue(maxsize=KB_PARSE_QUEUE_SIZE)
+        process = _context.Process(
+            target=extract_chunk_batches,
+            args=(file_data, file_type, chunk_size, chunk_overlap, batch_size, batches),
+            daemon=True
+        )
+        process.start()
+
+        if await _next_item(batches, process, timeout=None) != _STARTED:
+            raise ValueError("Document parsing worker failed to start")
+
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + KB_PARSE_TOTAL_TIMEOUT
+
+        while True:
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                logger.error(f"Document parsing took over {KB_PARSE_TOTAL_TIMEOUT:.0f}s in total, stopping its worker")
+                raise ValueError(f"Document parsing timed out after {KB_PARSE_TOTAL_TIMEOUT:.0f}s")
+            batch = await _next_item(batches, process, timeout=min(KB_PARSE_TIMEOUT, remaining))
+            if batch is None:
+                return
+            yield batch
+    finally:
+        if process is not None:
+            # Done, failed or abandoned: the worker's output is no longer needed
+            if process.is_alive():
+                process.terminate()
+            process.join(_POLL_INTERVAL)
+        _worker_slots.release()
+
+
+async def _next_item(batches, process, timeout: Optional[float]) -> Any:
+    """Wait for the worker's next queue item (no deadline if timeout is None)."""
+    loop = asyncio.get_running_loop()
+    deadline = None if timeout is None else loop.time() + timeout
+
+    while True:
+        try:
+            item = await asyncio.to_thread(batches.get, True, _POLL_INTERVAL)
+        except queue.Empty:
+            item = _NOTHING
+
+        if isinstance(item, Exception):
+            raise item
+        if item is not _NOTHING:
+            return item
+
+        if not process.is_alive():
+            # Items sent right before the worker exited
+            try:
+                item = await asyncio.to_thread(batches.get_nowait)
+            except queue.Empty:
+                logger.error(f"Document parsing worker exited with code {process.exitcode}")
+                raise ValueError("Document parsing worker died (file may be too large)")
+            if isinstance(item, Exception):
+                raise item
+            return item
+
+        if deadline is not None and loop.time() > deadline:
+            logger.error(f"Document parsing timed out after {timeout:.0f}s, stopping its worker")
+            raise ValueError(f"Document parsing timed out after {timeout:.0f}s")
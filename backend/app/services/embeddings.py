@@ -1,78 +1,253 @@
 """
 Embeddings service using Voyage AI.
 Generates vector embeddings for text chunks.
+
+Large inputs are split into batches that stay within Voyage's per-request
+limits (texts and tokens); batches are embedded concurrently (bounded) and
+retried with exponential backoff, and results keep the input order.
+
+Single-text (query) embeddings are cached in two tiers, an in-process LRU
+and the embedding_cache table, keyed by hash(model, input_type, text).
+Table reads run in a worker thread and writes in the background, so the
+cache never blocks the event loop.
 """
 
 import os
-from typing import List
+import asyncio
+import hashlib
+import logging
+from typing import Dict, Iterator, List, Optional
 import voyageai
 
+from app.database import get_supabase_service
+from app.utils.cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+
+# Voyage per-request limits (voyage-2: 128 texts, 320K tokens). The token
+# budget is kept well below the limit because it is estimated, not counted.
+EMBED_BATCH_MAX_TEXTS = 128
+EMBED_BATCH_MAX_TOKENS = 100_000
+
+# Batches in flight at once per embed_texts() call
+EMBED_CONCURRENCY = int(os.getenv("EMBED_CONCURRENCY", "4"))
+
+# Retries per batch on rate limits, timeouts and 503s (exponential backoff)
+EMBED_MAX_RETRIES = 4
+
+# Query embedding cache. Embeddings are deterministic per model/input type/text,
+# so entries only expire to bound memory (the table keeps them longer).
+QUERY_EMBEDDING_CACHE_SIZE = int(os.getenv("QUERY_EMBEDDING_CACHE_SIZE", "1024"))
+QUERY_EMBEDDING_CACHE_TTL = 24 * 3600
+
+_query_cache = TTLCache(maxsize=QUERY_EMBEDDING_CACHE_SIZE, ttl=QUERY_EMBEDDING_CACHE_TTL)
+_query_cache_counters = {"memory_hits": 0, "table_hits": 0, "misses": 0}
+
+# embedding_cache writes still running (kept referenced until done)
+_pending_cache_writes = set()
+
+
+def estimate_tokens(text: str) -> int:
+    """Conservative token estimate (Voyage averages ~4 chars per token)."""
+    return len(text) // 3 + 1
+
+
+def iter_batches(texts: List[str]) -> Iterator[List[str]]:
+    """Split texts into consecutive batches within the per-request limits."""
+    batch: List[str] = []
+    batch_tokens = 0
+
+    for text in texts:
+        tokens = estimate_tokens(text)
+        if batch and (len(batch) >= EMBED_BATCH_MAX_TEXTS or batch_tokens + tokens > EMBED_BATCH_MAX_TOKENS):
+            yield batch
+            batch, batch_tokens = [], 0
+        batch.append(text)
+        batch_tokens += tokens
+
+    if batch:
+        yield batch
+
+
+def embedding_cache_key(model: str, input_type: str, text: str) -> str:
+    """Content hash identifying an embedding."""
+    return hashlib.sha256(f"{model}\x00{input_type}\x00{text}".encode("utf-8")).hexdigest()
+
+
+def get_query_cache_stats() -> Dict[str, int]:
+    """Hit/miss counters of the query embedding cache (per process)."""
+    return {**_query_cache_counters, "memory_size": len(_query_cache)}
+
+
+def _read_cached_embedding(cache_key: str) -> Optional[List[float]]:
+    """Read an embedding from the embedding_cache table."""
+    try:
+        result = get_supabase_service().table("embedding_cache") \
+            .select("embedding") \
+            .eq("cache_key", cache_key) \
+            .limit(1) \
+            .execute()
+        return result.data[0]["embedding"] if result.data else None
+    except Exception as e:
+        logger.warning(f"Could not read embedding_cache: {e}")
+        return None
+
+
+def _store_cached_embedding(cache_key: str, model: str, input_type: str, embedding: List[float]) -> None:
+    """Store an embedding in the embedding_cache table."""
+    try:
+        get_supabase_service().table("embedding_cache") \
+            .upsert({
+                "cache_key": cache_key,
+                "model": model,
+                "input_type": input_type,
+                "embedding": embedding,
+            }, on_conflict="cache_key") \
+            .execute()
+    except Exception as e:
+        logger.warning(f"Could not write embedding_cache: {e}")
+
 
 class EmbeddingsService:
     """Generate embeddings using Voyage AI."""
-    
+
     def __init__(self):
-        """Initialize Voyage AI client."""
+        """Initialize Voyage AI clients."""
         api_key = os.getenv("VOYAGE_API_KEY")
         if not api_key:
             raise ValueError("VOYAGE_API_KEY environment variable not set")
-        
-        self.client = voyageai.Client(api_key=api_key)
+
+        self.client = voyageai.Client(api_key=api_key, max_retries=EMBED_MAX_RETRIES)
+        self.async_client = voyageai.AsyncClient(api_key=api_key, max_retries=EMBED_MAX_RETRIES)
         self.model = "voyage-2"
-    
+
+    async def embed_texts(
+        self,
+        texts: List[str],
+        input_type: str = "document"
+    ) -> List[List[float]]:
+        """
+        Generate embeddings for a list of texts without blocking the event loop.
+
+        Texts are embedded in size-bounded batches, up to EMBED_CONCURRENCY
+        batches at a time.
+
+        Args:
+            texts: List of text strings to embed
+            input_type: "document" for knowledge base, "query" for search
+
+        Returns:
+            List of embedding vectors (1024 dimensions each), in input order
+        """
+        if not texts:
+            return []
+
+        semaphore = asyncio.Semaphore(EMBED_CONCURRENCY)
+
+        async def embed_batch(batch: List[str]) -> List[List[float]]:
+            async with semaphore:
+                response = await self.async_client.embed(
+                    texts=batch,
+                    model=self.model,
+                    input_type=input_type
+                )
+                return response.embeddings
+
+        try:
+            results = await asyncio.gather(*[embed_batch(batch) for batch in iter_batches(texts)])
+        except Exception as e:
+            raise ValueError(f"Failed to generate embeddings: {str(e)}")
+
+        return [embedding for batch_embeddings in results for embedding in batch_embeddings]
+
     def generate_embeddings(
         self,
         texts: List[str],
         input_type: str = "document"
     ) -> List[List[float]]:
         """
-        Generate embeddings for a list of texts.
-        
+        Generate embeddings for a list of texts (blocking, one batch at a time).
+
+        Prefer embed_texts() from async code.
+
         Args:
             texts: List of text strings to embed
             input_type: "document" for knowledge base, "query" for search
-            
+
         Returns:
             List of embedding vectors (1024 dimensions each)
         """
         if not texts:
             return []
-        
+
         try:
-            response = self.client.embed(
-                texts=texts,
-                model=self.model,
-                input_type=input_type
-            )
-            return response.embeddings
+            embeddings = []
+            for batch in iter_batches(texts):
+                response = self.client.embed(
+                    texts=batch,
+                    model=self.model,
+                    input_type=input_type
+                )
+                embeddings.extend(response.embeddings)
+            return embeddings
         except Exception as e:
             raise ValueError(f"Failed to generate embeddings: {str(e)}")
-    
+
     def generate_embedding(self, text: str, input_type: str = "document") -> List[float]:
         """
         Generate embedding for a single text.
-        
+
         Args:
             text: Text string to embed
             input_type: "document" for knowledge base, "query" for search
-            
+
         Returns:
             Embedding vector (1024 dimensions)
         """
         embeddings = self.generate_embeddings([text], input_type)
         return embeddings[0] if embeddings else []
-    
+
     async def embed_text(self, text: str, input_type: str = "query") -> List[float]:
         """
-        Async wrapper for embedding a single text (for search queries).
-        
+        Embed a single text (for search queries) without blocking the event loop.
+
+        Served from the in-process cache, then the embedding_cache table;
+        only misses call Voyage (and are written to both tiers, the table
+        in the background).
+
         Args:
             text: Text string to embed
             input_type: "query" for search, "document" for knowledge base
-            
+
         Returns:
             Embedding vector (1024 dimensions)
         """
-        # The underlying API is synchronous, but we provide async interface
-        # for compatibility with async code
-        return self.generate_embedding(text, input_type)
\ No newline at end of file
+        cache_key = embedding_cache_key(self.model, input_type, text)
+
+        embedding = _query_cache.get(cache_key)
+        if embedding is not None:
+            _query_cache_counters["memory_hits"] += 1
+            return embedding
+
+        embedding = await asyncio.to_thread(_read_cached_embedding, cache_key)
+        if embedding is not None:
+            _query_cache_counters["table_hits"] += 1
+            _query_cache.set(cache_key, embedding)
+            return embedding
+
+        _query_cache_counters["misses"] += 1
+        embeddings = await self.embed_texts([text], input_type)
+        if not embeddings:
+            return []
+
+        embedding = embeddings[0]
+        _query_cache.set(cache_key, embedding)
+
+        # Write to the table in the background; the caller doesn't wait for it
+        task = asyncio.create_task(asyncio.to_thread(
+            _store_cached_embedding, cache_key, self.model, input_type, embedding
+        ))
+        _pending_cache_writes.add(task)
+        task.add_done_callback(_pending_cache_writes.discard)
+        return embedding
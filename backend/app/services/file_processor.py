@@ -1,14 +1,22 @@
 """
 File processing service for extracting text from various file types.
 Supports: PDF, DOCX, TXT, MD (Markdown)
+
+iter_text() yields a document piece by piece (PDF pages, DOCX paragraphs)
+so large files can be chunked without holding all of their text at once.
 """
 
 import io
-from typing import BinaryIO
+import re
+from typing import BinaryIO, Iterator
 import PyPDF2
 from docx import Document
 import markdown
 
+# End of a block element in Markdown's HTML output (blocks are separated by
+# a single newline there; a blank line keeps them paragraphs once tags are removed)
+_MARKDOWN_BLOCK_END = re.compile(r"(</(?:h[1-6]|p|ul|ol|pre|blockquote|table|div)>|<hr\s*/?>)\n")
+
 
 class FileProcessor:
     """Extract text from different file types."""
@@ -44,36 +52,68 @@ class FileProcessor:
             raise ValueError(f"Unsupported file type: {file_type}")
     
     @staticmethod
-    def _extract_from_pdf(file: BinaryIO) -> str:
-        """Extract text from PDF file."""
+    def iter_text(file: BinaryIO, file_type: str) -> Iterator[str]:
+        """
+        Extract text from a file one piece at a time.
+        
+        PDFs are yielded per page and DOCX files per paragraph; other types
+        are small and yielded whole. Joining the pieces with blank lines
+        gives extract_text().
+        
+        Args:
+            file: Binary file object
+            file_type: MIME type of the file
+            
+        Yields:
+            Non-empty text pieces in document order
+            
+        Raises:
+            ValueError: If file type is not supported
+        """
+        if file_type == "application/pdf":
+            yield from FileProcessor._iter_pdf_pages(file)
+        elif file_type == "application/vnd.openxmlformats-officedocument.wordprocessingml.document":
+            yield from FileProcessor._iter_docx_paragraphs(file)
+        else:
+            text = FileProcessor.extract_text(file, file_type)
+            if text:
+                yield text
+    
+    @staticmethod
+    def _iter_pdf_pages(file: BinaryIO) -> Iterator[str]:
+        """Yield the text of each PDF page."""
         try:
             pdf_reader = PyPDF2.PdfReader(file)
-            text_parts = []
             
             for page in pdf_reader.pages:
                 text = page.extract_text()
                 if text:
-                    text_parts.append(text)
-            
-            return "\n\n".join(text_parts)
+                    yield text
         except Exception as e:
             raise ValueError(f"Failed to extract text from PDF: {str(e)}")
     
     @staticmethod
-    def _extract_from_docx(file: BinaryIO) -> str:
-        """Extract text from DOCX file."""
+    def _iter_docx_paragraphs(file: BinaryIO) -> Iterator[str]:
+        """Yield the text of each non-empty DOCX paragraph."""
         try:
             doc = Document(file)
-            text_parts = []
             
             for paragraph in doc.paragraphs:
                 if paragraph.text.strip():
-                    text_parts.append(paragraph.text)
-            
-            return "\n\n".join(text_parts)
+                    yield paragraph.text
         except Exception as e:
             raise ValueError(f"Failed to extract text from DOCX: {str(e)}")
     
+    @staticmethod
+    def _extract_from_pdf(file: BinaryIO) -> str:
+        """Extract text from PDF file."""
+        return "\n\n".join(FileProcessor._iter_pdf_pages(file))
+    
+    @staticmethod
+    def _extract_from_docx(file: BinaryIO) -> str:
+        """Extract text from DOCX file."""
+        return "\n\n".join(FileProcessor._iter_docx_paragraphs(file))
+    
     @staticmethod
     def _extract_from_txt(file: BinaryIO) -> str:
         """Extract text from TXT file."""
@@ -100,8 +140,8 @@ class FileProcessor:
             
             # Convert markdown to plain text (removes formatting)
             html = markdown.markdown(md_text)
-            # Simple HTML tag removal (for plain text)
-            import re
+            # Simple HTML tag removal (for plain text), keeping blocks apart
+            html = _MARKDOWN_BLOCK_END.sub(r"\1\n\n", html)
             text = re.sub('<[^<]+?>', '', html)
             return text
         except Exception as e:
@@ -5,9 +5,11 @@ SPEC-038: Meetings & Calendar Integration
 import os
 import secrets
 import logging
-from typing import Optional, Tuple
+from datetime import datetime, timedelta, timezone
+from typing import Optional, Tuple, List
 from urllib.parse import urlencode
 
+import httpx
 from google_auth_oauthlib.flow import Flow
 from google.oauth2.credentials import Credentials
 from googleapiclient.discovery import build
@@ -32,6 +34,14 @@ REDIRECT_URI = os.getenv(
     "https://dealmotion.ai/auth/calendar/callback"
 )
 
+# Google Calendar REST API (called directly, no discovery document needed)
+CALENDAR_API_BASE = "https://www.googleapis.com/calendar/v3"
+TOKEN_URI = "https://oauth2.googleapis.com/token"
+
+
+class TokenExpiredError(ValueError):
+    """The access token was rejected (expired or revoked)."""
+
 
 class GoogleCalendarService:
     """Service for Google Calendar OAuth and API operations."""
@@ -164,6 +174,116 @@ class GoogleCalendarService:
             logger.error(f"Failed to refresh token: {str(e)}")
             return None
     
+    async def refresh_access_token_async(self, refresh_token: str) -> Optional[dict]:
+        """
+        Refresh an expired access token without blocking the event loop.
+        
+        Args:
+            refresh_token: The refresh token
+            
+        Returns:
+            Dictionary with new tokens or None if failed
+        """
+        try:
+            async with httpx.AsyncClient() as client:
+                response = await client.post(
+                    TOKEN_URI,
+                    data={
+                        "client_id": GOOGLE_CLIENT_ID,
+                        "client_secret": GOOGLE_CLIENT_SECRET,
+                        "refresh_token": refresh_token,
+                        "grant_type": "refresh_token",
+                    },
+                    timeout=10.0
+                )
+            
+            if response.status_code != 200:
+                logger.error(f"Failed to refresh token: {response.status_code} - {response.text}")
+                return None
+            
+            data = response.json()
+            expires_at = datetime.now(timezone.utc) + timedelta(seconds=data.get("expires_in", 3600))
+            
+            return {
+                "access_token": data["access_token"],
+                "token_expires_at": expires_at.isoformat(),
+            }
+            
+        except Exception as e:
+            logger.error(f"Failed to refresh token: {str(e)}")
+            return None
+    
+    async def fetch_calendar_events(
+        self,
+        access_token: str,
+        from_date: datetime,
+        to_date: datetime,
+        sync_token: Optional[str] = None
+    ) -> Optional[Tuple[List[dict], Optional[str]]]:
+        """
+        Fetch events from the user's primary Google Calendar.
+        
+        Without a sync_token all events in the window are returned (full
+        sync); with one, only events changed since it was issued, including
+        deleted ones (status 'cancelled'). Recurring events are expanded.
+        
+        Args:
+            access_token: Valid access token
+            from_date: Start date for events (ignored with a sync_token)
+            to_date: End date for events (ignored with a sync_token)
+            sync_token: nextSyncToken from a previous sync
+            
+        Returns:
+            Tuple of (events, nextSyncToken), or None if the sync_token is
+            no longer valid and a full sync is needed
+            
+        Raises:
+            TokenExpiredError: The access token was rejected
+        """
+        params = {
+            "maxResults": 250,
+            "singleEvents": "true",
+        }
+        if sync_token:
+            # timeMin/timeMax/orderBy can't be combined with a sync token
+            params["syncToken"] = sync_token
+        else:
+            params["timeMin"] = from_date.isoformat()
+            params["timeMax"] = to_date.isoformat()
+        
+        events = []
+        
+        async with httpx.AsyncClient() as client:
+            while True:
+                response = await client.get(
+                    f"{CALENDAR_API_BASE}/calendars/primary/events",
+                    params=params,
+                    headers={"Authorization": f"Bearer {access_token}"},
+                    timeout=30.0
+                )
+                
+                if response.status_code == 410 and sync_token:
+                    logger.info("Google sync token expired, full sync needed")
+                    return None
+                
+                if response.status_code == 401:
+                    raise TokenExpiredError("Token expired or revoked")
+                
+                if response.status_code != 200:
+                    logger.error(f"Google Calendar API error: {response.status_code} - {response.text}")
+                    raise ValueError(f"Google Calendar API request failed ({response.status_code})")
+                
+                data = response.json()
+                events.extend(data.get("items", []))
+                
+                page_token = data.get("nextPageToken")
+                if not page_token:
+                    break
+                params["pageToken"] = page_token
+        
+        logger.info(f"Fetched {len(events)} {'changed ' if sync_token else ''}events from Google Calendar")
+        return events, data.get("nextSyncToken")
+    
     def is_configured(self) -> bool:
         """Check if Google OAuth is properly configured."""
         return bool(GOOGLE_CLIENT_ID and GOOGLE_CLIENT_SECRET)
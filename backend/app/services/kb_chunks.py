@@ -0,0 +1,294 @@
+"""
+Knowledge Base chunk hydration.
+
+Vector matches only carry an ID (the chunk's embedding_id, "file_id:index")
+and a small metadata preview. This module resolves matches to the full
+chunk text and source filename from knowledge_base_chunks /
+knowledge_base_files in one batched query, fronted by a bounded in-process
+LRU of hot chunks, so vector metadata stays small.
+
+It also deduplicates ingestion: chunks carry a content hash, and a chunk
+whose text the organization already has embedded reuses that embedding
+instead of being sent to Voyage again.
+"""
+
+import os
+import hashlib
+import logging
+from itertools import islice
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from app.utils.cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+# Hot chunks kept in-process. Chunks of a processed file never change
+# (re-uploads get a new file_id), so entries only age out.
+KB_CHUNK_CACHE_SIZE = int(os.getenv("KB_CHUNK_CACHE_SIZE", "2048"))
+KB_CHUNK_CACHE_TTL = 3600
+
+_chunk_cache = TTLCache(maxsize=KB_CHUNK_CACHE_SIZE, ttl=KB_CHUNK_CACHE_TTL)
+
+# Content hashes / vector IDs per lookup (keeps in_() filters and Pinecone
+# fetches well below URL length limits)
+HASH_LOOKUP_BATCH_SIZE = 100
+
+# Chunks embedded and stored at a time during ingestion (bounds memory and,
+# in the Inngest pipeline, step payloads)
+KB_INGEST_BATCH_SIZE = 100
+
+# Page size when reading a file's chunk IDs (PostgREST caps responses at 1000 rows)
+CHUNK_ID_PAGE_SIZE = 1000
+
+
+def fetch_chunks(supabase, embedding_ids: List[str], organization_id: str) -> Dict[str, Dict[str, Any]]:
+    """
+    Get chunk text and filename for a list of embedding IDs.
+
+    Cached chunks are served from memory; the rest are read in one query.
+    Only chunks of the given organization are returned.
+
+    Returns: Dict[embedding_id, {text, source, file_id, organization_id}]
+    """
+    chunks: Dict[str, Dict[str, Any]] = {}
+    missing = []
+
+    for embedding_id in embedding_ids:
+        chunk = _chunk_cache.get(embedding_id)
+        if chunk is not None and chunk["organization_id"] == organization_id:
+            chunks[embedding_id] = chunk
+        else:
+            missing.append(embedding_id)
+
+    if not missing:
+        return chunks
+
+    result = supabase.table("knowledge_base_chunks") \
+        .select("embedding_id, file_id, content, knowledge_base_files(filename)") \
+        .eq("organization_id", organization_id) \
+        .in_("embedding_id", missing) \
+        .execute()
+
+    for row in (result.data or []):
+        chunk = {
+            "text": row.get("content") or "",
+            "source": (row.get("knowledge_base_files") or {}).get("filename") or "Unknown",
+            "file_id": row.get("file_id"),
+            "organization_id": organization_id,
+        }
+        _chunk_cache.set(row["embedding_id"], chunk)
+        chunks[row["embedding_id"]] = chunk
+
+    return chunks
+
+
+def hydrate_matches(supabase, matches: List[Any], organization_id: str) -> List[Dict[str, Any]]:
+    """
+    Resolve vector matches to chunk text and source filename.
+
+    Args:
+        supabase: Supabase client (sync)
+        matches: Vector store matches (with .id and .score), best first
+        organization_id: Organization the matches were queried for
+
+    Returns:
+        List of {chunk_id, text, source, score, file_id} in match order.
+        Matches without a stored chunk (e.g. a deleted file) are dropped.
+    """
+    if not matches:
+        return []
+
+    try:
+        chunks = fetch_chunks(supabase, [match.id for match in matches], organization_id)
+    except Exception as e:
+        logger.warning(f"Could not hydrate KB chunks: {e}")
+        return []
+
+    hydrated = []
+    for match in matches:
+        chunk = chunks.get(match.id)
+        if chunk is None:
+            continue
+        hydrated.append({
+            "chunk_id": match.id,
+            "text": chunk["text"],
+            "source": chunk["source"],
+            "score": match.score,
+            "file_id": chunk["file_id"],
+        })
+
+    return hydrated
+
+
+def content_hash(text: str) -> str:
+    """Hash identifying a chunk's text."""
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def iter_chunk_batches(chunks: Iterable[Dict[str, Any]], size: int = KB_INGEST_BATCH_SIZE) -> Iterator[List[Dict[str, Any]]]:
+    """Group a stream of chunks into lists of up to size chunks."""
+    chunks = iter(chunks)
+    while True:
+        batch = list(islice(chunks, size))
+        if not batch:
+            return
+        yield batch
+
+
+def chunk_record(file_id: str, organization_id: str, chunk: Dict[str, Any]) -> Dict[str, Any]:
+    """knowledge_base_chunks row for a chunk."""
+    return {
+        "file_id": file_id,
+        "organization_id": organization_id,
+        "chunk_index": chunk["chunk_index"],
+        "content": chunk["content"],
+        "token_count": chunk["token_count"],
+        "content_hash": content_hash(chunk["content"]),
+        "embedding_id": f"{file_id}:{chunk['chunk_index']}",
+        # Position in the extracted text (for citing/highlighting the source)
+        "metadata": {
+            "char_start": chunk.get("char_start"),
+            "char_end": chunk.get("char_end"),
+        }
+    }
+
+
+def chunk_vector(file_id: str, organization_id: str, chunk: Dict[str, Any], embedding: List[float]) -> Dict[str, Any]:
+    """Vector store entry for a chunk (the text itself lives in knowledge_base_chunks)."""
+    return {
+        "id": f"{file_id}:{chunk['chunk_index']}",
+        "values": embedding,
+        "metadata": {
+            "file_id": file_id,
+            "chunk_index": chunk["chunk_index"],
+            "organization_id": organization_id,
+            "content_preview": chunk["content"][:200]
+        }
+    }
+
+
+def find_reusable_embeddings(
+    supabase,
+    vector_store,
+    organization_id: str,
+    hashes: List[str],
+    exclude_file_id: Optional[str] = None,
+    exclude_from_index: int = 0
+) -> Dict[str, List[float]]:
+    """
+    Get stored embeddings of chunks the organization already has.
+
+    Looks up chunks with the given content hashes and fetches their
+    vectors. Chunks whose vector is gone (e.g. a file being deleted) are
+    missing from the result and simply get embedded again. Chunks of
+    exclude_file_id are skipped from chunk_index exclude_from_index on.
+
+    Returns: Dict[content_hash, embedding]
+    """
+    embedding_ids: Dict[str, str] = {}
+
+    for i in range(0, len(hashes), HASH_LOOKUP_BATCH_SIZE):
+        query = supabase.table("knowledge_base_chunks") \
+            .select("content_hash, embedding_id") \
+            .eq("organization_id", organization_id) \
+            .in_("content_hash", hashes[i:i + HASH_LOOKUP_BATCH_SIZE])
+        if exclude_file_id and exclude_from_index:
+            query = query.or_(f"file_id.neq.{exclude_file_id},chunk_index.lt.{exclude_from_index}")
+        elif exclude_file_id:
+            query = query.neq("file_id", exclude_file_id)
+        result = query.execute()
+
+        for row in (result.data or []):
+            if row.get("embedding_id"):
+                embedding_ids.setdefault(row["content_hash"], row["embedding_id"])
+
+    hash_by_id = {embedding_id: chunk_hash for chunk_hash, embedding_id in embedding_ids.items()}
+    ids = list(hash_by_id)
+
+    embeddings: Dict[str, List[float]] = {}
+    for i in range(0, len(ids), HASH_LOOKUP_BATCH_SIZE):
+        vectors = vector_store.fetch_vectors(ids[i:i + HASH_LOOKUP_BATCH_SIZE], organization_id)
+        for embedding_id, values in vectors.items():
+            embeddings[hash_by_id[embedding_id]] = values
+
+    return embeddings
+
+
+async def embed_chunks(
+    supabase,
+    embeddings_service,
+    vector_store,
+    organization_id: str,
+    chunks: List[Dict[str, Any]],
+    file_id: Optional[str] = None,
+    file_start: int = 0
+) -> Tuple[List[List[float]], int]:
+    """
+    Get embeddings for chunks, only embedding text the organization doesn't have yet.
+
+    Re-uploading an edited document reuses the embeddings of unchanged
+    chunks; duplicate chunks within the document are embedded once.
+    Stored chunks of file_id (the file being processed) are not reused
+    from chunk_index file_start on; its earlier chunks, already embedded
+    by previous batches, are.
+
+    Returns:
+        Tuple of (embeddings in chunk order, number of chunks reused)
+    """
+    hashes = [content_hash(chunk["content"]) for chunk in chunks]
+
+    try:
+        known = find_reusable_embeddings(
+            supabase, vector_store, organization_id, list(set(hashes)),
+            exclude_file_id=file_id, exclude_from_index=file_start
+        )
+    except Exception as e:
+        logger.warning(f"Could not look up existing embeddings, embedding all chunks: {e}")
+        known = {}
+
+    reused = sum(1 for chunk_hash in hashes if chunk_hash in known)
+
+    # Text to embed, once per distinct hash
+    delta = {}
+    for chunk, chunk_hash in zip(chunks, hashes):
+        if chunk_hash not in known and chunk_hash not in delta:
+            delta[chunk_hash] = chunk["content"]
+
+    if delta:
+        new_embeddings = await embeddings_service.embed_texts(list(delta.values()), input_type="document")
+        known.update(zip(delta.keys(), new_embeddings))
+
+    return [known[chunk_hash] for chunk_hash in hashes], reused
+
+
+def delete_file_vectors(supabase, vector_store, file_id: str, organization_id: str) -> int:
+    """
+    Delete a file's vectors by their IDs, as recorded in knowledge_base_chunks.
+
+    Must run before the file (and its chunks) is deleted. Files without
+    chunk rows fall back to the vector store's delete_by_file().
+
+    Returns: Number of vector IDs deleted
+    """
+    embedding_ids: List[str] = []
+    start = 0
+    while True:
+        result = supabase.table("knowledge_base_chunks") \
+            .select("embedding_id") \
+            .eq("file_id", file_id) \
+            .order("chunk_index") \
+            .range(start, start + CHUNK_ID_PAGE_SIZE - 1) \
+            .execute()
+
+        rows = result.data or []
+        embedding_ids.extend(row["embedding_id"] for row in rows if row.get("embedding_id"))
+        if len(rows) < CHUNK_ID_PAGE_SIZE:
+            break
+        start += CHUNK_ID_PAGE_SIZE
+
+    if not embedding_ids:
+        vector_store.delete_by_file(file_id, organization_id)
+        return 0
+
+    vector_store.delete_vectors(embedding_ids, organization_id)
+    return len(embedding_ids)
@@ -0,0 +1,206 @@
+"""
+Knowledge Base retrieval.
+
+Finds the chunks of an organization's knowledge base relevant to a query.
+Modes (KB_RETRIEVAL_MODE, or per call):
+- vector: dense similarity only (default)
+- hybrid: dense similarity fused with Postgres full-text search over
+  knowledge_base_chunks.content (search_kb_chunks), via reciprocal rank
+  fusion. Catches exact product and customer names that embeddings miss.
+
+Hybrid results can optionally be reranked locally by how many of the
+query's terms each chunk contains (KB_RERANK).
+"""
+
+import os
+import re
+import asyncio
+import logging
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from app.services.kb_chunks import fetch_chunks, hydrate_matches
+from app.services.vector_store import get_vector_store
+
+logger = logging.getLogger(__name__)
+
+KB_RETRIEVAL_MODE = os.getenv("KB_RETRIEVAL_MODE", "vector")
+KB_RERANK = os.getenv("KB_RERANK", "false").lower() == "true"
+
+# Candidates taken from each retriever before fusion
+HYBRID_CANDIDATES = 20
+
+# Reciprocal rank fusion constant (standard value from the RRF paper)
+RRF_K = 60
+
+# Lazy initialization (Voyage client)
+_embeddings_service = None
+
+
+def get_embeddings_service():
+    global _embeddings_service
+    if _embeddings_service is None:
+        from app.services.embeddings import EmbeddingsService
+        _embeddings_service = EmbeddingsService()
+    return _embeddings_service
+
+
+def lexical_search(supabase, query: str, organization_id: str, limit: int = HYBRID_CANDIDATES) -> List[str]:
+    """Embedding IDs of the chunks best matching the query's terms, best first."""
+    result = supabase.rpc("search_kb_chunks", {
+        "p_organization_id": organization_id,
+        "p_query": query,
+        "p_limit": limit,
+    }).execute()
+
+    return [row["embedding_id"] for row in (result.data or [])]
+
+
+def reciprocal_rank_fusion(rankings: List[List[str]], k: int = RRF_K) -> Dict[str, float]:
+    """Fuse ranked ID lists: score = sum of 1 / (k + rank) over the lists an ID appears in."""
+    scores: Dict[str, float] = {}
+    for ranking in rankings:
+        for rank, item_id in enumerate(ranking, start=1):
+            scores[item_id] = scores.get(item_id, 0.0) + 1.0 / (k + rank)
+    return scores
+
+
+def _terms(text: str) -> set:
+    return set(re.findall(r"\w+", text.lower()))
+
+
+def rerank_by_term_coverage(query: str, chunks: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Order chunks by the share of query terms they contain, then by fused score."""
+    query_terms = _terms(query)
+    if not query_terms:
+        return chunks
+
+    def coverage(chunk: Dict[str, Any]) -> float:
+        return len(query_terms & _terms(chunk["text"])) / len(query_terms)
+
+    return sorted(chunks, key=lambda chunk: (coverage(chunk), chunk["rrf_score"]), reverse=True)
+
+
+def _similarities(query_embedding: List[float], vectors: Dict[str, List[float]]) -> Dict[str, float]:
+    """Cosine similarity of stored vectors to the query."""
+    if not vectors:
+        return {}
+
+    ids = list(vectors)
+    matrix = np.asarray([vectors[vector_id] for vector_id in ids], dtype=np.float32)
+    query = np.asarray(query_embedding, dtype=np.float32)
+    norms = np.linalg.norm(matrix, axis=1) * (np.linalg.norm(query) or 1.0)
+    norms[norms == 0] = 1.0
+    return dict(zip(ids, (matrix @ query / norms).tolist()))
+
+
+async def retrieve_kb_chunks(
+    supabase,
+    query: str,
+    organization_id: str,
+    top_k: int = 5,
+    mode: Optional[str] = None,
+    min_score: Optional[float] = None,
+    rerank: Optional[bool] = None
+) -> List[Dict[str, Any]]:
+    """
+    Get the knowledge base chunks most relevant to a query.
+
+    Args:
+        supabase: Supabase client (sync)
+        query: Search query
+        organization_id: Organization whose knowledge base to search
+        top_k: Number of chunks to return
+        mode: "vector" or "hybrid" (default: KB_RETRIEVAL_MODE)
+        min_score: Minimum similarity of a chunk. In hybrid mode it also
+            applies to chunks found by full-text search (scored against the
+            query embedding), so term matches alone don't pass the cut.
+        rerank: Rerank hybrid results by query term coverage (default: KB_RERANK)
+
+    Returns:
+        List of {chunk_id, text, source, score, file_id}, best first.
+        score is the chunk's cosine similarity to the query; hybrid
+        results also carry rrf_score.
+    """
+    mode = mode or KB_RETRIEVAL_MODE
+    rerank = KB_RERANK if rerank is None else rerank
+    vector_store = get_vector_store()
+
+    query_embedding = await get_embeddings_service().embed_text(query)
+
+    if mode != "hybrid":
+        matches = await asyncio.to_thread(
+            vector_store.query_vectors,
+            query_vector=query_embedding,
+            filter={"organization_id": organization_id},
+            top_k=top_k,
+            include_metadata=True
+        )
+        if min_score is not None:
+            matches = [match for match in matches if match.score > min_score]
+        return await asyncio.to_thread(hydrate_matches, supabase, matches, organization_id)
+
+    # Both retrievers are blocking calls; run them side by side
+    async def lexical() -> List[str]:
+        try:
+            return await asyncio.to_thread(lexical_search, supabase, query, organization_id)
+        except Exception as e:
+            logger.warning(f"Lexical KB search failed, using vector results only: {e}")
+            return []
+
+    matches, lexical_ids = await asyncio.gather(
+        asyncio.to_thread(
+            vector_store.query_vectors,
+            query_vector=query_embedding,
+            filter={"organization_id": organization_id},
+            top_k=max(top_k, HYBRID_CANDIDATES),
+            include_metadata=True
+        ),
+        lexical(),
+    )
+
+    scores = {match.id: match.score for match in matches}
+    vector_ids = [match.id for match in matches if min_score is None or match.score > min_score]
+    fused = reciprocal_rank_fusion([vector_ids, lexical_ids])
+    if not fused:
+        return []
+
+    # Similarity of lexical-only hits, so every result has a comparable score
+    lexical_only = [chunk_id for chunk_id in fused if chunk_id not in scores]
+    if lexical_only:
+        try:
+            vectors = await asyncio.to_thread(vector_store.fetch_vectors, lexical_only, organization_id)
+            scores.update(_similarities(query_embedding, vectors))
+        except Exception as e:
+            logger.warning(f"Could not score lexical KB matches: {e}")
+
+    if min_score is not None:
+        # Lexical hits that couldn't be scored are dropped too
+        fused = {chunk_id: rrf_score for chunk_id, rrf_score in fused.items() if scores.get(chunk_id, 0.0) > min_score}
+        if not fused:
+            return []
+
+    try:
+        chunks = await asyncio.to_thread(fetch_chunks, supabase, list(fused), organization_id)
+    except Exception as e:
+        logger.warning(f"Could not hydrate KB chunks: {e}")
+        return []
+
+    results = [
+        {
+            "chunk_id": chunk_id,
+            "text": chunks[chunk_id]["text"],
+            "source": chunks[chunk_id]["source"],
+            "score": scores.get(chunk_id, 0.0),
+            "rrf_score": rrf_score,
+            "file_id": chunks[chunk_id]["file_id"],
+        }
+        for chunk_id, rrf_score in sorted(fused.items(), key=lambda item: item[1], reverse=True)
+        if chunk_id in chunks
+    ]
+
+    if rerank:
+        results = rerank_by_term_coverage(query, results)
+
+    return results[:top_k]
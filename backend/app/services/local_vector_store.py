@@ -0,0 +1,338 @@
+"""
+Local vector store backend.
+
+Keeps one NumPy matrix of normalized float32 vectors per organization,
+saved as <organization_id>.npy (memory-mapped when loaded) next to a
+<organization_id>.json file with the vector IDs and metadata. Queries are
+exact cosine top-k over the organization's matrix, filtered on metadata
+with the Pinecone filter operators the app uses ($eq, $ne, $in, $nin).
+
+Writes rewrite the organization's files, so this backend is meant for
+organizations with up to a few thousand chunks, development and tests.
+Several processes (API workers, Inngest) may share a directory: writes
+hold an exclusive lock on <organization_id>.lock for the whole
+read-modify-write, loads a shared one, and a cached index is reloaded
+once its .json file has been replaced.
+"""
+
+import os
+import json
+import fcntl
+import logging
+import threading
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from app.services.vector_store import VectorStoreBackend
+
+logger = logging.getLogger(__name__)
+
+LOCAL_VECTOR_STORE_DIR = os.getenv("LOCAL_VECTOR_STORE_DIR", "data/vectors")
+
+
+@dataclass
+class VectorMatch:
+    """Query match (same attributes as Pinecone's)."""
+    id: str
+    score: float
+    metadata: Dict[str, Any] = field(default_factory=dict)
+
+
+@dataclass
+class _OrgIndex:
+    """Vectors of one organization."""
+    ids: List[str]
+    metadata: List[Dict[str, Any]]
+    matrix: np.ndarray  # (len(ids), dimension), rows normalized
+    version: Tuple[int, int, int] = (0, 0, 0)  # .json file (inode, mtime, size) it was read from
+    rows: Dict[str, int] = field(default_factory=dict)
+
+    def __post_init__(self):
+        self.rows = {vector_id: row for row, vector_id in enumerate(self.ids)}
+
+
+def _normalize(matrix: np.ndarray) -> np.ndarray:
+    """Scale rows to unit length (cosine similarity becomes a dot product)."""
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+
+def _matches_filter(metadata: Dict[str, Any], filter: Optional[Dict]) -> bool:
+    """Evaluate a Pinecone-style metadata filter."""
+    for key, condition in (filter or {}).items():
+        value = metadata.get(key)
+        if not isinstance(condition, dict):
+            condition = {"$eq": condition}
+        for operator, operand in condition.items():
+            if operator == "$eq" and value != operand:
+                return False
+            if operator == "$ne" and value == operand:
+                return False
+            if operator == "$in" and value not in operand:
+                return False
+            if operator == "$nin" and value in operand:
+                return False
+    return True
+
+
+def _filter_organization(filter: Optional[Dict]) -> Optional[str]:
+    """Organization a filter is restricted to, if any."""
+    condition = (filter or {}).get("organization_id")
+    if isinstance(condition, dict):
+        condition = condition.get("$eq")
+    return condition if isinstance(condition, str) else None
+
+
+class LocalVectorStore(VectorStoreBackend):
+    """Manage vector storage in local NumPy indexes."""
+
+    def __init__(self, directory: Optional[str] = None):
+        self.directory = directory or LOCAL_VECTOR_STORE_DIR
+        os.makedirs(self.directory, exist_ok=True)
+        self._indexes: Dict[str, _OrgIndex] = {}
+        self._lock = threading.RLock()
+
+    # -------------------------------------------------------------------------
+    # Storage
+    # -------------------------------------------------------------------------
+
+    def _paths(self, organization_id: str):
+        base = os.path.join(self.directory, organization_id)
+        return f"{base}.npy", f"{base}.json"
+
+    @contextmanager
+    def _file_lock(self, organization_id: str, exclusive: bool) -> Iterator[None]:
+        """Lock an organization's files against other processes."""
+        lock_path = os.path.join(self.directory, f"{organization_id}.lock")
+        with open(lock_path, "a") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _version(self, organization_id: str) -> Optional[Tuple[int, int, int]]:
+        """Identity of an organization's .json file on disk, or None if it has none."""
+        try:
+            stat = os.stat(self._paths(organization_id)[1])
+        except FileNotFoundError:
+            return None
+        return stat.st_ino, stat.st_mtime_ns, stat.st_size
+
+    def _organizations(self) -> List[str]:
+        """All organizations with an index on disk."""
+        return sorted(
+            name[:-len(".json")]
+            for name in os.listdir(self.directory)
+            if name.endswith(".json")
+        )
+
+    def _load(self, organization_id: str) -> Optional[_OrgIndex]:
+        """Get an organization's current index (memory-mapped), or None if it has none."""
+        index = self._indexes.get(organization_id)
+        if index is not None and index.version == self._version(organization_id):
+            return index
+
+        # Shared lock: the matrix and metadata come from the same write
+        with self._file_lock(organization_id, exclusive=False):
+            return self._read(organization_id)
+
+    def _read(self, organization_id: str) -> Optional[_OrgIndex]:
+        """Load an organization's index unless the cached one is current (caller holds its file lock)."""
+        version = self._version(organization_id)
+        if version is None:
+            self._indexes.pop(organization_id, None)
+            return None
+
+        index = self._indexes.get(organization_id)
+        if index is not None and index.version == version:
+            return index
+
+        matrix_path, meta_path = self._paths(organization_id)
+        with open(meta_path) as f:
+            meta = json.load(f)
+        matrix = np.load(matrix_path, mmap_mode="r")
+
+        index = _OrgIndex(ids=meta["ids"], metadata=meta["metadata"], matrix=matrix, version=version)
+        self._indexes[organization_id] = index
+        return index
+
+    def _save(self, organization_id: str, ids: List[str], metadata: List[Dict[str, Any]], matrix: np.ndarray) -> None:
+        """Write an organization's index (atomically) and drop the cached copy."""
+        matrix_path, meta_path = self._paths(organization_id)
+        self._indexes.pop(organization_id, None)
+
+        if not ids:
+            for path in (matrix_path, meta_path):
+                if os.path.exists(path):
+                    os.remove(path)
+            return
+
+        tmp_matrix, tmp_meta = f"{matrix_path}.tmp.npy", f"{meta_path}.tmp"
+        np.save(tmp_matrix, np.ascontiguousarray(matrix, dtype=np.float32))
+        with open(tmp_meta, "w") as f:
+            json.dump({"ids": ids, "metadata": metadata}, f)
+
+        # Matrix first: a reader seeing the new IDs always finds their rows
+        os.replace(tmp_matrix, matrix_path)
+        os.replace(tmp_meta, meta_path)
+
+    def _remove_rows(self, organization_id: str, select) -> None:
+        """Delete the rows select(index) returns from an organization's index."""
+        with self._file_lock(organization_id, exclusive=True):
+            index = self._read(organization_id)
+            remove = select(index) if index is not None else []
+            if not remove:
+                return
+
+            keep = np.setdiff1d(np.arange(len(index.ids)), remove)
+            self._save(
+                organization_id,
+                [index.ids[row] for row in keep],
+                [index.metadata[row] for row in keep],
+                np.asarray(index.matrix)[keep],
+            )
+
+    # -------------------------------------------------------------------------
+    # VectorStoreBackend
+    # -------------------------------------------------------------------------
+
+    def upsert_vectors(self, vectors: List[Dict[str, Any]]) -> Dict[str, int]:
+        """Upsert vectors into their organizations' indexes."""
+        by_org: Dict[str, List[Dict[str, Any]]] = {}
+        for vector in vectors:
+            organization_id = (vector.get("metadata") or {}).get("organization_id")
+            if not organization_id:
+                raise ValueError(f"Failed to upsert vectors: {vector.get('id')} has no organization_id")
+            by_org.setdefault(organization_id, []).append(vector)
+
+        with self._lock:
+            for organization_id, org_vectors in by_org.items():
+                with self._file_lock(organization_id, exclusive=True):
+                    index = self._read(organization_id)
+                    ids = list(index.ids) if index else []
+                    metadata = list(index.metadata) if index else []
+                    rows = dict(index.rows) if index else {}
+
+                    new_values = _normalize(np.asarray([v["values"] for v in org_vectors], dtype=np.float32))
+                    matrix = np.asarray(index.matrix) if index else np.empty((0, new_values.shape[1]), np.float32)
+                    if matrix.shape[1] != new_values.shape[1]:
+                        raise ValueError(
+                            f"Failed to upsert vectors: dimension {new_values.shape[1]} != index dimension {matrix.shape[1]}"
+                        )
+
+                    appended = []
+                    matrix = matrix.copy()
+                    for vector, values in zip(org_vectors, new_values):
+                        row = rows.get(vector["id"])
+                        if row is None:
+                            rows[vector["id"]] = len(ids)
+                            ids.append(vector["id"])
+                            metadata.append(vector.get("metadata") or {})
+                            appended.append(values)
+                        elif row < len(matrix):
+                            matrix[row] = values
+                            metadata[row] = vector.get("metadata") or {}
+                        else:
+                            # Repeated ID within this upsert
+                            appended[row - len(matrix)] = values
+                            metadata[row] = vector.get("metadata") or {}
+
+                    if appended:
+                        matrix = np.vstack([matrix, np.asarray(appended)])
+                    self._save(organization_id, ids, metadata, matrix)
+
+        return {"upserted_count": len(vectors)}
+
+    def query_vectors(
+        self,
+        query_vector: List[float],
+        top_k: int = 5,
+        filter: Optional[Dict] = None,
+        include_metadata: bool = True
+    ) -> List[VectorMatch]:
+        """Exact cosine top-k over the filtered organization(s)."""
+        query = _normalize(np.asarray([query_vector], dtype=np.float32))[0]
+
+        organization_id = _filter_organization(filter)
+        with self._lock:
+            organizations = [organization_id] if organization_id else self._organizations()
+            indexes = [index for index in map(self._load, organizations) if index is not None]
+
+        matches: List[VectorMatch] = []
+        for index in indexes:
+            scores = np.asarray(index.matrix) @ query
+
+            other_filters = {k: v for k, v in (filter or {}).items() if k != "organization_id"}
+            if other_filters:
+                mask = np.fromiter(
+                    (_matches_filter(meta, other_filters) for meta in index.metadata),
+                    dtype=bool,
+                    count=len(index.ids),
+                )
+                scores = np.where(mask, scores, -np.inf)
+
+            k = min(top_k, len(scores))
+            if k == 0:
+                continue
+            top = np.argpartition(-scores, k - 1)[:k]
+            for row in top:
+                if scores[row] == -np.inf:
+                    continue
+                matches.append(VectorMatch(
+                    id=index.ids[row],
+                    score=float(scores[row]),
+                    metadata=index.metadata[row] if include_metadata else {},
+                ))
+
+        matches.sort(key=lambda match: match.score, reverse=True)
+        return matches[:top_k]
+
+    def fetch_vectors(self, ids: List[str], organization_id: Optional[str] = None) -> Dict[str, List[float]]:
+        """Fetch stored (normalized) vectors by ID."""
+        wanted = set(ids)
+        found: Dict[str, List[float]] = {}
+
+        with self._lock:
+            for org in ([organization_id] if organization_id else self._organizations()):
+                index = self._load(org)
+                if index is None:
+                    continue
+                for vector_id in wanted.intersection(index.rows):
+                    found[vector_id] = index.matrix[index.rows[vector_id]].tolist()
+
+        return found
+
+    def delete_vectors(self, ids: List[str], organization_id: Optional[str] = None) -> None:
+        """Delete vectors by ID."""
+        wanted = set(ids)
+        with self._lock:
+            for org in ([organization_id] if organization_id else self._organizations()):
+                self._remove_rows(org, lambda index: [index.rows[i] for i in wanted.intersection(index.rows)])
+
+    def delete_by_filter(self, filter: Dict) -> None:
+        """Delete vectors by metadata filter."""
+        organization_id = _filter_organization(filter)
+        with self._lock:
+            for org in ([organization_id] if organization_id else self._organizations()):
+                self._remove_rows(org, lambda index: [
+                    row for row, meta in enumerate(index.metadata) if _matches_filter(meta, filter)
+                ])
+
+    def get_stats(self) -> Dict:
+        """Vector counts per organization."""
+        with self._lock:
+            indexes = {org: self._load(org) for org in self._organizations()}
+        # An index another process deleted since the listing is skipped
+        namespaces = {
+            org: {"vector_count": len(index.ids)}
+            for org, index in indexes.items() if index is not None
+        }
+        return {
+            "total_vector_count": sum(ns["vector_count"] for ns in namespaces.values()),
+            "namespaces": namespaces,
+        }
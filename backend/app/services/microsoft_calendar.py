@@ -265,6 +265,75 @@ class MicrosoftCalendarService:
             logger.error(f"Error fetching calendar events: {e}")
             return []
     
+    async def fetch_calendar_delta(
+        self,
+        access_token: str,
+        from_date: datetime,
+        to_date: datetime,
+        delta_link: Optional[str] = None
+    ) -> Optional[Tuple[List[dict], Optional[str]]]:
+        """
+        Fetch calendar events with a Microsoft Graph delta query.
+
+        Without a delta_link all events in the window are returned (full
+        sync); with one, only events changed since it was issued. Deleted
+        events, and events moved out of the window, come back with an
+        "@removed" annotation.
+
+        Args:
+            access_token: Valid access token
+            from_date: Start date for events (ignored with a delta_link,
+                the window is part of the link)
+            to_date: End date for events
+            delta_link: deltaLink from a previous sync
+
+        Returns:
+            Tuple of (events, new delta_link), or None if the delta_link
+            is no longer valid and a full sync is needed
+        """
+        headers = {
+            "Authorization": f"Bearer {access_token}",
+            "Prefer": "odata.maxpagesize=250",
+        }
+
+        if delta_link:
+            url, params = delta_link, None
+        else:
+            url = f"{GRAPH_API_BASE}/me/calendarView/delta"
+            params = {
+                "startDateTime": from_date.strftime("%Y-%m-%dT%H:%M:%SZ"),
+                "endDateTime": to_date.strftime("%Y-%m-%dT%H:%M:%SZ"),
+            }
+
+        events = []
+
+        async with httpx.AsyncClient() as client:
+            while url:
+                response = await client.get(
+                    url,
+                    params=params,
+                    headers=headers,
+                    timeout=30.0
+                )
+
+                if response.status_code == 410 and delta_link:
+                    logger.info("Microsoft delta link expired, full sync needed")
+                    return None
+
+                if response.status_code != 200:
+                    logger.error(f"Failed to fetch event delta: {response.status_code} - {response.text}")
+                    raise ValueError(f"Microsoft Graph delta query failed ({response.status_code})")
+
+                data = response.json()
+                events.extend(data.get("value", []))
+
+                # Follow nextLink pages until Graph hands out the deltaLink
+                url, params = data.get("@odata.nextLink"), None
+                new_delta_link = data.get("@odata.deltaLink")
+
+        logger.info(f"Fetched {len(events)} changed events from Microsoft Calendar")
+        return events, new_delta_link
+
     def is_configured(self) -> bool:
         """Check if Microsoft OAuth is properly configured."""
         return bool(MICROSOFT_CLIENT_ID and MICROSOFT_CLIENT_SECRET)
@@ -442,29 +442,17 @@ Value Propositions: {value_props_str}""")
         """Get relevant KB chunks for the prospect context."""
         try:
             # Lazy import to avoid circular imports
-            from app.services.embeddings import EmbeddingsService
-            from app.services.vector_store import VectorStore
-            
-            embeddings = EmbeddingsService()
-            vector_store = VectorStore()
+            from app.services.kb_retrieval import retrieve_kb_chunks
             
             # Search for case studies and relevant product info
             query = f"{prospect_company} case study success story product solution"
-            query_embedding = await embeddings.embed_text(query)
-            
-            matches = vector_store.query_vectors(
-                query_vector=query_embedding,
-                filter={"organization_id": organization_id},
-                top_k=max_chunks,
-                include_metadata=True
-            )
             
             chunks = []
-            for match in matches:
+            for chunk in await retrieve_kb_chunks(self.client, query, organization_id, top_k=max_chunks):
                 chunks.append({
-                    "text": match.metadata.get("text", ""),
-                    "source": match.metadata.get("filename", "Unknown"),
-                    "score": match.score
+                    "text": chunk["text"],
+                    "source": chunk["source"],
+                    "score": chunk["score"]
                 })
             
             return chunks
@@ -2,16 +2,33 @@
 Prospect Matcher Service - Match calendar meetings to prospects
 SPEC-038: Meetings & Calendar Integration
 """
-from typing import Optional, List, Tuple
-from dataclasses import dataclass
+from typing import Optional, List, Tuple, Dict, Set, Iterable
+from dataclasses import dataclass, field
 from urllib.parse import urlparse
+import os
 import re
 import logging
 
 from supabase import Client
 
+from app.utils.cache import TTLCache
+
 logger = logging.getLogger(__name__)
 
+# Per-organization match indexes (per worker process). Prospect writes
+# invalidate the organization's entry; the TTL bounds staleness from
+# writes made elsewhere (database functions, other workers).
+_index_cache = TTLCache(
+    maxsize=512,
+    ttl=float(os.getenv("PROSPECT_INDEX_CACHE_TTL", "300"))
+)
+
+
+def invalidate_prospect_index(organization_id: str) -> None:
+    """Drop the cached match index of an organization after a prospect write."""
+    if organization_id:
+        _index_cache.pop(organization_id)
+
 
 @dataclass
 class ProspectMatch:
@@ -35,6 +52,26 @@ class MatchResult:
             self.all_matches = []
 
 
+@dataclass
+class ProspectIndex:
+    """
+    Lookup tables for matching meetings to an organization's prospects.
+    
+    Company names and domains are normalized once when the index is built,
+    so matching a meeting only needs dictionary lookups.
+    """
+    organization_id: str
+    # prospect_id -> (company_name, normalized name, normalized name words)
+    names: Dict[str, Tuple[str, str, Set[str]]] = field(default_factory=dict)
+    # normalized name word -> prospect IDs
+    words: Dict[str, Set[str]] = field(default_factory=dict)
+    # website/contact email domain -> prospect IDs
+    domains: Dict[str, Set[str]] = field(default_factory=dict)
+    
+    def __len__(self) -> int:
+        return len(self.names)
+
+
 class ProspectMatcher:
     """Service for matching calendar meetings to prospects."""
     
@@ -95,79 +132,127 @@ class ProspectMatcher:
             return None
         return email.split('@')[1].lower()
     
-    def calculate_title_match(self, meeting_title: str, company_name: str) -> float:
-        """Calculate confidence based on meeting title matching company name."""
-        if not meeting_title or not company_name:
-            return 0.0
-        
-        title_normalized = self.normalize_company_name(meeting_title)
-        company_normalized = self.normalize_company_name(company_name)
+    def build_index(self, organization_id: str, prospects: Iterable[dict]) -> ProspectIndex:
+        """Build the match index for an organization from its prospects."""
+        index = ProspectIndex(organization_id=organization_id)
         
-        # Exact match (full company name in title)
-        if company_normalized in title_normalized:
-            return self.WEIGHT_TITLE_EXACT
-        
-        # Check if significant words from company name are in title
-        company_words = set(company_normalized.split())
-        title_words = set(title_normalized.split())
+        for prospect in prospects:
+            prospect_id = prospect["id"]
+            company_name = prospect.get("company_name") or ""
+            normalized = self.normalize_company_name(company_name)
+            
+            if normalized:
+                name_words = set(normalized.split())
+                index.names[prospect_id] = (company_name, normalized, name_words)
+                for word in name_words:
+                    index.words.setdefault(word, set()).add(prospect_id)
+            
+            for domain in (
+                self.extract_domain_from_website(prospect.get("website")),
+                self.extract_domain_from_email(prospect.get("contact_email")),
+            ):
+                if domain:
+                    index.domains.setdefault(domain, set()).add(prospect_id)
+                    if prospect_id not in index.names:
+                        index.names[prospect_id] = (company_name, normalized, set())
         
-        if not company_words:
-            return 0.0
+        return index
+    
+    def get_index(self, organization_id: str, refresh: bool = False) -> ProspectIndex:
+        """
+        Get the organization's match index, building it with one query if needed.
         
-        # Calculate overlap
-        overlap = company_words.intersection(title_words)
-        overlap_ratio = len(overlap) / len(company_words)
+        Pass refresh=True to rebuild it (e.g. once at the start of a sync).
+        """
+        if not refresh:
+            index = _index_cache.get(organization_id)
+            if index is not None:
+                return index
         
-        # At least one significant word matches
-        if overlap_ratio >= 0.5:
-            return self.WEIGHT_TITLE_PARTIAL * overlap_ratio
+        prospects_result = self.supabase.table("prospects").select(
+            "id, company_name, website, contact_email"
+        ).eq("organization_id", organization_id).execute()
         
-        return 0.0
+        index = self.build_index(organization_id, prospects_result.data or [])
+        _index_cache.set(organization_id, index)
+        return index
     
-    def calculate_email_domain_match(
-        self, 
-        attendee_emails: List[str], 
-        prospect_website: str,
-        prospect_contact_email: str
-    ) -> float:
-        """Calculate confidence based on email domain matching."""
-        if not attendee_emails:
-            return 0.0
-        
-        # Get domains to match against
-        match_domains = set()
-        
-        # From website
-        website_domain = self.extract_domain_from_website(prospect_website)
-        if website_domain:
-            match_domains.add(website_domain)
+    def find_matches(
+        self,
+        index: ProspectIndex,
+        meeting_title: str,
+        attendee_emails: List[str]
+    ) -> List[ProspectMatch]:
+        """Score the prospects in the index against a meeting, best first."""
+        title_normalized = self.normalize_company_name(meeting_title or "")
+        title_words = set(title_normalized.split())
+        padded_title = f" {title_normalized} "
         
-        # From contact email
-        contact_domain = self.extract_domain_from_email(prospect_contact_email)
-        if contact_domain:
-            match_domains.add(contact_domain)
+        # Title matching: only prospects sharing at least one word with the title
+        title_scores: Dict[str, float] = {}
+        candidates = set()
+        for word in title_words:
+            candidates.update(index.words.get(word, ()))
         
-        if not match_domains:
-            return 0.0
+        for prospect_id in candidates:
+            _, normalized, name_words = index.names[prospect_id]
+            if f" {normalized} " in padded_title:
+                # Exact match (full company name in title)
+                title_scores[prospect_id] = self.WEIGHT_TITLE_EXACT
+            else:
+                # At least half of the company name's words are in the title
+                overlap_ratio = len(name_words & title_words) / len(name_words)
+                if overlap_ratio >= 0.5:
+                    title_scores[prospect_id] = self.WEIGHT_TITLE_PARTIAL * overlap_ratio
         
-        # Check attendee emails
+        # Email domain matching
+        email_matches = set()
         for email in attendee_emails:
             email_domain = self.extract_domain_from_email(email)
-            if email_domain and email_domain in match_domains:
-                return self.WEIGHT_EMAIL_DOMAIN
+            if email_domain:
+                email_matches.update(index.domains.get(email_domain, ()))
+        
+        matches: List[ProspectMatch] = []
+        for prospect_id in set(title_scores) | email_matches:
+            confidence = 0.0
+            reasons = []
+            
+            title_score = title_scores.get(prospect_id, 0.0)
+            if title_score > 0:
+                confidence = max(confidence, title_score)
+                reasons.append(f"title match ({title_score:.0%})")
+            
+            if prospect_id in email_matches:
+                # Combine scores (taking max, not sum)
+                confidence = max(confidence, self.WEIGHT_EMAIL_DOMAIN)
+                reasons.append(f"email domain match ({self.WEIGHT_EMAIL_DOMAIN:.0%})")
+            
+            # Only include if we have some confidence
+            if confidence >= 0.3:  # Minimum threshold to consider
+                matches.append(ProspectMatch(
+                    prospect_id=prospect_id,
+                    company_name=index.names[prospect_id][0],
+                    confidence=confidence,
+                    match_reason=', '.join(reasons)
+                ))
         
-        return 0.0
+        # Sort by confidence descending
+        matches.sort(key=lambda m: m.confidence, reverse=True)
+        return matches
     
     async def match_meeting(
         self,
         meeting_id: str,
         meeting_title: str,
         attendees: List[dict],
-        organization_id: str
+        organization_id: str,
+        index: Optional[ProspectIndex] = None
     ) -> MatchResult:
         """
         Match a single meeting to prospects in the organization.
         
+        Uses the given index, or the organization's cached index.
+        
         Returns MatchResult with best match and all matches above threshold.
         """
         result = MatchResult(meeting_id=meeting_id)
@@ -175,58 +260,18 @@ class ProspectMatcher:
         # Extract attendee emails
         attendee_emails = [
             a.get('email', '') 
-            for a in attendees 
+            for a in (attendees or [])
             if a.get('email') and not a.get('is_organizer', False)
         ]
         
         try:
-            # Fetch all prospects for organization
-            prospects_result = self.supabase.table("prospects").select(
-                "id, company_name, website, contact_email"
-            ).eq("organization_id", organization_id).execute()
-            
-            prospects = prospects_result.data or []
+            if index is None:
+                index = self.get_index(organization_id)
             
-            if not prospects:
+            if not index:
                 return result
             
-            matches: List[ProspectMatch] = []
-            
-            for prospect in prospects:
-                confidence = 0.0
-                reasons = []
-                
-                # Title matching
-                title_score = self.calculate_title_match(
-                    meeting_title, 
-                    prospect.get('company_name', '')
-                )
-                if title_score > 0:
-                    confidence = max(confidence, title_score)
-                    reasons.append(f"title match ({title_score:.0%})")
-                
-                # Email domain matching
-                email_score = self.calculate_email_domain_match(
-                    attendee_emails,
-                    prospect.get('website'),
-                    prospect.get('contact_email')
-                )
-                if email_score > 0:
-                    # Combine scores (taking max, not sum)
-                    confidence = max(confidence, email_score)
-                    reasons.append(f"email domain match ({email_score:.0%})")
-                
-                # Only include if we have some confidence
-                if confidence >= 0.3:  # Minimum threshold to consider
-                    matches.append(ProspectMatch(
-                        prospect_id=prospect['id'],
-                        company_name=prospect['company_name'],
-                        confidence=confidence,
-                        match_reason=', '.join(reasons)
-                    ))
-            
-            # Sort by confidence descending
-            matches.sort(key=lambda m: m.confidence, reverse=True)
+            matches = self.find_matches(index, meeting_title, attendee_emails)
             
             result.all_matches = matches
             
@@ -285,12 +330,19 @@ class ProspectMatcher:
             
             meetings = meetings_result.data or []
             
+            if not meetings:
+                return results
+            
+            # One prospect query for the whole run
+            index = self.get_index(organization_id, refresh=True)
+            
             for meeting in meetings:
                 result = await self.match_meeting(
                     meeting_id=meeting['id'],
                     meeting_title=meeting.get('title', ''),
                     attendees=meeting.get('attendees', []),
-                    organization_id=organization_id
+                    organization_id=organization_id,
+                    index=index
                 )
                 results.append(result)
             
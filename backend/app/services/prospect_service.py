@@ -6,6 +6,7 @@ from typing import Optional, Dict, Any, List
 from supabase import Client
 import logging
 from app.database import get_supabase_service
+from app.services.prospect_matcher import invalidate_prospect_index
 
 logger = logging.getLogger(__name__)
 
@@ -44,6 +45,7 @@ class ProspectService:
             ).execute()
             
             if result.data:
+                invalidate_prospect_index(organization_id)
                 return result.data
             return None
             
@@ -180,6 +182,7 @@ class ProspectService:
                 .execute()
             
             if response.data and len(response.data) > 0:
+                invalidate_prospect_index(organization_id)
                 return response.data[0]
             return None
             
@@ -209,6 +212,7 @@ class ProspectService:
                 .eq("organization_id", organization_id)\
                 .execute()
             
+            invalidate_prospect_index(organization_id)
             return True
             
         except Exception as e:
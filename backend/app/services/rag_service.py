@@ -10,28 +10,13 @@ Enhanced with Profile Context for personalized outputs.
 from typing import List, Dict, Any, Optional
 import logging
 from app.database import get_supabase_service
+from app.services.kb_retrieval import retrieve_kb_chunks
 
 logger = logging.getLogger(__name__)
 
 # Lazy initialization to avoid import errors
-_embeddings_service = None
-_vector_store = None
 _context_service = None
 
-def get_embeddings_service():
-    global _embeddings_service
-    if _embeddings_service is None:
-        from app.services.embeddings import EmbeddingsService
-        _embeddings_service = EmbeddingsService()
-    return _embeddings_service
-
-def get_vector_store():
-    global _vector_store
-    if _vector_store is None:
-        from app.services.vector_store import VectorStore
-        _vector_store = VectorStore()
-    return _vector_store
-
 def get_context_service():
     global _context_service
     if _context_service is None:
@@ -50,40 +35,33 @@ class RAGService:
         self,
         query: str,
         organization_id: str,
-        top_k: int = 10
+        top_k: int = 10,
+        mode: Optional[str] = None
     ) -> List[Dict[str, Any]]:
         """
-        Query Knowledge Base (Pinecone) for relevant chunks
+        Query Knowledge Base for relevant chunks
         
         Args:
             query: Search query (company name + context)
             organization_id: Filter by organization
             top_k: Number of results to return
+            mode: Retrieval mode, "vector" or "hybrid" (see kb_retrieval)
             
         Returns:
             List of relevant KB chunks with metadata
         """
         try:
-            # Generate embedding for query
-            query_embedding = await get_embeddings_service().embed_text(query)
-            
-            # Query Pinecone with organization filter
-            matches = get_vector_store().query_vectors(
-                query_vector=query_embedding,
-                filter={"organization_id": organization_id},
-                top_k=top_k,
-                include_metadata=True
-            )
-            
-            # Extract and format results
-            kb_chunks = []
-            for match in matches:
-                kb_chunks.append({
-                    "text": match.metadata.get("text", ""),
-                    "source": match.metadata.get("filename", "Unknown"),
-                    "score": match.score,
-                    "chunk_id": match.id
-                })
+            kb_chunks = [
+                {
+                    "text": chunk["text"],
+                    "source": chunk["source"],
+                    "score": chunk["score"],
+                    "chunk_id": chunk["chunk_id"]
+                }
+                for chunk in await retrieve_kb_chunks(
+                    self.supabase, query, organization_id, top_k=top_k, mode=mode
+                )
+            ]
             
             logger.info(f"Found {len(kb_chunks)} KB chunks for query: {query[:50]}...")
             return kb_chunks
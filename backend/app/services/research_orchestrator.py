@@ -267,33 +267,24 @@ class ResearchOrchestrator:
         Get relevant KB chunks (case studies, product info) for the prospect.
         """
         try:
-            from app.services.embeddings import EmbeddingsService
-            from app.services.vector_store import VectorStore
-            
-            embeddings = EmbeddingsService()
-            vector_store = VectorStore()
+            from app.services.kb_retrieval import retrieve_kb_chunks
             
             # Build query based on prospect and what we sell
             products = ", ".join(seller_context.get("products_services", [])[:3])
             query = f"{prospect_company} case study success {products}"
             
-            query_embedding = await embeddings.embed_text(query)
-            
-            matches = vector_store.query_vectors(
-                query_vector=query_embedding,
-                filter={"organization_id": organization_id},
-                top_k=max_chunks,
-                include_metadata=True
+            # Only include relevant chunks
+            relevant = await retrieve_kb_chunks(
+                self.supabase, query, organization_id, top_k=max_chunks, min_score=0.5
             )
             
             chunks = []
-            for match in matches:
-                if match.score > 0.5:  # Only include relevant chunks
-                    chunks.append({
-                        "text": match.metadata.get("text", "")[:500],
-                        "source": match.metadata.get("filename", "Document"),
-                        "score": match.score
-                    })
+            for chunk in relevant:
+                chunks.append({
+                    "text": chunk["text"][:500],
+                    "source": chunk["source"],
+                    "score": chunk["score"]
+                })
             
             logger.info(f"Found {len(chunks)} relevant KB chunks for {prospect_company}")
             return chunks
@@ -1,15 +1,75 @@
 """
 Text chunking service for splitting documents into manageable chunks.
 Uses tiktoken for accurate token counting.
+
+Chunks follow the document's structure: text is split into units at
+paragraph, sentence and line boundaries, and units are packed into chunks
+of up to chunk_size tokens, preferring to end a chunk before a heading or
+at a paragraph break, then at a sentence end. Each piece of text is
+tokenized once; unit token counts and packing are computed with NumPy over
+token offsets, chunk text is sliced from the source instead of decoded from
+tokens, and each chunk carries its character offsets in the document.
+
+iter_chunks() chunks a stream of text pieces (e.g. PDF pages) and only
+keeps the text of the chunk being built in memory.
 """
 
+import re
+from functools import lru_cache
+from typing import Iterable, Iterator, List, Dict, Optional, Tuple
+
+import numpy as np
 import tiktoken
-from typing import List, Dict
+
+# Inserted between streamed text pieces (matches FileProcessor.extract_text)
+PIECE_SEPARATOR = "\n\n"
+
+# Boundary strength at the end of a unit (higher = better place to end a chunk).
+# A heading's own end is the worst place: it belongs with the text below it.
+HEADING, WORD, LINE, SENTENCE, PARAGRAPH, SECTION = -1, 0, 1, 2, 3, 4
+
+_WORD_RE = re.compile(r"\S+\s*|\s+")
+
+# Character classes by code point (anything above the table is neither)
+_SPACE, _LINE_BREAK, _SENTENCE_END = 1, 2, 4
+_CHAR_CLASS = np.array([int(chr(code).isspace()) for code in range(0x3001)] + [0], dtype=np.uint8)
+_CHAR_CLASS[ord("\n")] |= _LINE_BREAK
+_CHAR_CLASS[[ord("."), ord("!"), ord("?")]] = _SENTENCE_END
+
+# A short, single-line paragraph without closing punctuation is a heading
+HEADING_MAX_CHARS = 80
+
+
+@lru_cache(maxsize=None)
+def get_encoding(encoding_name: str = "cl100k_base") -> tiktoken.Encoding:
+    """Get a tiktoken encoding (loaded once per process)."""
+    return tiktoken.get_encoding(encoding_name)
+
+
+@lru_cache(maxsize=None)
+def _token_byte_lengths(encoding: tiktoken.Encoding) -> np.ndarray:
+    """Length in bytes of every token of an encoding (0 for unused IDs)."""
+    lengths = np.zeros(encoding.n_vocab, dtype=np.int64)
+    for token in range(encoding.n_vocab):
+        try:
+            lengths[token] = len(encoding.decode_single_token_bytes(token))
+        except KeyError:
+            pass
+    return lengths
+
+
+def _is_heading(text: str) -> bool:
+    stripped = text.strip()
+    return (
+        0 < len(stripped) <= HEADING_MAX_CHARS
+        and "\n" not in stripped
+        and stripped[-1] not in ".!?,;:"
+    )
 
 
 class TextChunker:
     """Split text into chunks with overlap for better context preservation."""
-    
+
     def __init__(
         self,
         chunk_size: int = 500,
@@ -18,68 +78,321 @@ class TextChunker:
     ):
         """
         Initialize text chunker.
-        
+
         Args:
             chunk_size: Target size of each chunk in tokens
             chunk_overlap: Number of tokens to overlap between chunks
+                (carried over as whole sentences, not across paragraphs)
             encoding_name: Tokenizer encoding to use
         """
         self.chunk_size = chunk_size
         self.chunk_overlap = chunk_overlap
-        self.encoding = tiktoken.get_encoding(encoding_name)
-    
+        self.encoding = get_encoding(encoding_name)
+        self._separator_tokens = self.count_tokens(PIECE_SEPARATOR)
+
     def chunk_text(self, text: str) -> List[Dict[str, any]]:
         """
         Split text into chunks with overlap.
-        
+
         Args:
             text: Text to chunk
-            
+
         Returns:
             List of chunks, each containing:
-                - content: The chunk text
+                - content: The chunk text (text[char_start:char_end])
                 - token_count: Number of tokens
                 - chunk_index: Position in document
+                - char_start, char_end: Character offsets in the text
         """
         if not text or not text.strip():
             return []
-        
-        # Tokenize the entire text
-        tokens = self.encoding.encode(text)
-        
-        chunks = []
-        start_idx = 0
+
+        return list(self.iter_chunks([text]))
+
+    def iter_chunks(self, pieces: Iterable[str]) -> Iterator[Dict[str, any]]:
+        """
+        Split a stream of text pieces into chunks with overlap.
+
+        Pieces are joined with blank lines (offsets refer to the joined
+        text, as returned by FileProcessor.extract_text) and each piece
+        ends a paragraph. Only the text not yet emitted is held in memory,
+        so memory use doesn't grow with document length.
+
+        Args:
+            pieces: Text pieces in document order (e.g. PDF pages)
+
+        Yields:
+            Chunks in order (same shape as chunk_text())
+        """
+        # Pending text (from offset buffer_start) and its units: start
+        # offset, token count and boundary strength at the unit's end
+        buffer = ""
+        buffer_start = 0
+        starts = np.zeros(0, dtype=np.int64)
+        tokens = np.zeros(0, dtype=np.int64)
+        strengths = np.zeros(0, dtype=np.int64)
+        offset = 0  # End of the text so far
+        emitted = 0  # Pending units before this one were part of an emitted chunk
+        emitted_end = 0  # char_end of the last emitted chunk
         chunk_index = 0
-        
-        while start_idx < len(tokens):
-            # Get chunk tokens
-            end_idx = start_idx + self.chunk_size
-            chunk_tokens = tokens[start_idx:end_idx]
-            
-            # Decode back to text
-            chunk_text = self.encoding.decode(chunk_tokens)
-            
-            # Create chunk object
-            chunks.append({
-                "content": chunk_text,
-                "token_count": len(chunk_tokens),
-                "chunk_index": chunk_index
-            })
-            
-            # Move to next chunk with overlap
-            start_idx += self.chunk_size - self.chunk_overlap
-            chunk_index += 1
-        
-        return chunks
-    
+
+        for piece_number, piece in enumerate(pieces):
+            piece_starts, piece_tokens, piece_strengths = self._split_units(piece)
+
+            if piece_number:
+                # The separator is a unit of its own; a heading after it closes a section
+                separator_strength = SECTION if len(piece_strengths) and piece_strengths[0] == HEADING else PARAGRAPH
+                piece_starts = np.concatenate([[-len(PIECE_SEPARATOR)], piece_starts])
+                piece_tokens = np.concatenate([[self._separator_tokens], piece_tokens])
+                piece_strengths = np.concatenate([[separator_strength], piece_strengths])
+                buffer += PIECE_SEPARATOR
+                offset += len(PIECE_SEPARATOR)
+
+            starts = np.concatenate([starts, offset + piece_starts])
+            tokens = np.concatenate([tokens, piece_tokens])
+            strengths = np.concatenate([strengths, piece_strengths])
+            buffer += piece
+            offset += len(piece)
+
+            # Emit chunks while more than a chunk is pending
+            cumulative = np.cumsum(tokens)
+            head = 0
+            while len(cumulative) and cumulative[-1] - (cumulative[head - 1] if head else 0) > self.chunk_size:
+                cut, next_head = self._pack(cumulative, strengths, head)
+                chunk = self._make_chunk(
+                    buffer,
+                    buffer_start,
+                    int(starts[head]),
+                    int(starts[cut]) if cut < len(starts) else offset,
+                    int(cumulative[cut - 1] - (cumulative[head - 1] if head else 0)),
+                    chunk_index
+                )
+                # A chunk ending at or before the last one holds only text already emitted
+                if chunk and chunk["char_end"] > emitted_end:
+                    yield chunk
+                    chunk_index += 1
+                    emitted_end = chunk["char_end"]
+                emitted = max(emitted, cut)
+                head = next_head
+
+            if head:
+                new_start = int(starts[head]) if head < len(starts) else offset
+                buffer = buffer[new_start - buffer_start:]
+                buffer_start = new_start
+                starts, tokens, strengths = starts[head:], tokens[head:], strengths[head:]
+                emitted = max(emitted - head, 0)
+
+        # Remaining units (unless they are only overlap already emitted)
+        if len(starts) > emitted:
+            chunk = self._make_chunk(buffer, buffer_start, int(starts[0]), offset, int(tokens.sum()), chunk_index)
+            if chunk and chunk["char_end"] > emitted_end:
+                yield chunk
+
     def count_tokens(self, text: str) -> int:
         """
         Count tokens in text.
-        
+
         Args:
             text: Text to count tokens for
-            
+
         Returns:
             Number of tokens
         """
-        return len(self.encoding.encode(text))
+        return len(self.encoding.encode_ordinary(text))
+
+    # -------------------------------------------------------------------------
+    # Units
+    # -------------------------------------------------------------------------
+
+    def _split_units(self, piece: str) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Split a piece into units.
+
+        Units cover the piece contiguously, each ending with its trailing
+        whitespace. The piece is tokenized once; a unit's token count is
+        the number of tokens starting inside it. Units longer than a chunk
+        are split into words, and words longer than a chunk every
+        chunk_size tokens.
+
+        Returns:
+            (starts, token_counts, strengths) arrays, starts relative to the piece
+        """
+        if not piece:
+            empty = np.zeros(0, dtype=np.int64)
+            return empty, empty, empty
+
+        ends, strengths = self._boundaries(piece)
+        if not len(ends) or ends[-1] < len(piece):
+            ends = np.append(ends, len(piece))
+            strengths = np.append(strengths, PARAGRAPH)
+        strengths[-1] = PARAGRAPH
+        starts = np.concatenate([[0], ends[:-1]])
+
+        # Headings: the unit before a heading paragraph closes a section.
+        # A heading is a whole paragraph, not the last line of a longer one.
+        paragraph_ends = strengths >= PARAGRAPH
+        for i in np.flatnonzero(paragraph_ends & (ends - starts <= HEADING_MAX_CHARS * 2)):
+            if (i == 0 or paragraph_ends[i - 1]) and _is_heading(piece[starts[i]:ends[i]]):
+                strengths[i] = HEADING
+                if i and strengths[i - 1] >= PARAGRAPH:
+                    strengths[i - 1] = SECTION
+
+        token_starts = self._token_starts(piece)
+        counts = np.diff(np.searchsorted(token_starts, np.append(starts, len(piece))))
+
+        if (counts <= self.chunk_size).all():
+            return starts, counts, strengths
+        return self._split_long_units(piece, token_starts, starts, ends, strengths, counts)
+
+    @staticmethod
+    def _boundaries(piece: str) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Unit boundaries of a piece: ends of whitespace runs that contain a
+        line break (two or more: paragraph break) or follow a sentence end.
+
+        Returns:
+            (ends, strengths) arrays
+        """
+        codes = np.frombuffer(piece.encode("utf-32-le", "surrogatepass"), dtype=np.uint32)
+        classes = _CHAR_CLASS[np.minimum(codes, len(_CHAR_CLASS) - 1)]
+
+        # Whitespace runs [run_starts, run_ends)
+        space = np.zeros(len(classes) + 2, dtype=bool)
+        space[1:-1] = classes & _SPACE
+        edges = np.flatnonzero(space[1:] != space[:-1])
+        run_starts, run_ends = edges[0::2], edges[1::2]
+
+        line_breaks = np.zeros(len(classes) + 1, dtype=np.int64)
+        np.cumsum(classes & _LINE_BREAK, out=line_breaks[1:])
+        newlines = (line_breaks[run_ends] - line_breaks[run_starts]) // _LINE_BREAK
+        after_sentence = (classes[run_starts - 1] & _SENTENCE_END).astype(bool) & (run_starts > 0)
+
+        keep = (newlines > 0) | after_sentence
+        newlines = newlines[keep]
+        strengths = np.where(newlines >= 2, PARAGRAPH, np.where(newlines == 1, LINE, SENTENCE))
+        return run_ends[keep].astype(np.int64), strengths
+
+    def _split_long_units(
+        self,
+        piece: str,
+        token_starts: np.ndarray,
+        starts: np.ndarray,
+        ends: np.ndarray,
+        strengths: np.ndarray,
+        counts: np.ndarray
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Split the units longer than a chunk into words (or slices of long words)."""
+        # Up to 4 tokens can start in one character (byte-level tokens)
+        step = max(self.chunk_size - 3, 1)
+
+        new_starts: List[int] = []
+        new_strengths: List[int] = []
+        for start, end, strength, count in zip(starts.tolist(), ends.tolist(), strengths.tolist(), counts.tolist()):
+            if count <= self.chunk_size:
+                new_starts.append(start)
+                new_strengths.append(strength)
+                continue
+
+            for match in _WORD_RE.finditer(piece, start, end):
+                word_start, word_end = match.span()
+                first, last = np.searchsorted(token_starts, [word_start, word_end])
+                cuts = token_starts[first:last:step].tolist()[1:]
+                for cut in [word_start] + [cut for cut in cuts if cut > word_start]:
+                    if not new_starts or cut > new_starts[-1]:
+                        new_starts.append(cut)
+                        new_strengths.append(WORD)
+            new_strengths[-1] = strength
+
+        starts = np.asarray(new_starts, dtype=np.int64)
+        counts = np.diff(np.searchsorted(token_starts, np.append(starts, len(piece))))
+        return starts, counts, np.asarray(new_strengths, dtype=np.int64)
+
+    def _token_starts(self, text: str) -> np.ndarray:
+        """Character offset at which each token of the text starts."""
+        token_ids = np.asarray(self.encoding.encode_ordinary(text), dtype=np.int64)
+        if not len(token_ids):
+            return np.zeros(0, dtype=np.int64)
+
+        lengths = _token_byte_lengths(self.encoding)[token_ids]
+        byte_starts = np.cumsum(lengths) - lengths
+
+        # UTF-8 byte offset -> character offset (continuation bytes are 10xxxxxx)
+        data = np.frombuffer(text.encode("utf-8"), dtype=np.uint8)
+        char_of_byte = np.cumsum((data & 0xC0) != 0x80) - 1
+        return char_of_byte[byte_starts]
+
+    # -------------------------------------------------------------------------
+    # Packing
+    # -------------------------------------------------------------------------
+
+    def _pack(self, cumulative: np.ndarray, strengths: np.ndarray, head: int) -> Tuple[int, int]:
+        """
+        Choose where the chunk starting at unit head ends.
+
+        Ends the chunk at the strongest boundary among the units that fit,
+        as long as the chunk is at least half full or the boundary is
+        before a heading (latest boundary wins ties). Overlap is carried as
+        whole trailing units within chunk_overlap tokens, and not across a
+        paragraph break.
+
+        Args:
+            cumulative: Cumulative token counts of the pending units
+            strengths: Boundary strengths of the pending units
+            head: First unit of the chunk
+
+        Returns:
+            (cut, next_head): the chunk is units [head, cut), the next
+            chunk starts at next_head
+        """
+        base = cumulative[head - 1] if head else 0
+        fit = int(np.searchsorted(cumulative, base + self.chunk_size, side="right"))
+        fit = max(fit, head + 1)
+
+        window = cumulative[head:fit] - base
+        window_strengths = strengths[head:fit]
+        candidates = np.flatnonzero((window >= self.chunk_size // 2) | (window_strengths == SECTION))
+        if len(candidates):
+            ranking = window_strengths[candidates] * len(cumulative) + candidates
+            cut = head + int(candidates[np.argmax(ranking)]) + 1
+        else:
+            cut = fit
+
+        next_head = cut
+        if strengths[cut - 1] < PARAGRAPH and self.chunk_overlap > 0:
+            # First unit such that the units from it to the cut fit in the overlap
+            first = int(np.searchsorted(cumulative, cumulative[cut - 1] - self.chunk_overlap, side="left")) + 1
+            # ... and that doesn't follow a paragraph break before the cut
+            breaks = np.flatnonzero(strengths[head:cut - 1] >= PARAGRAPH)
+            if len(breaks):
+                first = max(first, head + int(breaks[-1]) + 1)
+            next_head = min(max(first, head + 1), cut)
+
+            # Drop the overlap if the next unit wouldn't fit beside it: the
+            # next chunk would end at or before this cut and repeat its text
+            if next_head < cut and cut < len(cumulative) and cumulative[cut] - cumulative[next_head - 1] > self.chunk_size:
+                next_head = cut
+        return cut, next_head
+
+    @staticmethod
+    def _make_chunk(
+        buffer: str,
+        buffer_start: int,
+        start: int,
+        end: int,
+        token_count: int,
+        chunk_index: int
+    ) -> Optional[Dict[str, any]]:
+        """Chunk of the text between two offsets (None if it is only whitespace)."""
+        raw = buffer[start - buffer_start:end - buffer_start]
+        content = raw.strip()
+        if not content:
+            return None
+
+        char_start = start + (len(raw) - len(raw.lstrip()))
+        return {
+            "content": content,
+            "token_count": token_count,
+            "chunk_index": chunk_index,
+            "char_start": char_start,
+            "char_end": char_start + len(content),
+        }
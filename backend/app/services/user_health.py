@@ -0,0 +1,403 @@
+"""
+User Health Scores
+
+Computes customer health scores for the admin panel and keeps the
+user_health_scores snapshot table up to date, so the dashboard and the
+admin user list can read scores instead of recomputing them per request.
+
+Scores are refreshed incrementally per organization (on activity and
+billing events) and fully by a scheduled Inngest job.
+"""
+
+import logging
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterator, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Users per batch (keeps in_() filters well below URL length limits)
+HEALTH_BATCH_SIZE = 100
+
+# Page size when scanning users and their activity (PostgREST caps responses at 1000 rows)
+USER_SCAN_PAGE_SIZE = 1000
+
+
+def get_health_status(score: int) -> str:
+    """
+    Get health status label from score.
+
+    Returns:
+        'healthy' (80-100), 'at_risk' (50-79), or 'critical' (0-49)
+    """
+    if score >= 80:
+        return "healthy"
+    elif score >= 50:
+        return "at_risk"
+    else:
+        return "critical"
+
+
+def _iter_recent_research(supabase, user_ids: List[str], since: datetime) -> Iterator[Dict[str, Any]]:
+    """Yield the users' research briefs since a date, newest first, one page at a time."""
+    start = 0
+    while True:
+        # id breaks created_at ties, so pages don't overlap or skip rows
+        result = supabase.table("research_briefs") \
+            .select("user_id, created_at, status") \
+            .in_("user_id", user_ids) \
+            .gte("created_at", since.isoformat()) \
+            .order("created_at", desc=True) \
+            .order("id") \
+            .range(start, start + USER_SCAN_PAGE_SIZE - 1) \
+            .execute()
+
+        rows = result.data or []
+        yield from rows
+        if len(rows) < USER_SCAN_PAGE_SIZE:
+            return
+        start += USER_SCAN_PAGE_SIZE
+
+
+def fetch_user_health_data(supabase, user_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+    """
+    Fetch health data for a batch of users in bulk queries.
+
+    One query per related table for the whole batch (research activity is
+    paged), then scores are calculated in memory (see calculate_health_score_from_data).
+
+    Returns: Dict[user_id, {last_activity, error_count, total_count, org_id, flow_count, flow_limit, profile_completeness, has_failed_payment}]
+    """
+    user_data: Dict[str, Dict[str, Any]] = {
+        user_id: {
+            "last_activity": None,
+            "error_count": 0,
+            "total_count": 0,
+            "org_id": None,
+            "flow_count": 0,
+            "flow_limit": 0,
+            "profile_completeness": 0,
+            "has_failed_payment": False
+        }
+        for user_id in user_ids
+    }
+
+    if not user_data:
+        return user_data
+
+    month_ago = datetime.utcnow() - timedelta(days=30)
+
+    # 1. Last activity, totals and errors per user
+    for activity in _iter_recent_research(supabase, user_ids, month_ago):
+        uid = activity.get("user_id")
+        if uid and uid in user_data:
+            # Update last activity (first one we see is the most recent due to ordering)
+            if user_data[uid]["last_activity"] is None:
+                user_data[uid]["last_activity"] = activity.get("created_at")
+            # Count totals and errors
+            user_data[uid]["total_count"] += 1
+            if activity.get("status") == "failed":
+                user_data[uid]["error_count"] += 1
+
+    # 2. Organization membership
+    org_members = supabase.table("organization_members") \
+        .select("user_id, organization_id") \
+        .in_("user_id", user_ids) \
+        .execute()
+
+    org_ids = set()
+    for member in (org_members.data or []):
+        uid = member.get("user_id")
+        org_id = member.get("organization_id")
+        if uid and uid in user_data:
+            user_data[uid]["org_id"] = org_id
+            if org_id:
+                org_ids.add(org_id)
+
+    # 3. Organization flow data from usage_records and subscription_plans
+    if org_ids:
+        # Current month's flow usage
+        current_month_start = datetime.utcnow().replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+        usage_records = supabase.table("usage_records") \
+            .select("organization_id, flow_count") \
+            .in_("organization_id", list(org_ids)) \
+            .gte("period_start", current_month_start.isoformat()) \
+            .execute()
+
+        usage_map = {ur["organization_id"]: ur.get("flow_count", 0) or 0 for ur in (usage_records.data or [])}
+
+        # Flow limits from subscription_plans via organization_subscriptions
+        subscriptions = supabase.table("organization_subscriptions") \
+            .select("organization_id, subscription_plans(features)") \
+            .in_("organization_id", list(org_ids)) \
+            .in_("status", ["active", "trialing"]) \
+            .execute()
+
+        limit_map = {}
+        for sub in (subscriptions.data or []):
+            org_id = sub.get("organization_id")
+            features = (sub.get("subscription_plans") or {}).get("features") or {}
+            limit_map[org_id] = features.get("flow_limit", 2) or 2
+
+        for uid, data in user_data.items():
+            org_id = data.get("org_id")
+            if org_id:
+                user_data[uid]["flow_count"] = usage_map.get(org_id, 0)
+                user_data[uid]["flow_limit"] = limit_map.get(org_id, 2)
+
+    # 4. Profile completeness
+    profiles = supabase.table("sales_profiles") \
+        .select("user_id, profile_completeness") \
+        .in_("user_id", user_ids) \
+        .execute()
+
+    for profile in (profiles.data or []):
+        uid = profile.get("user_id")
+        if uid and uid in user_data:
+            user_data[uid]["profile_completeness"] = profile.get("profile_completeness", 0) or 0
+
+    # 5. Failed payments per org
+    if org_ids:
+        failed_payments = supabase.table("payment_history") \
+            .select("organization_id") \
+            .eq("status", "failed") \
+            .gte("created_at", month_ago.isoformat()) \
+            .in_("organization_id", list(org_ids)) \
+            .execute()
+
+        orgs_with_failed = {fp.get("organization_id") for fp in (failed_payments.data or [])}
+
+        for uid, data in user_data.items():
+            if data.get("org_id") in orgs_with_failed:
+                user_data[uid]["has_failed_payment"] = True
+
+    return user_data
+
+
+def calculate_health_score_from_data(data: Dict[str, Any]) -> int:
+    """
+    Calculate health score from pre-fetched data.
+
+    Scoring (start at 100, deduct for issues):
+    - Inactivity: -10 (7d), -20 (14d), -30 (30d+)
+    - Errors: -10 per 10% error rate (max -25)
+    - Low usage: -15 if <10% of limit used
+    - Incomplete profile: -10 if <50%, -5 if <80%
+    - Payment issues: -20 if has failed payment
+    """
+    return sum(calculate_health_score_breakdown(data).values())
+
+
+def calculate_health_score_breakdown(data: Dict[str, Any]) -> Dict[str, int]:
+    """
+    Points per component of the health score (see calculate_health_score_from_data).
+
+    Returns: {activity_score (0-30), error_score (0-25), usage_score (0-15),
+    profile_score (0-10), payment_score (0-20)}
+    """
+    now = datetime.utcnow()
+    week_ago = now - timedelta(days=7)
+    two_weeks_ago = now - timedelta(days=14)
+    month_ago = now - timedelta(days=30)
+
+    # Activity penalty
+    activity_score = 30
+    last_activity_str = data.get("last_activity")
+    if last_activity_str:
+        try:
+            last_active = datetime.fromisoformat(last_activity_str.replace("Z", "+00:00")).replace(tzinfo=None)
+            if last_active < month_ago:
+                activity_score = 0
+            elif last_active < two_weeks_ago:
+                activity_score = 10
+            elif last_active < week_ago:
+                activity_score = 20
+        except (ValueError, TypeError):
+            activity_score = 0  # Can't parse = assume inactive
+    else:
+        activity_score = 0  # No activity
+
+    # Error rate penalty
+    error_score = 25
+    total_count = data.get("total_count", 0)
+    error_count = data.get("error_count", 0)
+    if total_count > 0:
+        error_rate = error_count / total_count
+        if error_rate > 0.3:
+            error_score = 0
+        elif error_rate > 0.2:
+            error_score = 10
+        elif error_rate > 0.1:
+            error_score = 15
+
+    # Usage penalty
+    usage_score = 15
+    flow_limit = data.get("flow_limit", 0)
+    flow_count = data.get("flow_count", 0)
+    if flow_limit > 0:
+        usage_pct = flow_count / flow_limit
+        if usage_pct < 0.1:
+            usage_score = 0
+        elif usage_pct < 0.3:
+            usage_score = 5
+
+    # Profile penalty
+    profile_score = 10
+    completeness = data.get("profile_completeness", 0)
+    if completeness < 50:
+        profile_score = 0
+    elif completeness < 80:
+        profile_score = 5
+
+    # Payment penalty
+    payment_score = 0 if data.get("has_failed_payment") else 20
+
+    return {
+        "activity_score": activity_score,
+        "error_score": error_score,
+        "usage_score": usage_score,
+        "profile_score": profile_score,
+        "payment_score": payment_score,
+    }
+
+
+def compute_health_scores(supabase, user_ids: List[str]) -> List[Dict[str, Any]]:
+    """Compute user_health_scores rows for a list of users."""
+    rows = []
+    computed_at = datetime.utcnow().isoformat()
+
+    for i in range(0, len(user_ids), HEALTH_BATCH_SIZE):
+        batch = user_ids[i:i + HEALTH_BATCH_SIZE]
+        for user_id, data in fetch_user_health_data(supabase, batch).items():
+            score = calculate_health_score_from_data(data)
+            rows.append({
+                "user_id": user_id,
+                "organization_id": data.get("org_id"),
+                "health_score": score,
+                "health_status": get_health_status(score),
+                "health_data": data,
+                "computed_at": computed_at,
+            })
+
+    return rows
+
+
+def iter_user_id_pages(supabase) -> Iterator[List[str]]:
+    """Yield all user IDs, one page at a time."""
+    start = 0
+    while True:
+        result = supabase.table("users") \
+            .select("id") \
+            .order("id") \
+            .range(start, start + USER_SCAN_PAGE_SIZE - 1) \
+            .execute()
+
+        rows = result.data or []
+        if rows:
+            yield [row["id"] for row in rows]
+        if len(rows) < USER_SCAN_PAGE_SIZE:
+            return
+        start += USER_SCAN_PAGE_SIZE
+
+
+def save_health_scores(supabase, rows: List[Dict[str, Any]]) -> None:
+    """Upsert computed user_health_scores rows."""
+    for i in range(0, len(rows), HEALTH_BATCH_SIZE):
+        supabase.table("user_health_scores") \
+            .upsert(rows[i:i + HEALTH_BATCH_SIZE], on_conflict="user_id") \
+            .execute()
+
+
+def store_health_scores(supabase, user_ids: List[str]) -> int:
+    """Recompute and upsert the health scores of the given users."""
+    rows = compute_health_scores(supabase, user_ids)
+    save_health_scores(supabase, rows)
+    return len(rows)
+
+
+def refresh_organization_health_scores(supabase, organization_id: str) -> int:
+    """Recompute the health scores of all members of an organization."""
+    members = supabase.table("organization_members") \
+        .select("user_id") \
+        .eq("organization_id", organization_id) \
+        .execute()
+
+    user_ids = [m["user_id"] for m in (members.data or [])]
+    if not user_ids:
+        return 0
+
+    return store_health_scores(supabase, user_ids)
+
+
+def get_stored_health_scores(supabase, user_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+    """
+    Read snapshot scores for a list of users.
+
+    Returns: Dict[user_id, {health_score, health_status, health_data}]
+    (users without a snapshot are missing from the result)
+    """
+    scores: Dict[str, Dict[str, Any]] = {}
+
+    try:
+        for i in range(0, len(user_ids), HEALTH_BATCH_SIZE):
+            result = supabase.table("user_health_scores") \
+                .select("user_id, health_score, health_status, health_data") \
+                .in_("user_id", user_ids[i:i + HEALTH_BATCH_SIZE]) \
+                .execute()
+
+            for row in (result.data or []):
+                scores[row["user_id"]] = row
+    except Exception as e:
+        logger.warning(f"Could not read user_health_scores: {e}")
+
+    return scores
+
+
+def get_health_scores(supabase, user_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+    """
+    Get health scores for a list of users, from the snapshot where possible.
+
+    Users not in the snapshot yet are scored with the same calculation
+    and added to it, so a user's score doesn't change once the scheduled
+    recompute reaches them.
+
+    Returns: Dict[user_id, {health_score, health_status, health_data}]
+    """
+    scores = get_stored_health_scores(supabase, user_ids)
+
+    missing_ids = [user_id for user_id in user_ids if user_id not in scores]
+    if missing_ids:
+        rows = compute_health_scores(supabase, missing_ids)
+        try:
+            save_health_scores(supabase, rows)
+        except Exception as e:
+            logger.warning(f"Could not store user_health_scores: {e}")
+
+        for row in rows:
+            scores[row["user_id"]] = row
+
+    return scores
+
+
+def get_health_status_counts(supabase) -> Optional[Dict[str, int]]:
+    """
+    Count snapshot scores per health status.
+
+    Returns None when the snapshot is empty or unavailable (not populated
+    or not migrated yet).
+    """
+    counts = {}
+    try:
+        for status in ("healthy", "at_risk", "critical"):
+            result = supabase.table("user_health_scores") \
+                .select("user_id", count="exact") \
+                .eq("health_status", status) \
+                .limit(1) \
+                .execute()
+            counts[status] = result.count or 0
+    except Exception as e:
+        logger.warning(f"Could not read user_health_scores: {e}")
+        return None
+
+    if not any(counts.values()):
+        return None
+    return counts
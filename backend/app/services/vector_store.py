@@ -1,124 +1,376 @@
 """
-Vector store service using Pinecone.
+Vector store service.
 Stores and retrieves embeddings for knowledge base chunks.
+
+Backends (VECTOR_STORE_BACKEND):
+- pinecone: Pinecone index (default), one namespace per organization
+- local: In-process NumPy index per organization, memory-mapped on disk
+  (see local_vector_store). Exact cosine search, suited to organizations
+  with up to a few thousand chunks, and needs no network.
+
+Use get_vector_store() to get the process-wide instance of a backend.
 """
 
 import os
-from typing import List, Dict, Optional
+import json
+import logging
+import threading
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Iterator, List, Dict, Optional
 from pinecone import Pinecone
 
+logger = logging.getLogger(__name__)
+
+VECTOR_STORE_BACKEND = os.getenv("VECTOR_STORE_BACKEND", "pinecone")
+
+# Pinecone request limits: 1000 vectors and 2MB per upsert, 1000 IDs per
+# fetch/delete. Upsert size is estimated (JSON floats up to ~20 chars).
+PINECONE_UPSERT_MAX_VECTORS = 1000
+PINECONE_UPSERT_MAX_BYTES = 1_800_000
+PINECONE_ID_BATCH_SIZE = 1000
+PINECONE_UPSERT_CONCURRENCY = int(os.getenv("PINECONE_UPSERT_CONCURRENCY", "4"))
+
+# Vectors written before per-organization namespaces live in the shared
+# default namespace until migrate_pinecone_namespaces.py moves them; while
+# this is on, reads and deletes also cover it (two requests per call).
+PINECONE_SHARED_NAMESPACE_FALLBACK = os.getenv("PINECONE_SHARED_NAMESPACE_FALLBACK", "false").lower() == "true"
+SHARED_NAMESPACE = ""
+
+
+class VectorStoreBackend(ABC):
+    """
+    Interface of a vector store backend.
+
+    Query matches expose .id, .score and .metadata (Pinecone's match
+    objects, or VectorMatch for other backends).
+    """
+
+    @abstractmethod
+    def upsert_vectors(self, vectors: List[Dict[str, Any]]) -> Dict[str, int]:
+        """
+        Upsert vectors.
+
+        Args:
+            vectors: List of vector objects, each containing:
+                - id: Unique vector ID (e.g., "file_id:chunk_index")
+                - values: Embedding vector (1024 dimensions)
+                - metadata: Dict with file_id, chunk_index, organization_id, etc.
+
+        Returns:
+            Dict with upserted_count
+        """
+
+    @abstractmethod
+    def query_vectors(
+        self,
+        query_vector: List[float],
+        top_k: int = 5,
+        filter: Optional[Dict] = None,
+        include_metadata: bool = True
+    ) -> List[Any]:
+        """
+        Query similar vectors.
+
+        Args:
+            query_vector: Query embedding (1024 dimensions)
+            top_k: Number of results to return
+            filter: Metadata filter (e.g., {"organization_id": "uuid"})
+            include_metadata: Whether to include metadata in results
+
+        Returns:
+            List of matches with id, score, and metadata, best first
+        """
+
+    @abstractmethod
+    def fetch_vectors(self, ids: List[str], organization_id: Optional[str] = None) -> Dict[str, List[float]]:
+        """
+        Fetch stored vectors by ID.
+
+        Args:
+            ids: List of vector IDs
+            organization_id: Organization the vectors belong to
+
+        Returns:
+            Dict of vector ID to embedding (IDs that don't exist are missing)
+        """
+
+    @abstractmethod
+    def delete_vectors(self, ids: List[str], organization_id: Optional[str] = None) -> None:
+        """
+        Delete vectors.
+
+        Args:
+            ids: List of vector IDs to delete
+            organization_id: Organization the vectors belong to
+        """
+
+    @abstractmethod
+    def delete_by_filter(self, filter: Dict) -> None:
+        """
+        Delete vectors by metadata filter.
+
+        Args:
+            filter: Metadata filter (e.g., {"file_id": "uuid"})
+        """
+
+    @abstractmethod
+    def get_stats(self) -> Dict:
+        """
+        Get index statistics.
+
+        Returns:
+            Dict with total_vector_count and other stats
+        """
+
+    def delete_by_file(self, file_id: str, organization_id: Optional[str] = None) -> None:
+        """
+        Delete all vectors for a specific file.
+
+        Prefer deleting the file's chunk IDs (kb_chunks.delete_file_vectors);
+        this is the fallback when they aren't known.
+
+        Args:
+            file_id: File ID to delete vectors for
+            organization_id: Organization the file belongs to
+        """
+        filter = {"file_id": file_id}
+        if organization_id:
+            filter["organization_id"] = organization_id
+        self.delete_by_filter(filter)
+
+
+def _namespace(organization_id: Optional[str]) -> str:
+    """Pinecone namespace of an organization's vectors."""
+    return organization_id or SHARED_NAMESPACE
+
+
+def _estimate_upsert_bytes(vector: Dict[str, Any]) -> int:
+    """Rough request size of a vector in an upsert."""
+    return len(vector["values"]) * 20 + len(json.dumps(vector.get("metadata") or {})) + len(vector["id"]) + 64
+
+
+def iter_upsert_batches(vectors: List[Dict[str, Any]]) -> Iterator[List[Dict[str, Any]]]:
+    """Split vectors into upsert requests within Pinecone's count and size limits."""
+    batch: List[Dict[str, Any]] = []
+    batch_bytes = 0
+
+    for vector in vectors:
+        size = _estimate_upsert_bytes(vector)
+        if batch and (len(batch) >= PINECONE_UPSERT_MAX_VECTORS or batch_bytes + size > PINECONE_UPSERT_MAX_BYTES):
+            yield batch
+            batch, batch_bytes = [], 0
+        batch.append(vector)
+        batch_bytes += size
+
+    if batch:
+        yield batch
+
+
+class PineconeVectorStore(VectorStoreBackend):
+    """
+    Manage vector storage in Pinecone.
+
+    Each organization's vectors live in their own namespace (the
+    organization ID), so queries only search that organization's vectors
+    instead of filtering the whole index.
+    """
 
-class VectorStore:
-    """Manage vector storage in Pinecone."""
-    
     def __init__(self):
         """Initialize Pinecone client and connect to index."""
         api_key = os.getenv("PINECONE_API_KEY")
         index_name = os.getenv("PINECONE_INDEX_NAME", "dealmotion-knowledge-base")
-        
+
         if not api_key:
             raise ValueError("PINECONE_API_KEY must be set")
-        
+
         # Initialize Pinecone (new API)
         pc = Pinecone(api_key=api_key)
-        
+
         # Connect to index
         self.index_name = index_name
         self.index = pc.Index(index_name)
-    
+
+        # Upsert batches in flight at once
+        self._executor = ThreadPoolExecutor(
+            max_workers=PINECONE_UPSERT_CONCURRENCY,
+            thread_name_prefix="pinecone-upsert",
+        )
+
+    def _namespaces(self, organization_id: Optional[str]) -> List[str]:
+        """Namespaces that may hold an organization's vectors."""
+        namespaces = [_namespace(organization_id)]
+        if organization_id and PINECONE_SHARED_NAMESPACE_FALLBACK:
+            namespaces.append(SHARED_NAMESPACE)
+        return namespaces
+
     def upsert_vectors(
         self,
-        vectors: List[Dict[str, any]]
+        vectors: List[Dict[str, Any]]
     ) -> Dict[str, int]:
         """
-        Upsert vectors to Pinecone.
-        
-        Args:
-            vectors: List of vector objects, each containing:
-                - id: Unique vector ID (e.g., "file_id:chunk_index")
-                - values: Embedding vector (1024 dimensions)
-                - metadata: Dict with file_id, chunk_index, organization_id, etc.
-        
-        Returns:
-            Dict with upserted_count
+        Upsert vectors to Pinecone, into their organization's namespace.
+
+        Vectors are sent in size-bounded batches, several at a time.
         """
+        by_namespace: Dict[str, List[Dict[str, Any]]] = {}
+        for vector in vectors:
+            organization_id = (vector.get("metadata") or {}).get("organization_id")
+            by_namespace.setdefault(_namespace(organization_id), []).append(vector)
+
+        requests = [
+            (namespace, batch)
+            for namespace, namespace_vectors in by_namespace.items()
+            for batch in iter_upsert_batches(namespace_vectors)
+        ]
+
         try:
-            response = self.index.upsert(vectors=vectors)
-            return {"upserted_count": response.upserted_count}
+            responses = list(self._executor.map(
+                lambda request: self.index.upsert(vectors=request[1], namespace=request[0]),
+                requests
+            ))
+            return {"upserted_count": sum(response.upserted_count for response in responses)}
         except Exception as e:
             raise ValueError(f"Failed to upsert vectors: {str(e)}")
-    
+
     def query_vectors(
         self,
         query_vector: List[float],
         top_k: int = 5,
         filter: Optional[Dict] = None,
         include_metadata: bool = True
-    ) -> List[Dict]:
+    ) -> List[Any]:
         """
         Query similar vectors from Pinecone.
-        
-        Args:
-            query_vector: Query embedding (1024 dimensions)
-            top_k: Number of results to return
-            filter: Metadata filter (e.g., {"organization_id": "uuid"})
-            include_metadata: Whether to include metadata in results
-            
-        Returns:
-            List of matches with id, score, and metadata
+
+        An organization_id equality filter selects the organization's
+        namespace instead of being sent as a metadata filter.
         """
+        filter = dict(filter or {})
+        organization_id = filter.pop("organization_id", None)
+        if isinstance(organization_id, dict):
+            organization_id = organization_id.get("$eq")
+
         try:
-            response = self.index.query(
-                vector=query_vector,
-                top_k=top_k,
-                filter=filter,
-                include_metadata=include_metadata
-            )
-            return response.matches
+            matches = []
+            for namespace in self._namespaces(organization_id):
+                namespace_filter = filter
+                if namespace == SHARED_NAMESPACE and organization_id:
+                    namespace_filter = {**filter, "organization_id": organization_id}
+
+                response = self.index.query(
+                    vector=query_vector,
+                    top_k=top_k,
+                    filter=namespace_filter or None,
+                    include_metadata=include_metadata,
+                    namespace=namespace
+                )
+                matches.extend(response.matches)
+
+            matches.sort(key=lambda match: match.score, reverse=True)
+            return matches[:top_k]
         except Exception as e:
             raise ValueError(f"Failed to query vectors: {str(e)}")
-    
-    def delete_vectors(self, ids: List[str]) -> None:
-        """
-        Delete vectors from Pinecone.
-        
-        Args:
-            ids: List of vector IDs to delete
-        """
+
+    def fetch_vectors(self, ids: List[str], organization_id: Optional[str] = None) -> Dict[str, List[float]]:
+        """Fetch stored vectors from Pinecone by ID."""
+        found: Dict[str, List[float]] = {}
+
         try:
-            self.index.delete(ids=ids)
+            for namespace in self._namespaces(organization_id):
+                missing = [vector_id for vector_id in ids if vector_id not in found]
+                for i in range(0, len(missing), PINECONE_ID_BATCH_SIZE):
+                    response = self.index.fetch(ids=missing[i:i + PINECONE_ID_BATCH_SIZE], namespace=namespace)
+                    for vector_id, vector in response.vectors.items():
+                        found[vector_id] = list(vector.values)
+        except Exception as e:
+            raise ValueError(f"Failed to fetch vectors: {str(e)}")
+
+        return found
+
+    def delete_vectors(self, ids: List[str], organization_id: Optional[str] = None) -> None:
+        """Delete vectors from Pinecone by ID."""
+        try:
+            for namespace in self._namespaces(organization_id):
+                for i in range(0, len(ids), PINECONE_ID_BATCH_SIZE):
+                    self.index.delete(ids=ids[i:i + PINECONE_ID_BATCH_SIZE], namespace=namespace)
         except Exception as e:
             raise ValueError(f"Failed to delete vectors: {str(e)}")
-    
+
     def delete_by_filter(self, filter: Dict) -> None:
         """
-        Delete vectors by metadata filter.
-        
-        Args:
-            filter: Metadata filter (e.g., {"file_id": "uuid"})
+        Delete vectors from Pinecone by metadata filter.
+
+        Metadata-filter deletes are only supported by pod-based indexes;
+        prefer deleting by ID.
         """
+        filter = dict(filter)
+        organization_id = filter.get("organization_id")
+        if isinstance(organization_id, dict):
+            organization_id = organization_id.get("$eq")
+
         try:
-            self.index.delete(filter=filter)
+            for namespace in self._namespaces(organization_id):
+                namespace_filter = filter if namespace == SHARED_NAMESPACE else {
+                    key: value for key, value in filter.items() if key != "organization_id"
+                }
+                if namespace_filter:
+                    self.index.delete(filter=namespace_filter, namespace=namespace)
+                else:
+                    # Only the organization was filtered on: that's the whole namespace
+                    self.index.delete(delete_all=True, namespace=namespace)
         except Exception as e:
             raise ValueError(f"Failed to delete vectors by filter: {str(e)}")
-    
-    def delete_by_file(self, file_id: str) -> None:
+
+    def delete_by_file(self, file_id: str, organization_id: Optional[str] = None) -> None:
         """
-        Delete all vectors for a specific file.
-        
-        Args:
-            file_id: File ID to delete vectors for
+        Delete all vectors for a specific file by ID prefix ("{file_id}:").
+
+        Vector IDs are listed by prefix per namespace (serverless indexes);
+        pod-based indexes, which can't list, fall back to a filter delete.
         """
-        self.delete_by_filter({"file_id": file_id})
-    
+        try:
+            for namespace in self._namespaces(organization_id):
+                for ids in self.index.list(prefix=f"{file_id}:", namespace=namespace):
+                    if ids:
+                        self.index.delete(ids=ids, namespace=namespace)
+        except Exception as e:
+            logger.warning(f"Could not delete vectors of file {file_id} by prefix, deleting by filter: {e}")
+            super().delete_by_file(file_id, organization_id)
+
     def get_stats(self) -> Dict:
-        """
-        Get index statistics.
-        
-        Returns:
-            Dict with total_vector_count and other stats
-        """
+        """Get Pinecone index statistics."""
         try:
             return self.index.describe_index_stats()
         except Exception as e:
             raise ValueError(f"Failed to get index stats: {str(e)}")
+
+
+# Process-wide instances, one per backend
+_instances: Dict[str, VectorStoreBackend] = {}
+_instances_lock = threading.Lock()
+
+
+def get_vector_store(backend: Optional[str] = None) -> VectorStoreBackend:
+    """
+    Get the shared vector store for a backend.
+
+    Clients (and the local index) are created once per process instead
+    of per request or step.
+
+    Args:
+        backend: "pinecone" or "local" (default: VECTOR_STORE_BACKEND)
+    """
+    backend = backend or VECTOR_STORE_BACKEND
+
+    with _instances_lock:
+        if backend not in _instances:
+            if backend == "pinecone":
+                _instances[backend] = PineconeVectorStore()
+            elif backend == "local":
+                # Lazy import: the local backend subclasses VectorStoreBackend
+                from app.services.local_vector_store import LocalVectorStore
+                _instances[backend] = LocalVectorStore()
+            else:
+                raise ValueError(f"Unknown vector store backend: {backend}")
+        return _instances[backend]
@@ -12,6 +12,7 @@ from .timeout import (
     AITimeoutError,
     DEFAULT_AI_TIMEOUT,
 )
+from .cache import TTLCache
 
 __all__ = [
     "with_timeout",
@@ -22,5 +23,6 @@ __all__ = [
     "transcription_with_timeout",
     "AITimeoutError",
     "DEFAULT_AI_TIMEOUT",
+    "TTLCache",
 ]
 
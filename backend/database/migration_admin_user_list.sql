@@ -0,0 +1,73 @@
+-- ============================================================================
+-- MIGRATION: Admin User List
+-- Lets GET /api/v1/admin/users search by organization name, filter by plan
+-- and health status and sort by last activity in the database, and supports
+-- its bulk enrichment queries
+-- Requires: migration_user_health_scores.sql
+-- Date: 16 October 2026
+-- ============================================================================
+
+-- ============================================================================
+-- 1. ADMIN USER LIST VIEW
+-- ============================================================================
+
+-- One row per user with the fields the admin list searches, filters and sorts on.
+-- Organization is the user's first membership (as in the list enrichment);
+-- health_status is NULL until the user is in the user_health_scores snapshot.
+CREATE OR REPLACE VIEW public.admin_user_list
+WITH (security_invoker = true)
+AS
+SELECT
+    u.id,
+    u.email,
+    u.full_name,
+    u.created_at,
+    m.organization_id,
+    o.name AS organization_name,
+    COALESCE(s.plan_id, 'free') AS plan,
+    h.health_score,
+    h.health_status,
+    a.last_active
+FROM public.users u
+LEFT JOIN LATERAL (
+    SELECT om.organization_id
+    FROM public.organization_members om
+    WHERE om.user_id = u.id
+    ORDER BY om.created_at
+    LIMIT 1
+) m ON true
+LEFT JOIN public.organizations o ON o.id = m.organization_id
+LEFT JOIN LATERAL (
+    SELECT os.plan_id
+    FROM public.organization_subscriptions os
+    WHERE os.organization_id = m.organization_id
+    LIMIT 1
+) s ON true
+LEFT JOIN public.user_health_scores h ON h.user_id = u.id
+LEFT JOIN LATERAL (
+    SELECT pa.created_at AS last_active
+    FROM public.prospect_activities pa
+    WHERE pa.organization_id = m.organization_id
+    ORDER BY pa.created_at DESC
+    LIMIT 1
+) a ON true;
+
+-- ============================================================================
+-- 2. INDEXES
+-- ============================================================================
+
+-- Latest activity per organization (embedded ORDER BY created_at DESC LIMIT 1)
+CREATE INDEX IF NOT EXISTS idx_prospect_activities_org_created
+ON prospect_activities(organization_id, created_at DESC);
+
+-- Membership lookups by user
+CREATE INDEX IF NOT EXISTS idx_organization_members_user
+ON organization_members(user_id);
+
+-- ============================================================================
+-- 3. GRANTS
+-- ============================================================================
+
+-- Admin endpoints only (service role)
+REVOKE ALL ON public.admin_user_list FROM anon, authenticated;
+GRANT SELECT ON public.admin_user_list TO service_role;
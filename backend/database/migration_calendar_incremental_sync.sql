@@ -0,0 +1,17 @@
+-- ============================================================================
+-- MIGRATION: Incremental Calendar Sync
+-- Stores the Google sync token / Microsoft Graph delta link per calendar
+-- connection, so scheduled syncs only fetch events changed since the last run
+-- Date: 16 October 2026
+-- ============================================================================
+
+-- ============================================================================
+-- 1. ADD SYNC STATE COLUMNS
+-- ============================================================================
+
+ALTER TABLE calendar_connections
+    ADD COLUMN IF NOT EXISTS sync_token TEXT,
+    ADD COLUMN IF NOT EXISTS full_synced_at TIMESTAMPTZ;
+
+COMMENT ON COLUMN calendar_connections.sync_token IS 'Google nextSyncToken or Microsoft Graph deltaLink for incremental sync (NULL = full sync)';
+COMMENT ON COLUMN calendar_connections.full_synced_at IS 'Last full sync of the sync window; a full sync is forced again after 24 hours';
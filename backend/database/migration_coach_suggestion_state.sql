@@ -0,0 +1,45 @@
+-- ============================================================================
+-- MIGRATION: Materialized Coach Suggestions
+-- Keep pending coach suggestions up to date via lifecycle events instead of
+-- re-evaluating all rules on every GET /api/v1/coach/suggestions
+-- Date: 16 October 2026
+-- ============================================================================
+
+-- ============================================================================
+-- 1. CREATE COACH SUGGESTION STATE TABLE
+-- ============================================================================
+
+-- One row per user whose suggestions are materialized
+CREATE TABLE IF NOT EXISTS coach_suggestion_state (
+    user_id UUID PRIMARY KEY REFERENCES auth.users(id) ON DELETE CASCADE,
+    organization_id UUID REFERENCES organizations(id) ON DELETE CASCADE,
+    refreshed_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    created_at TIMESTAMPTZ DEFAULT NOW()
+);
+
+-- ============================================================================
+-- 2. ADD INDEXES
+-- ============================================================================
+
+-- Serving read: pending suggestions for a user, highest priority first
+CREATE INDEX IF NOT EXISTS idx_coach_suggestions_user_pending
+ON coach_suggestions(user_id, priority DESC)
+WHERE action_taken IS NULL;
+
+-- Refresh read: pending/snoozed suggestions of given types for a user
+CREATE INDEX IF NOT EXISTS idx_coach_suggestions_user_type
+ON coach_suggestions(user_id, suggestion_type);
+
+-- ============================================================================
+-- 3. ROW LEVEL SECURITY
+-- ============================================================================
+
+ALTER TABLE coach_suggestion_state ENABLE ROW LEVEL SECURITY;
+
+-- Users can only see their own state
+CREATE POLICY "Users can view own suggestion state" ON coach_suggestion_state
+    FOR SELECT USING (auth.uid() = user_id);
+
+-- Service role can do everything (for backend)
+CREATE POLICY "Service role full access" ON coach_suggestion_state
+    FOR ALL USING (auth.role() = 'service_role');
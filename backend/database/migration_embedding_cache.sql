@@ -0,0 +1,54 @@
+-- ============================================================================
+-- MIGRATION: Query Embedding Cache
+-- Persistent tier of the query embedding cache, so repeated RAG queries
+-- (same prospect across research, prep and follow-up) skip the Voyage call
+-- Date: 16 October 2026
+-- ============================================================================
+
+-- ============================================================================
+-- 1. CREATE EMBEDDING CACHE TABLE
+-- ============================================================================
+
+CREATE TABLE IF NOT EXISTS embedding_cache (
+    -- sha256(model, input_type, text), see embedding_cache_key()
+    cache_key TEXT PRIMARY KEY,
+    model TEXT NOT NULL,
+    input_type TEXT NOT NULL,
+    embedding JSONB NOT NULL,
+    created_at TIMESTAMPTZ DEFAULT NOW()
+);
+
+-- ============================================================================
+-- 2. ADD INDEXES
+-- ============================================================================
+
+-- Cleanup of old entries
+CREATE INDEX IF NOT EXISTS idx_embedding_cache_created
+ON embedding_cache(created_at);
+
+-- ============================================================================
+-- 3. ROW LEVEL SECURITY
+-- ============================================================================
+
+ALTER TABLE embedding_cache ENABLE ROW LEVEL SECURITY;
+
+-- Service role can do everything (for backend)
+CREATE POLICY "Service role full access" ON embedding_cache
+    FOR ALL USING (auth.role() = 'service_role');
+
+-- ============================================================================
+-- 4. CLEANUP FUNCTION (Optional - run periodically)
+-- ============================================================================
+
+CREATE OR REPLACE FUNCTION cleanup_old_embedding_cache()
+RETURNS INTEGER AS $$
+DECLARE
+    deleted_count INTEGER;
+BEGIN
+    DELETE FROM embedding_cache
+    WHERE created_at < NOW() - INTERVAL '90 days';
+    
+    GET DIAGNOSTICS deleted_count = ROW_COUNT;
+    RETURN deleted_count;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER SET search_path = public;
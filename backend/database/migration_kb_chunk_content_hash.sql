@@ -0,0 +1,23 @@
+-- ============================================================================
+-- MIGRATION: Knowledge Base Chunk Content Hashes
+-- Chunks store a hash of their text so re-uploaded documents reuse the
+-- organization's existing embeddings and only embed changed chunks
+-- Date: 16 October 2026
+-- ============================================================================
+
+-- ============================================================================
+-- 1. ADD CONTENT HASH COLUMN
+-- ============================================================================
+
+-- sha256 of the chunk content (see kb_chunks.content_hash). Chunks saved
+-- before this migration have no hash and are never reused.
+ALTER TABLE knowledge_base_chunks
+    ADD COLUMN IF NOT EXISTS content_hash TEXT;
+
+-- ============================================================================
+-- 2. INDEXES
+-- ============================================================================
+
+-- Reuse lookup: WHERE organization_id = $1 AND content_hash IN (...)
+CREATE INDEX IF NOT EXISTS idx_kb_chunks_org_content_hash
+    ON knowledge_base_chunks(organization_id, content_hash);
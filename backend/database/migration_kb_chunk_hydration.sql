@@ -0,0 +1,22 @@
+-- ============================================================================
+-- MIGRATION: Knowledge Base Chunk Hydration
+-- Vector matches are resolved to chunk text by embedding_id (the vector ID,
+-- "file_id:chunk_index"), so retrieval needs an index on that column
+-- Date: 16 October 2026
+-- ============================================================================
+
+-- ============================================================================
+-- 1. ENSURE CHUNK COLUMNS WRITTEN BY THE INGESTION PIPELINE
+-- ============================================================================
+
+ALTER TABLE knowledge_base_chunks
+    ADD COLUMN IF NOT EXISTS token_count INTEGER,
+    ADD COLUMN IF NOT EXISTS embedding_id TEXT;
+
+-- ============================================================================
+-- 2. INDEXES
+-- ============================================================================
+
+-- Hydration: WHERE organization_id = $1 AND embedding_id IN (...)
+CREATE INDEX IF NOT EXISTS idx_kb_chunks_org_embedding_id
+    ON knowledge_base_chunks(organization_id, embedding_id);
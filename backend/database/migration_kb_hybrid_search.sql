@@ -0,0 +1,68 @@
+-- ============================================================================
+-- MIGRATION: Knowledge Base Hybrid Search
+-- Full-text index over knowledge base chunk content, used next to vector
+-- similarity (KB_RETRIEVAL_MODE=hybrid) to find exact product and customer
+-- names that embeddings miss
+-- Date: 16 October 2026
+-- ============================================================================
+
+-- ============================================================================
+-- 1. FULL-TEXT SEARCH COLUMN
+-- ============================================================================
+
+-- Maintained by Postgres on every insert, so the index is built as files
+-- are ingested. 'simple' config: no stemming or stop words, names match
+-- exactly and content in any language is indexed the same way.
+ALTER TABLE knowledge_base_chunks
+    ADD COLUMN IF NOT EXISTS content_tsv TSVECTOR
+    GENERATED ALWAYS AS (to_tsvector('simple', coalesce(content, ''))) STORED;
+
+-- ============================================================================
+-- 2. INDEXES
+-- ============================================================================
+
+CREATE INDEX IF NOT EXISTS idx_kb_chunks_content_tsv
+    ON knowledge_base_chunks USING GIN (content_tsv);
+
+-- ============================================================================
+-- 3. SEARCH FUNCTION
+-- ============================================================================
+
+-- Chunks of an organization matching any of the query's terms, ranked by
+-- cover density (normalized by chunk length), best first. English and Dutch
+-- stop words are dropped from the query; they would match nearly every chunk.
+CREATE OR REPLACE FUNCTION public.search_kb_chunks(
+    p_organization_id UUID,
+    p_query TEXT,
+    p_limit INTEGER DEFAULT 20
+)
+RETURNS TABLE (embedding_id TEXT, rank REAL)
+LANGUAGE sql
+STABLE
+SECURITY DEFINER
+SET search_path = ''
+AS $$
+    WITH q AS (
+        SELECT to_tsquery('simple', array_to_string(ARRAY(
+            SELECT quote_literal(lexeme)
+            FROM unnest(tsvector_to_array(to_tsvector('simple', p_query))) AS lexeme
+            WHERE to_tsvector('english', lexeme) <> ''::tsvector
+              AND to_tsvector('dutch', lexeme) <> ''::tsvector
+        ), ' | ')) AS query
+    )
+    SELECT c.embedding_id, ts_rank_cd(c.content_tsv, q.query, 1) AS rank
+    FROM public.knowledge_base_chunks c, q
+    WHERE c.organization_id = p_organization_id
+      AND c.embedding_id IS NOT NULL
+      AND c.content_tsv @@ q.query
+    ORDER BY rank DESC
+    LIMIT p_limit;
+$$;
+
+-- ============================================================================
+-- 4. GRANTS
+-- ============================================================================
+
+-- Backend only (takes any organization ID)
+REVOKE EXECUTE ON FUNCTION public.search_kb_chunks(UUID, TEXT, INTEGER) FROM PUBLIC;
+GRANT EXECUTE ON FUNCTION public.search_kb_chunks(UUID, TEXT, INTEGER) TO service_role;
@@ -0,0 +1,52 @@
+-- ============================================================================
+-- MIGRATION: User Health Score Snapshot
+-- Precomputed customer health scores for the admin dashboard and user list,
+-- maintained by Inngest (activity/billing events + scheduled recompute)
+-- Date: 16 October 2026
+-- ============================================================================
+
+-- ============================================================================
+-- 1. CREATE USER HEALTH SCORES TABLE
+-- ============================================================================
+
+CREATE TABLE IF NOT EXISTS user_health_scores (
+    user_id UUID PRIMARY KEY REFERENCES auth.users(id) ON DELETE CASCADE,
+    organization_id UUID REFERENCES organizations(id) ON DELETE SET NULL,
+    health_score INTEGER NOT NULL CHECK (health_score BETWEEN 0 AND 100),
+    health_status TEXT NOT NULL CHECK (health_status IN ('healthy', 'at_risk', 'critical')),
+    health_data JSONB,
+    -- health_data structure (inputs of the score):
+    -- {
+    --   "last_activity": "2026-10-01T12:00:00Z",
+    --   "error_count": 0,
+    --   "total_count": 12,
+    --   "org_id": "uuid",
+    --   "flow_count": 4,
+    --   "flow_limit": 10,
+    --   "profile_completeness": 80,
+    --   "has_failed_payment": false
+    -- }
+    computed_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+);
+
+-- ============================================================================
+-- 2. ADD INDEXES
+-- ============================================================================
+
+-- Health distribution counts and health_status filters
+CREATE INDEX IF NOT EXISTS idx_user_health_scores_status
+ON user_health_scores(health_status);
+
+-- Organization refreshes
+CREATE INDEX IF NOT EXISTS idx_user_health_scores_org
+ON user_health_scores(organization_id);
+
+-- ============================================================================
+-- 3. ROW LEVEL SECURITY
+-- ============================================================================
+
+ALTER TABLE user_health_scores ENABLE ROW LEVEL SECURITY;
+
+-- Service role can do everything (for backend)
+CREATE POLICY "Service role full access" ON user_health_scores
+    FOR ALL USING (auth.role() = 'service_role');
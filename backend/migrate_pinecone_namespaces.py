@@ -0,0 +1,76 @@
+"""
+One-off migration: move knowledge base vectors from Pinecone's shared
+default namespace into per-organization namespaces.
+
+Vectors written before per-organization namespaces live in the shared
+namespace. This moves each of them into the namespace of the
+organization_id in its metadata, then deletes it from the shared
+namespace. Vectors without an organization_id are left in place and
+reported. Safe to re-run: each run only sees what's still shared.
+
+Listing vector IDs needs a serverless index; for a pod-based index,
+reprocess the knowledge base files instead.
+
+Run from the backend directory once, before (or right after) deploying
+with PINECONE_SHARED_NAMESPACE_FALLBACK off:
+
+    python migrate_pinecone_namespaces.py [--dry-run]
+"""
+
+import argparse
+import logging
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+from app.services.vector_store import PINECONE_ID_BATCH_SIZE, SHARED_NAMESPACE, get_vector_store
+
+logging.basicConfig(level=logging.INFO, format="%(levelname)s %(message)s")
+logger = logging.getLogger("migrate_pinecone_namespaces")
+
+
+def migrate(dry_run: bool = False) -> None:
+    store = get_vector_store("pinecone")
+    index = store.index
+
+    moved = 0
+    skipped = 0
+
+    # List first: deleting while paginating could skip IDs
+    ids = [vector_id for page in index.list(namespace=SHARED_NAMESPACE) for vector_id in page]
+    logger.info(f"{len(ids)} vectors in the shared namespace")
+
+    for i in range(0, len(ids), PINECONE_ID_BATCH_SIZE):
+        response = index.fetch(ids=ids[i:i + PINECONE_ID_BATCH_SIZE], namespace=SHARED_NAMESPACE)
+        vectors = []
+        for vector_id, vector in response.vectors.items():
+            metadata = dict(vector.metadata or {})
+            if not metadata.get("organization_id"):
+                skipped += 1
+                logger.warning(f"Vector {vector_id} has no organization_id, leaving it in the shared namespace")
+                continue
+            vectors.append({"id": vector_id, "values": list(vector.values), "metadata": metadata})
+
+        if not vectors:
+            continue
+
+        if not dry_run:
+            # Upsert routes each vector to its organization's namespace
+            store.upsert_vectors(vectors)
+            index.delete(ids=[vector["id"] for vector in vectors], namespace=SHARED_NAMESPACE)
+
+        moved += len(vectors)
+        logger.info(f"{'Would move' if dry_run else 'Moved'} {moved} vectors so far")
+
+    logger.info(
+        f"Done: {moved} vectors {'to move' if dry_run else 'moved'}, "
+        f"{skipped} without organization_id left in the shared namespace"
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--dry-run", action="store_true", help="Only count the vectors that would be moved")
+    args = parser.parse_args()
+    migrate(dry_run=args.dry_run)